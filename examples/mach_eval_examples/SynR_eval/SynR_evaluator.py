@@ -2,8 +2,8 @@ import os
 import sys
 from time import time as clock_time
 
-os.chdir(os.path.dirname(__file__))
-sys.path.append("../../../")
+# add the directory 3 levels above this file's directory to path for module import
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../.."))
 
 from mach_eval import (MachineEvaluator, MachineDesign)
 from electromagnetic_step import electromagnetic_step
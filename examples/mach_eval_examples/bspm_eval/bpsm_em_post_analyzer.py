@@ -1,4 +1,3 @@
-import copy
 import numpy as np
 import os
 import sys
@@ -22,8 +21,7 @@ class BSPM_EM_PostAnalyzer:
         return 6 * ((self.current_trms / 2) ** 2 + self.current_srms**2) * self.R_coil
 
     def get_next_state(results, in_state):
-        state_out = copy.deepcopy(in_state)
-        machine = state_out.design.machine
+        machine = in_state.design.machine
 
         ############################ extract required info ###########################
         length = results["current"].shape[0]
@@ -116,12 +114,13 @@ class BSPM_EM_PostAnalyzer:
             target_freq=machine.mech_omega * machine.p / (2 * np.pi),
         )
 
-        state_out.conditions.em = post_processing
-
-        # define parameters for stator thermal
-        state_out.conditions.g_sy = post_processing["stator_iron_loss"] / V_sfe
-        state_out.conditions.g_th = post_processing["stator_iron_loss"] / V_sfe
-        state_out.conditions.Q_coil = post_processing["copper_loss"] / machine.Q
+        state_out = in_state.evolve(
+            em=post_processing,
+            # define parameters for stator thermal
+            g_sy=post_processing["stator_iron_loss"] / V_sfe,
+            g_th=post_processing["stator_iron_loss"] / V_sfe,
+            Q_coil=post_processing["copper_loss"] / machine.Q,
+        )
 
         print("\n************************ EM RESULT ************************")
         print("Torque = ", torque_avg, " Nm")
@@ -1,26 +1,26 @@
 import os
 import sys
 
-
-os.chdir(os.path.dirname(__file__))
-
 # add the directory 3 levels above this file's directory to path for module import
 sys.path.append(os.path.dirname(__file__)+"/../../..")
 sys.path.append(os.path.dirname(__file__)+"/../../../..")
 sys.path.append(os.path.dirname(__file__))
 
-from mach_eval import MachineEvaluator
+from mach_eval import ConcurrentMachineEvaluator
 from structural_step import struct_step
-from electromagnetic_step import em_step
+from electromagnetic_step import em_step, em_constraint_step
 from rotor_thermal_step import rotor_therm_step
 from stator_thermal_step import stator_therm_step
 from windage_loss_step import windage_step
 
 ############################ Create Evaluator ########################
-evaluator = MachineEvaluator(
+# the thermal steps only depend on the EM results, so the stator thermal step runs alongside the rotor thermal and
+# windage steps. The JMAG analyzer of the EM step initializes COM on the worker thread it runs on
+evaluator = ConcurrentMachineEvaluator(
     [
         struct_step,
         em_step,
+        em_constraint_step,
         rotor_therm_step,
         stator_therm_step,
         windage_step,
@@ -8,7 +8,8 @@ sys.path.append(os.path.dirname(__file__))
 from mach_eval.analyzers.electromagnetic.bspm import jmag_2d as em
 from mach_eval.analyzers.electromagnetic.bspm.jmag_2d_config import JMAG_2D_Config
 from bpsm_em_post_analyzer import BSPM_EM_PostAnalyzer
-from mach_eval import AnalysisStep, ProblemDefinition
+from em_constraints import em_results_valid
+from mach_eval import AnalysisStep, ConstraintStep, ProblemDefinition
 
 
 ############################ Define EMAnalysisStep ###########################
@@ -48,4 +49,22 @@ jmag_config = JMAG_2D_Config(
 )
 em_analysis = em.BSPM_EM_Analyzer(jmag_config)
 # define AnalysysStep for EM evaluation
-em_step = AnalysisStep(BSPM_EM_ProblemDefinition, em_analysis, BSPM_EM_PostAnalyzer)
+em_step = AnalysisStep(
+    BSPM_EM_ProblemDefinition,
+    em_analysis,
+    BSPM_EM_PostAnalyzer,
+    reads=("design",),
+    writes=("em", "g_sy", "g_th", "Q_coil"),
+)
+
+
+############################ Define EM constraints ###########################
+def em_constraints_satisfied(state):
+    """Checks the torque ripple, force errors, and FRW constraints of the BSPM design space"""
+    return em_results_valid(state.conditions.em)
+
+
+# ends the evaluation of designs violating the EM constraints before the thermal and windage steps
+em_constraint_step = ConstraintStep(
+    em_constraints_satisfied, "EM constraints violated", reads=("em",)
+)
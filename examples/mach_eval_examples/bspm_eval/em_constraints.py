@@ -0,0 +1,19 @@
+"""Limits on the electromagnetic performance of valid BSPM designs.
+
+The limits are shared by the EM constraint step of the BSPM evaluator and the design space of the BSPM optimization.
+"""
+
+torque_ripple_max = 0.5
+Em_max = 0.35
+Ea_max = 20
+FRW_min = 0.5
+
+
+def em_results_valid(em_results):
+    """Checks the torque ripple, force errors, and FRW of the EM results of a BSPM design against their limits"""
+    return not (
+        abs(em_results["torque_ripple"]) >= torque_ripple_max
+        or em_results["Em"] >= Em_max
+        or abs(em_results["Ea"]) > Ea_max
+        or em_results["FRW"] < FRW_min
+    )
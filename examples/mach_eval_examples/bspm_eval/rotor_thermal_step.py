@@ -1,10 +1,9 @@
 import os
 import sys
-from copy import deepcopy
 import numpy as np
 
 # add the directory 3 levels above this file's directory to path for module import
-sys.path.append(os.path.dirname(__file__)+"../../..")
+sys.path.append(os.path.dirname(__file__)+"/../../..")
 
 from mach_eval.analyzers.mechanical import rotor_thermal as therm
 from mach_eval import AnalysisStep, ProblemDefinition
@@ -64,14 +63,17 @@ class MyAirflowPostAnalyzer:
         if results["valid"] is False:
             raise InvalidDesign("Magnet temperature beyond limits")
         else:
-            state_out = deepcopy(in_state)
-            state_out.conditions.airflow = results
+            state_out = in_state.evolve(airflow=results)
         print("\nMagnet temperature = ", results["magnet Temp"][0], " degC")
         print("Required airflow = ", results["Required Airflow"][0], " m/s")
         return state_out
 
 
 rotor_therm_step = AnalysisStep(
-    MyAirflowProblemDef, therm.AirflowAnalyzer(), MyAirflowPostAnalyzer
+    MyAirflowProblemDef,
+    therm.AirflowAnalyzer(),
+    MyAirflowPostAnalyzer,
+    reads=("design", "em"),
+    writes=("airflow",),
 )
 
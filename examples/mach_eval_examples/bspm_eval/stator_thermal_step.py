@@ -1,10 +1,9 @@
 import os
 import sys
-from copy import deepcopy
 import numpy as np
 
 # add the directory 3 levels above this file's directory to path for module import
-sys.path.append(os.path.dirname(__file__)+"../../..")
+sys.path.append(os.path.dirname(__file__)+"/../../..")
 
 from mach_eval.analyzers.mechanical import thermal_stator as st_therm
 from mach_eval import AnalysisStep, ProblemDefinition
@@ -67,9 +66,10 @@ class MyStatorThermalPostAnalyzer:
         if results["Coil temperature"] > 300 == True:
             raise InvalidDesign("Coil temperature beyond limits")
         else:
-            stateOut = deepcopy(stateIn)
-            stateOut.conditions.T_coil = results["Coil temperature"]
-            stateOut.conditions.T_sy = results["Stator yoke temperature"]
+            stateOut = stateIn.evolve(
+                T_coil=results["Coil temperature"],
+                T_sy=results["Stator yoke temperature"],
+            )
 
         print("\nCoil temperature = ", results["Coil temperature"], " degC")
         print("Stator yoke temperature = ", results["Stator yoke temperature"], " degC")
@@ -80,4 +80,6 @@ stator_therm_step = AnalysisStep(
     MyThermalProblemDefinition,
     st_therm.StatorThermalAnalyzer(),
     MyStatorThermalPostAnalyzer,
+    reads=("design", "g_sy", "g_th", "Q_coil"),
+    writes=("T_coil", "T_sy"),
 )
@@ -1,12 +1,12 @@
 import os
 import sys
-from copy import deepcopy
+from copy import copy
 
 # add the directory 3 levels above this file's directory to path for module import
-sys.path.append(os.path.dirname(__file__)+"../../..")
+sys.path.append(os.path.dirname(__file__)+"/../../..")
 
 from mach_eval.analyzers.mechanical import rotor_structural as stra
-from mach_eval import AnalysisStep, ProblemDefinition
+from mach_eval import CachedAnalysisStep, ProblemDefinition
 from mach_opt import InvalidDesign
 
 
@@ -56,9 +56,29 @@ class MyStructPostAnalyzer:
             print("\n")
             machine = in_state.design.machine
             new_machine = machine.clone(dimensions_dict={"d_sl": results[0]})
-        state_out = deepcopy(in_state)
-        state_out.design.machine = new_machine
+        new_design = copy(in_state.design)
+        new_design.machine = new_machine
+        state_out = in_state.evolve(design=new_design)
         return state_out
 
 
-struct_step = AnalysisStep(MySleeveProblemDef, struct_ana, MyStructPostAnalyzer)
+# the sleeve design only depends on the rotor, so it is reused across designs which only differ in their stator. Sleeve
+# designs are cached in the run folder next to the EM results
+struct_step = CachedAnalysisStep(
+    MySleeveProblemDef,
+    struct_ana,
+    MyStructPostAnalyzer,
+    cache_dirpath=os.path.join(os.path.dirname(__file__), "run_data", "sleeve_cache"),
+    reads=(
+        "design.machine.r_sh",
+        "design.machine.r_ro",
+        "design.machine.d_m",
+        "design.machine.rotor_iron_mat",
+        "design.machine.magnet_mat",
+        "design.machine.rotor_sleeve_mat",
+        "design.machine.shaft_mat",
+        "design.settings.speed",
+        "design.settings.rotor_temp_rise",
+    ),
+    writes=("design",),
+)
@@ -1,10 +1,9 @@
 import os
 import sys
-from copy import deepcopy
 import numpy as np
 
 # add the directory 3 levels above this file's directory to path for module import
-sys.path.append(os.path.dirname(__file__)+"../../..")
+sys.path.append(os.path.dirname(__file__)+"/../../..")
 
 from mach_eval.analyzers.mechanical import windage_loss as wl
 from mach_eval import AnalysisStep, ProblemDefinition
@@ -29,9 +28,8 @@ class MyWindageLossPostAnalyzer:
     """Converts a State into a problem"""
 
     def get_next_state(results, in_state):
-        state_out = deepcopy(in_state)
-        omega = state_out.design.settings.speed * 2 * np.pi / 60
-        Pout = state_out.conditions.em["torque_avg"] * omega
+        omega = in_state.design.settings.speed * 2 * np.pi / 60
+        Pout = in_state.conditions.em["torque_avg"] * omega
         eff = (
             100
             * Pout
@@ -40,17 +38,21 @@ class MyWindageLossPostAnalyzer:
                 + results[0]
                 + results[1]
                 + results[2]
-                + state_out.conditions.em["copper_loss"]
-                + state_out.conditions.em["rotor_iron_loss"]
-                + state_out.conditions.em["stator_iron_loss"]
-                + state_out.conditions.em["magnet_loss"]
+                + in_state.conditions.em["copper_loss"]
+                + in_state.conditions.em["rotor_iron_loss"]
+                + in_state.conditions.em["stator_iron_loss"]
+                + in_state.conditions.em["magnet_loss"]
             )
         )
-        state_out.conditions.windage = {"loss": results, "efficiency": eff}
+        state_out = in_state.evolve(windage={"loss": results, "efficiency": eff})
         print("\nEfficiency = ", eff[0], " %")
         return state_out
 
 
 windage_step = AnalysisStep(
-    MyWindageProblemDef, wl.WindageLossAnalyzer, MyWindageLossPostAnalyzer
+    MyWindageProblemDef,
+    wl.WindageLossAnalyzer,
+    MyWindageLossPostAnalyzer,
+    reads=("design", "em", "airflow"),
+    writes=("windage",),
 )
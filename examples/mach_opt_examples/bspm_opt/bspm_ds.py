@@ -1,5 +1,12 @@
+import os
+import sys
 import numpy as np
 
+# add the directory 3 levels above this file's directory to path for module import
+sys.path.append(os.path.dirname(__file__)+"/../../..")
+
+from examples.mach_eval_examples.bspm_eval.em_constraints import em_results_valid
+
 
 class BSPMDesignSpace:
     def __init__(self, n_obj, bounds):
@@ -19,6 +26,8 @@ class BSPMDesignSpace:
     def get_objectives(self, full_results):
         valid_constraints = self.check_constraints(full_results)
         if not valid_constraints:
+            # only reached with evaluators without the EM constraint step of the BSPM evaluator, which ends the
+            # evaluation of such designs with InvalidDesign before they are scored or archived
             f1, f2, f3 = 9999, 9999, 9999  # bad fitness values
         else:
             final_results = full_results[-1]
@@ -52,8 +61,7 @@ class BSPMDesignSpace:
         final_results = full_results[-1]
         final_state = final_results[-1]
         em_results = final_state.conditions.em
-        if abs(em_results['torque_ripple']) >= 0.5 or em_results['Em'] >= 0.35 or abs(em_results['Ea']) > 20 or \
-                em_results['FRW'] < 0.5:
+        if not em_results_valid(em_results):
             print('Constraints are violated:')
             print('\t torque_ripple: ', em_results['torque_ripple'], ', Em: ', em_results['Em'],
                   ', Ea: ', em_results['Ea'], ', FRW: ', em_results['FRW'])
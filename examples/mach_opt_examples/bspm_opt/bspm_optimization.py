@@ -46,7 +46,7 @@ opt_settings = BSPMDesignSpace(3, bounds)
 path = os.path.dirname(__file__)
 arch_file = path + r"\opti_arch.pkl"  # specify file where archive data will reside
 des_file = path + r"\opti_designer.pkl"
-pop_file = path + r"\latest_pop.csv"  # csv file holding free variables of latest population
+pop_file = path + r"\latest_pop.pkl"  # checkpoint holding free variables and fitness of latest population
 dh = MyDataHandler(arch_file, des_file)  # initialize data handler with required file paths
 
 # create pygmo Problem
@@ -21,17 +21,18 @@ class MyDataHandler(mo.DataHandler):
                 print("Design is ", final_state.design.machine.name)
                 print(data.objs, Ea)
         
+    def get_design_name(self, design):
+        if design is None:
+            return None
+        return design.machine.name
+
     def get_design(self, name):
-        archive = self.load_from_archive()
-        i = 0
-        for data in archive:
+        for design_id in self.get_design_ids(name):
+            data = self.get_opti_data(design_id)
             if data.full_results is None:
                 continue
 
             final_state = data.full_results[-1][-1]
-            design = final_state.design
-            machine = design.machine
-            if machine.name == name:
-                return design
+            return final_state.design
         return None
                 
@@ -1,15 +1,19 @@
+import itertools
 import os
 import numpy as np
 import pandas as pd
-import sys
 from time import time as clock_time
 
 from mach_cad import model_obj as mo
-from mach_opt import InvalidDesign
+from ....mach_eval import InvalidDesign
 from mach_eval.analyzers.electromagnetic.stator_wdg_res import(
     StatorWindingResistanceProblem, StatorWindingResistanceAnalyzer
 )
 from mach_cad.tools import jmag as JMAG
+from ..com_thread import com_initialized
+
+# numbers the projects created by this process, so that concurrent evaluations never pick the same project name
+_project_counter = itertools.count()
 
 class SynR_EM_Problem:
     def __init__(self, machine, operating_point):
@@ -44,28 +48,61 @@ class SynR_EM_Problem:
 
 
 class SynR_EM_Analyzer:
+    """Analyzer running a 2D transient JMAG analysis of a SynR machine
+
+    The analyzer only holds the configuration. Each call to analyze evaluates the problem in its own SynR_EM_Context,
+    with COM initialized on the calling thread, so one analyzer can be shared by concurrent evaluations.
+    """
+
     def __init__(self, configuration):
         self.config = configuration
 
     def analyze(self, problem):
+        with com_initialized():
+            return SynR_EM_Context(self.config, problem).run()
+
+
+class SynR_EM_Context:
+    """State of a single SynR_EM_Analyzer analysis
+
+    Attributes:
+        config: SynR_EM_Config of the analysis.
+        machine_variant: SynR_Machine being analyzed.
+        operating_point: SynR_Machine_Oper_Pt being analyzed.
+        run_folder: Absolute path of the folder holding the JMAG project files.
+        jmag_csv_folder: Absolute path of the folder to which the JMAG results are exported.
+        project_name: Name of the JMAG project, set by run.
+        study_name: Name of the JMAG study, set by run.
+        design_results_folder: Absolute path of the folder holding the results of this design, set by run.
+    """
+
+    def __init__(self, configuration, problem):
+        self.config = configuration
         self.machine_variant = problem.machine
         self.operating_point = problem.operating_point
-        
+        self.run_folder = os.path.join(os.path.abspath(self.config.run_folder), "")
+        self.jmag_csv_folder = os.path.join(os.path.abspath(self.config.jmag_csv_folder), "")
+
+    def run(self):
         ####################################################
         # 01 Setting project name and output folder
         ####################################################
         
-        self.project_name = self.machine_variant.name
-        expected_project_file = self.config.run_folder + "%s.jproj" % self.project_name
+        # the process id and project number keep the names of concurrent evaluations in any process apart
+        self.project_name = "%s_%d_%d" % (self.machine_variant.name, os.getpid(), next(_project_counter))
+        expected_project_file = self.run_folder + "%s.jproj" % self.project_name
 
         # Create output folder
-        if not os.path.isdir(self.config.jmag_csv_folder):
-            os.makedirs(self.config.jmag_csv_folder)
+        os.makedirs(self.jmag_csv_folder, exist_ok=True)
+
+        toolJmag = JMAG.JmagDesigner()
+        toolJmag.visible = self.config.jmag_visible
 
         attempts = 1
         if os.path.exists(expected_project_file):
             print(
-                "JMAG project exists already, I will not delete it but create a new one with a different name instead."
+                "JMAG project exists already, I will not delete it but create a new one with a different name "
+                "instead."
             )
             attempts = 2
             temp_path = expected_project_file[
@@ -79,21 +116,19 @@ class SynR_EM_Analyzer:
 
             expected_project_file = temp_path
 
+        toolJmag.open(
+            comp_filepath=expected_project_file, length_unit="DimMillimeter", study_type="Transient2D"
+        )
+        toolJmag.save()
+
         if attempts > 1:
             self.project_name = self.project_name + "_attempts_%d" % (attempts)
 
-        toolJmag = JMAG.JmagDesigner()
-
-        toolJmag.visible = self.config.jmag_visible
-        toolJmag.open(comp_filepath=expected_project_file, length_unit="DimMillimeter", study_type="Transient2D")
-        toolJmag.save()
-
         self.study_name = self.project_name + "_Tran_SynR"
         self.design_results_folder = (
-            self.config.run_folder + "%s_results/" % self.project_name
+            self.run_folder + "%s_results/" % self.project_name
         )
-        if not os.path.isdir(self.design_results_folder):
-            os.makedirs(self.design_results_folder)
+        os.makedirs(self.design_results_folder, exist_ok=True)
 
         ################################################################
         # 02 Run Electromagnetic analysis
@@ -119,7 +154,7 @@ class SynR_EM_Analyzer:
             raise InvalidDesign
 
         # Create transient study with two time step sections
-        study = self.add_em_study(app, model, self.config.jmag_csv_folder, self.study_name)
+        study = self.add_em_study(app, model, self.jmag_csv_folder, self.study_name)
         self.create_custom_material(
             app, self.machine_variant.stator_iron_mat["core_material"]
         )
@@ -155,7 +190,7 @@ class SynR_EM_Analyzer:
         ####################################################
 
         fea_rated_output = self.extract_JMAG_results(
-            self.config.jmag_csv_folder, self.study_name
+            self.jmag_csv_folder, self.study_name
         )
 
         return fea_rated_output
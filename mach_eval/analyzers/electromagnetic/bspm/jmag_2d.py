@@ -1,17 +1,17 @@
 from time import time as clock_time
+import itertools
 import os
 import numpy as np
 import pandas as pd
-import sys
 
-from eMach.mach_eval.analyzers.electromagnetic.bspm.electrical_analysis import (
-    CrossSectInnerNotchedRotor as CrossSectInnerNotchedRotor,
-)
-from eMach.mach_eval.analyzers.electromagnetic.bspm.electrical_analysis import CrossSectStator as CrossSectStator
-from eMach.mach_eval.analyzers.electromagnetic.bspm.electrical_analysis.Location2D import Location2D
+from .electrical_analysis import CrossSectInnerNotchedRotor as CrossSectInnerNotchedRotor
+from .electrical_analysis import CrossSectStator as CrossSectStator
+from .electrical_analysis.Location2D import Location2D
+from ..com_thread import com_initialized
+from ....mach_eval import InvalidDesign
 
-sys.path.append(os.path.dirname(__file__) + "/../../../..")
-from mach_opt import InvalidDesign
+# numbers the projects created by this process, so that concurrent evaluations never pick the same project name
+_project_counter = itertools.count()
 
 
 class BSPM_EM_Problem:
@@ -33,22 +33,52 @@ class BSPM_EM_Problem:
 
 
 class BSPM_EM_Analyzer:
+    """Analyzer running a 2D transient JMAG analysis of a BSPM machine
+
+    The analyzer only holds the configuration. Each call to analyze evaluates the problem in its own BSPM_EM_Context,
+    with COM initialized on the calling thread, so one analyzer can be shared by concurrent evaluations.
+    """
+
     def __init__(self, configuration):
         self.config = configuration
 
     def analyze(self, problem):
+        with com_initialized():
+            return BSPM_EM_Context(self.config, problem).run()
+
+
+class BSPM_EM_Context:
+    """State of a single BSPM_EM_Analyzer analysis
+
+    Attributes:
+        config: JMAG_2D_Config of the analysis.
+        machine_variant: BSPM_Machine being analyzed.
+        operating_point: BSPM_Machine_Oper_Pt being analyzed.
+        run_folder: Absolute path of the folder holding the JMAG project files.
+        jmag_csv_folder: Absolute path of the folder to which the JMAG results are exported.
+        project_name: Name of the JMAG project, set by run.
+        study_name: Name of the JMAG study, set by run.
+        design_results_folder: Absolute path of the folder holding the results of this design, set by run.
+    """
+
+    def __init__(self, configuration, problem):
+        self.config = configuration
         self.machine_variant = problem.machine
         self.operating_point = problem.operating_point
+        self.run_folder = os.path.join(os.path.abspath(self.config.run_folder), "")
+        self.jmag_csv_folder = os.path.join(os.path.abspath(self.config.jmag_csv_folder), "")
+
+    def run(self):
         ####################################################
         # 01 Setting project name and output folder
         ####################################################
-        self.project_name = self.machine_variant.name
+        # the process id and project number keep the names of concurrent evaluations in any process apart
+        self.project_name = "%s_%d_%d" % (self.machine_variant.name, os.getpid(), next(_project_counter))
 
-        expected_project_file = self.config.run_folder + "%s.jproj" % self.project_name
+        expected_project_file = self.run_folder + "%s.jproj" % self.project_name
 
         # Create output folder
-        if not os.path.isdir(self.config.jmag_csv_folder):
-            os.makedirs(self.config.jmag_csv_folder)
+        os.makedirs(self.jmag_csv_folder, exist_ok=True)
 
         from .electrical_analysis.JMAG import JMAG
 
@@ -59,10 +89,9 @@ class BSPM_EM_Analyzer:
 
         self.study_name = self.project_name + "TranPMSM"
         self.design_results_folder = (
-            self.config.run_folder + "%sresults/" % self.project_name
+            self.run_folder + "%sresults/" % self.project_name
         )
-        if not os.path.isdir(self.design_results_folder):
-            os.makedirs(self.design_results_folder)
+        os.makedirs(self.design_results_folder, exist_ok=True)
         ################################################################
         # 02 Run ElectroMagnetic analysis
         ################################################################
@@ -83,7 +112,7 @@ class BSPM_EM_Analyzer:
         if not valid_design:
             raise InvalidDesign
         study = self.add_magnetic_transient_study(
-            app, model, self.config.jmag_csv_folder, self.study_name
+            app, model, self.jmag_csv_folder, self.study_name
         )  # Change here and there
         self.mesh_study(app, model, study)
         self.run_study(app, study, clock_time())
@@ -93,7 +122,7 @@ class BSPM_EM_Analyzer:
             ref1 = app.GetDataManager().GetDataSet("Circuit Voltage")
             app.GetDataManager().CreateGraphModel(ref1)
             app.GetDataManager().GetGraphModel("Circuit Voltage").WriteTable(
-                self.config.jmag_csv_folder
+                self.jmag_csv_folder
                 + self.study_name
                 + "_EXPORT_CIRCUIT_VOLTAGE.csv"
             )
@@ -103,7 +132,7 @@ class BSPM_EM_Analyzer:
         ####################################################
 
         fea_rated_output = self.extract_JMAG_results(
-            self.config.jmag_csv_folder, self.study_name
+            self.jmag_csv_folder, self.study_name
         )
 
         return fea_rated_output
@@ -0,0 +1,28 @@
+"""COM initialization of threads controlling JMAG"""
+
+from contextlib import contextmanager
+
+try:
+    import pythoncom
+except ImportError:  # pywin32 is only available on Windows
+    pythoncom = None
+
+__all__ = ["com_initialized"]
+
+
+@contextmanager
+def com_initialized():
+    """Initializes COM on the calling thread for the duration of the context.
+
+    JMAG is controlled through COM, which has to be initialized on every thread creating COM objects. Importing
+    pythoncom only initializes the main thread, so analyzers run by the worker threads of a ConcurrentMachineEvaluator
+    initialize COM themselves. Without pywin32, the context does nothing.
+    """
+    if pythoncom is None:
+        yield
+        return
+    pythoncom.CoInitialize()
+    try:
+        yield
+    finally:
+        pythoncom.CoUninitialize()
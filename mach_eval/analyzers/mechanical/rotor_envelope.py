@@ -0,0 +1,316 @@
+import bisect
+
+import numpy as np
+
+from .rotor_structural import (
+    SPM_RotorStructuralProblem,
+    MultiLayer_RotorStructuralProblem,
+    MultiLayer_RotorStructuralAnalyzer,
+)
+
+# stress constraints of a sleeved rotor, in the order of the margins of SPM_RotorEnvelopeAnalyzer
+CONSTRAINTS = ("rad_sleeve", "contact_pressure", "tan_sleeve", "rad_magnets", "tan_magnets")
+
+
+class SPM_RotorEnvelopeProblem:
+    """Problem class for SPM_RotorEnvelopeAnalyzer.
+
+    Describes a rotor of fixed dimensions and sleeve thickness, whose safe speeds are mapped over a grid of temperature
+    rises and sleeve undersizes. The stresses are calculated by MultiLayer_RotorStructuralAnalyzer, which accounts for
+    the centrifugal displacement at every interface of the rotor, rather than by SPM_RotorStructuralAnalyzer, which
+    leaves it out at the core-magnet and magnet-sleeve interfaces and hence misjudges the stresses at high speeds.
+
+    Attributes:
+        r_sh (float): Shaft outer radius [m].
+        d_m (float): Magnet Thickness [m].
+        r_ro (float): Outer Rotor Radius [m].
+        d_sl (float): Sleeve Thickness [m].
+        mat_dict (dict): Material Dictionary.
+        deltaT (np.ndarray): Sorted grid values of the temperature rise [K].
+        delta_sl (np.ndarray): Sorted grid values of the sleeve undersize [m].
+        N_max (float): Highest speed searched [RPM].
+        min_contact_pressure (float): Contact pressure between the sleeve and magnets which must be retained [Pa].
+        components (list): Shaft, rotor core, magnets, and sleeve RotorComponent objects.
+    """
+
+    def __init__(
+        self,
+        r_sh: float,
+        d_m: float,
+        r_ro: float,
+        d_sl: float,
+        mat_dict: dict,
+        deltaT,
+        delta_sl,
+        N_max: float,
+        min_contact_pressure: float = 0,
+        problem_class=MultiLayer_RotorStructuralProblem,
+        analyzer_class=MultiLayer_RotorStructuralAnalyzer,
+    ):
+        """__init__ definition for SPM_RotorEnvelopeProblem class
+
+        Args:
+            r_sh (float): Shaft outer radius [m].
+            d_m (float): Magnet Thickness [m].
+            r_ro (float): Outer Rotor Radius [m].
+            d_sl (float): Sleeve Thickness [m].
+            mat_dict (dict): Material Dictionary.
+            deltaT: Grid values of the temperature rise [K].
+            delta_sl: Grid values of the sleeve undersize [m].
+            N_max (float): Highest speed searched [RPM].
+            min_contact_pressure (float): Contact pressure which must be retained [Pa].
+            problem_class: Structural problem class with the signature of MultiLayer_RotorStructuralProblem, whose
+                inputs may be numpy arrays.
+            analyzer_class: Structural analyzer class, which must provide analyze_batch.
+        """
+
+        self.r_sh = r_sh
+        self.d_m = d_m
+        self.r_ro = r_ro
+        self.d_sl = d_sl
+        self.mat_dict = mat_dict
+        self.deltaT = np.unique(np.atleast_1d(np.asarray(deltaT, dtype=float)))
+        self.delta_sl = np.unique(np.atleast_1d(np.asarray(delta_sl, dtype=float)))
+        self.N_max = N_max
+        self.min_contact_pressure = min_contact_pressure
+        self.problem_class = problem_class
+        self.analyzer_class = analyzer_class
+        # the components only depend on the dimensions and materials, not on the operating point
+        spm = SPM_RotorStructuralProblem(r_sh, d_m, r_ro, d_sl, 0, 0, 0, mat_dict)
+        self.components = [spm.sh, spm.rc, spm.pm, spm.sl]
+
+    def stresses(self, N, deltaT, delta_sl) -> np.ndarray:
+        """Calculate the critical stresses of the rotor at once for arrays of operating points
+
+        Args:
+            N: Rotational speeds [RPM].
+            deltaT: Temperature rises [K].
+            delta_sl: Sleeve undersizes [m].
+
+        Returns:
+            stresses (np.ndarray): rad_sleeve, tan_sleeve, rad_magnet, and tan_magnet stresses, at the radii checked by
+                SPM_RotorSleeveProblem, of shape broadcast shape of the inputs + (4,).
+        """
+
+        problem = self.problem_class(self.components, deltaT, N, [0, 0, delta_sl])
+        sigmas = self.analyzer_class().analyze_batch(problem)
+        shape = np.broadcast_shapes(np.shape(N), np.shape(deltaT), np.shape(delta_sl))
+        r_pm = self.r_ro - self.d_m
+        stresses = [
+            sigmas[3].radial(self.r_ro),
+            sigmas[3].tangential(self.r_ro),
+            sigmas[2].radial(r_pm),
+            sigmas[2].tangential(r_pm),
+        ]
+        return np.stack([np.broadcast_to(stress, shape) for stress in stresses], axis=-1)
+
+
+class SPM_RotorEnvelopeAnalyzer:
+    """Analyzer mapping the safe operating envelope of a sleeved rotor
+
+    For every temperature rise and sleeve undersize of the problem grid, the range of speeds over which all stress
+    constraints of SPM_RotorSleeveAnalyzer are met, and the sleeve retains the minimum contact pressure, is found.
+    The stresses are first sampled at speeds evenly spaced in the square of the speed, and the speeds at which the
+    smallest constraint margin changes sign are then refined together by the Illinois variant of regula falsi on the
+    square of the speed. As the stresses are affine in the square of the speed, the refinement usually converges in a
+    single iteration.
+
+    Attributes:
+        stress_limits: list of limits for critical stresses
+        n_samples (int): Number of speeds at which the stresses are sampled.
+        tol (float): Tolerance of the square of the speed, relative to the square of N_max of the problem.
+        max_iter (int): Largest number of regula falsi iterations.
+    """
+
+    def __init__(self, stress_limits: dict, n_samples=17, tol=1e-9, max_iter=50):
+        self.stress_limits = stress_limits
+        self.n_samples = n_samples
+        self.tol = tol
+        self.max_iter = max_iter
+
+    def analyze(self, problem: "SPM_RotorEnvelopeProblem") -> "SPM_RotorEnvelope":
+        """Maps the safe operating envelope of a rotor
+
+        Args:
+            problem (SPM_RotorEnvelopeProblem): input problem
+
+        Returns:
+            envelope (SPM_RotorEnvelope): safe speeds of every temperature rise and sleeve undersize of the grid
+        """
+
+        deltaT = problem.deltaT[:, np.newaxis]
+        delta_sl = problem.delta_sl[np.newaxis, :]
+        omega2_max = _omega2(problem.N_max)
+        omega2 = np.linspace(0, omega2_max, self.n_samples)
+        g = self.margins(problem, _speed(omega2), deltaT[..., np.newaxis], delta_sl[..., np.newaxis]).min(axis=-1)
+
+        feasible = g >= 0
+        any_feasible = feasible.any(axis=-1)
+        first = np.argmax(feasible, axis=-1)
+        beyond = ~feasible & (np.arange(self.n_samples) > first[..., np.newaxis])
+        has_end = any_feasible & beyond.any(axis=-1)
+        end = np.argmax(beyond, axis=-1)
+
+        omega2_min_safe = np.where(any_feasible, 0.0, np.nan)
+        omega2_max_safe = np.where(any_feasible, omega2_max, np.nan)
+        starts = any_feasible & (first > 0)
+        for mask, upper, omega2_safe in ((starts, first, omega2_min_safe), (has_end, end, omega2_max_safe)):
+            i, j = np.nonzero(mask)
+            k = upper[i, j]
+            omega2_safe[i, j] = self._find_roots(
+                problem, omega2[k - 1], omega2[k], g[i, j, k - 1], g[i, j, k], deltaT[i, 0], delta_sl[0, j]
+            )
+
+        N_min = _speed(omega2_min_safe)
+        N_max = _speed(omega2_max_safe)
+        # the contact pressure is monotonic in the square of the speed, so its smallest value over the safe speeds is
+        # found at one of their ends
+        ends = np.nan_to_num(np.stack([N_min, N_max], axis=-1))
+        stresses = problem.stresses(ends, deltaT[..., np.newaxis], delta_sl[..., np.newaxis])
+        contact_pressure = np.where(any_feasible, -stresses[..., 0].max(axis=-1), np.nan)
+        limit = np.where(has_end, np.argmin(self._margins(problem, stresses[..., 1, :]), axis=-1), -1)
+        return SPM_RotorEnvelope(problem.deltaT, problem.delta_sl, N_min, N_max, contact_pressure, limit, problem.N_max)
+
+    def margins(self, problem: "SPM_RotorEnvelopeProblem", N, deltaT, delta_sl) -> np.ndarray:
+        """Calculate the margin of every stress constraint, which is negative where the constraint is violated
+
+        Args:
+            problem (SPM_RotorEnvelopeProblem): input problem
+            N: Rotational speeds [RPM].
+            deltaT: Temperature rises [K].
+            delta_sl: Sleeve undersizes [m].
+
+        Returns:
+            margins (np.ndarray): margins of the constraints in the order of CONSTRAINTS [Pa], of shape broadcast
+                shape of the inputs + (5,).
+        """
+
+        return self._margins(problem, problem.stresses(N, deltaT, delta_sl))
+
+    def _margins(self, problem: "SPM_RotorEnvelopeProblem", stresses: np.ndarray) -> np.ndarray:
+        return np.stack(
+            [
+                stresses[..., 0] - self.stress_limits["rad_sleeve"],
+                -problem.min_contact_pressure - stresses[..., 0],
+                self.stress_limits["tan_sleeve"] - stresses[..., 1],
+                self.stress_limits["rad_magnets"] - stresses[..., 2],
+                self.stress_limits["tan_magnets"] - stresses[..., 3],
+            ],
+            axis=-1,
+        )
+
+    def _find_roots(self, problem, a, b, g_a, g_b, deltaT, delta_sl):
+        """Finds the square of the speed at which the smallest margin changes sign within brackets [a, b]"""
+        xtol = self.tol * _omega2(problem.N_max)
+        done = np.zeros(np.shape(a), dtype=bool)
+        for _ in range(self.max_iter):
+            if np.all(done):
+                break
+            with np.errstate(divide="ignore", invalid="ignore"):
+                c = np.where(done, b, b - g_b * (b - a) / (g_b - g_a))
+            g_c = self.margins(problem, _speed(c), deltaT, delta_sl).min(axis=-1)
+            crossed = np.sign(g_c) != np.sign(g_b)
+            # the end point which is kept twice in a row has its margin halved, so that the bracket shrinks from both
+            # sides
+            a, g_a = np.where(crossed, b, a), np.where(crossed, g_b, g_a / 2)
+            b, g_b = c, g_c
+            done = done | (g_c == 0) | (np.abs(b - a) <= xtol)
+        return b
+
+
+class SPM_RotorEnvelope:
+    """Safe operating envelope of a sleeved rotor over a grid of temperature rises and sleeve undersizes
+
+    The safe speeds between the grid nodes are obtained by bilinear interpolation of the square of the lowest and
+    highest safe speeds. As the stresses calculated by MultiLayer_RotorStructuralAnalyzer are affine in the square of the
+    speed, the temperature rise, and the undersize, the square of the highest safe speed is a concave function of the
+    temperature rise and undersize, and the square of the lowest safe speed a convex one. The interpolated safe speeds
+    are therefore never outside of the actual ones.
+
+    Attributes:
+        deltaT (np.ndarray): Grid values of the temperature rise [K].
+        delta_sl (np.ndarray): Grid values of the sleeve undersize [m].
+        N_min (np.ndarray): Lowest safe speed of every node [RPM], NaN where no speed is safe.
+        N_max (np.ndarray): Highest safe speed of every node [RPM], the burst speed of the rotor unless it equals
+            N_bound. NaN where no speed is safe.
+        contact_pressure (np.ndarray): Smallest contact pressure between the sleeve and magnets over the safe speeds of
+            every node [Pa].
+        limit (np.ndarray): Index in CONSTRAINTS of the constraint limiting the highest safe speed of every node, -1
+            if the highest safe speed is N_bound or no speed is safe.
+        N_bound (float): Highest speed searched [RPM].
+    """
+
+    def __init__(self, deltaT, delta_sl, N_min, N_max, contact_pressure, limit, N_bound):
+        self.deltaT = np.asarray(deltaT, dtype=float)
+        self.delta_sl = np.asarray(delta_sl, dtype=float)
+        self.N_min = np.asarray(N_min, dtype=float)
+        self.N_max = np.asarray(N_max, dtype=float)
+        self.contact_pressure = np.asarray(contact_pressure, dtype=float)
+        self.limit = np.asarray(limit, dtype=int)
+        self.N_bound = N_bound
+        # queries are answered with python floats and lists, which are faster than numpy for single values
+        self._axes = (self.deltaT.tolist(), self.delta_sl.tolist())
+        self._N_min2 = (self.N_min ** 2).tolist()
+        self._N_max2 = (self.N_max ** 2).tolist()
+        self._contact_pressure = self.contact_pressure.tolist()
+
+    def speed_range(self, deltaT: float, delta_sl: float):
+        """Safe speeds of an operating point
+
+        Args:
+            deltaT (float): Temperature rise [K].
+            delta_sl (float): Sleeve undersize [m].
+
+        Returns:
+            speeds: tuple of the lowest and highest safe speeds [RPM], or None if the operating point is outside of the
+                grid or in a grid cell where some node has no safe speed.
+        """
+
+        N_min2 = self._interpolate(self._N_min2, deltaT, delta_sl)
+        N_max2 = self._interpolate(self._N_max2, deltaT, delta_sl)
+        if N_min2 is None or N_max2 is None or N_min2 > N_max2:
+            return None
+        return N_min2 ** 0.5, N_max2 ** 0.5
+
+    def is_safe(self, N: float, deltaT: float, delta_sl: float) -> bool:
+        """True if the rotor meets every stress constraint at an operating point"""
+
+        speeds = self.speed_range(deltaT, delta_sl)
+        return speeds is not None and speeds[0] <= N <= speeds[1]
+
+    def min_contact_pressure(self, deltaT: float, delta_sl: float):
+        """Smallest contact pressure over the safe speeds of an operating point [Pa], None outside of the grid"""
+
+        return self._interpolate(self._contact_pressure, deltaT, delta_sl)
+
+    def _interpolate(self, values: list, deltaT: float, delta_sl: float):
+        cell = []
+        for axis, value in zip(self._axes, (deltaT, delta_sl)):
+            if len(axis) == 1:
+                if value != axis[0]:
+                    return None
+                cell.append((0, 0, 0.0))
+                continue
+            if value < axis[0] or value > axis[-1]:
+                return None
+            i = min(bisect.bisect_right(axis, value) - 1, len(axis) - 2)
+            cell.append((i, i + 1, (value - axis[i]) / (axis[i + 1] - axis[i])))
+        (i0, i1, u), (j0, j1, v) = cell
+        result = (
+            (1 - u) * (1 - v) * values[i0][j0]
+            + (1 - u) * v * values[i0][j1]
+            + u * (1 - v) * values[i1][j0]
+            + u * v * values[i1][j1]
+        )
+        # NaN nodes, where no speed is safe, spread to the whole cell
+        if result != result:
+            return None
+        return result
+
+
+def _omega2(N):
+    return (N * 2 * np.pi / 60) ** 2
+
+
+def _speed(omega2):
+    return np.sqrt(omega2) * 60 / (2 * np.pi)
@@ -0,0 +1,262 @@
+import contextlib
+import io
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .rotor_structural import SPM_RotorSleeveProblem, SPM_RotorSleeveAnalyzer
+
+# inputs of the table, in the order of its axes
+TABLE_INPUTS = ("r_sh", "d_m", "r_ro", "N", "deltaT")
+# stress limits in the order of SPM_RotorSleeveProblem.constraint_values
+_STRESS_LIMIT_KEYS = ("rad_sleeve", "tan_sleeve", "rad_magnets", "tan_magnets")
+# sleeve thickness below which a sleeve design is considered to be at its lower bound [m]
+MIN_THICKNESS = 1e-9
+
+
+class SPM_RotorSleeveTable:
+    """Precomputed map of the thinnest sleeve design over a grid of rotor dimensions and operating points.
+
+    The sleeve thickness and undersize found by SPM_RotorSleeveAnalyzer are stored at every node of a regular grid of
+    r_sh, d_m, r_ro, N, and deltaT, for a fixed material dictionary and set of stress limits. Designs between the nodes
+    are obtained by multilinear interpolation. The interpolation error of each node is estimated from the second
+    differences of the stored designs along every axis, as the error of linear interpolation over an interval is
+    bounded by an eighth of the second difference of its end points for a smooth function.
+
+    Attributes:
+        axes (list): Sorted grid values of each input, in the order of TABLE_INPUTS. An axis may hold a
+            single value, in which case the table only applies to that value.
+        d_sl (np.ndarray): Sleeve thickness at each node [m], NaN where no valid sleeve exists.
+        delta_sl (np.ndarray): Sleeve undersize at each node [m], NaN where no valid sleeve exists.
+        error (np.ndarray): Estimated interpolation error bound of the sleeve thickness near each node [m].
+        error_delta (np.ndarray): Estimated interpolation error bound of the sleeve undersize near each node [m].
+        mat_dict (dict): Material dictionary of the table.
+        stress_limits (dict): Stress limits of the table.
+    """
+
+    def __init__(self, axes, d_sl, delta_sl, mat_dict, stress_limits):
+        self.axes = [np.asarray(axis, dtype=float) for axis in axes]
+        self.d_sl = np.asarray(d_sl, dtype=float)
+        self.delta_sl = np.asarray(delta_sl, dtype=float)
+        self.mat_dict = mat_dict
+        self.stress_limits = stress_limits
+        self.error = _interpolation_error(self.d_sl)
+        self.error_delta = _interpolation_error(self.delta_sl)
+
+    @classmethod
+    def build(
+        cls,
+        mat_dict: dict,
+        stress_limits: dict,
+        r_sh,
+        d_m,
+        r_ro,
+        N,
+        deltaT,
+        n_workers=None,
+    ) -> "SPM_RotorSleeveTable":
+        """Designs the sleeve of every node of a grid
+
+        Args:
+            mat_dict (dict): Material Dictionary.
+            stress_limits (dict): Stress limits of SPM_RotorSleeveAnalyzer.
+            r_sh: Grid values of the shaft radius [m].
+            d_m: Grid values of the magnet thickness [m].
+            r_ro: Grid values of the outer rotor radius [m].
+            N: Grid values of the rotational speed [RPM].
+            deltaT: Grid values of the temperature rise [K].
+            n_workers (int): Number of worker processes designing sleeves in parallel. Sleeves are designed in the
+                calling process if None.
+
+        Returns:
+            table (SPM_RotorSleeveTable): table of the sleeve designs
+        """
+
+        axes = [np.unique(np.atleast_1d(np.asarray(values, dtype=float))) for values in (r_sh, d_m, r_ro, N, deltaT)]
+        shape = tuple(len(axis) for axis in axes)
+        nodes = [
+            (mat_dict, stress_limits) + tuple(float(value) for value in point)
+            for point in itertools.product(*axes)
+        ]
+        if n_workers is None:
+            designs = [_design_sleeve(node) for node in nodes]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                designs = list(pool.map(_design_sleeve, nodes, chunksize=max(1, len(nodes) // (4 * n_workers))))
+        designs = np.array(designs).reshape(shape + (2,))
+        return cls(axes, designs[..., 0], designs[..., 1], mat_dict, stress_limits)
+
+    def save(self, filepath: str):
+        """Saves the table to a compressed numpy file"""
+
+        np.savez_compressed(
+            filepath,
+            d_sl=self.d_sl,
+            delta_sl=self.delta_sl,
+            metadata=json.dumps({"mat_dict": self.mat_dict, "stress_limits": self.stress_limits}),
+            **{"axis_" + name: axis for name, axis in zip(TABLE_INPUTS, self.axes)},
+        )
+
+    @classmethod
+    def load(cls, filepath: str) -> "SPM_RotorSleeveTable":
+        """Loads a table saved with save"""
+
+        with np.load(filepath) as data:
+            metadata = json.loads(str(data["metadata"]))
+            axes = [data["axis_" + name] for name in TABLE_INPUTS]
+            return cls(axes, data["d_sl"], data["delta_sl"], metadata["mat_dict"], metadata["stress_limits"])
+
+    def matches(self, mat_dict: dict, stress_limits: dict) -> bool:
+        """True if a material dictionary and stress limits are those of the table"""
+
+        if stress_limits is not None and stress_limits != self.stress_limits:
+            return False
+        return all(key in mat_dict and mat_dict[key] == value for key, value in self.mat_dict.items())
+
+    def interpolate(self, r_sh, d_m, r_ro, N, deltaT):
+        """Interpolates the sleeve design of a rotor
+
+        Args:
+            r_sh (float): shaft radius.
+            d_m (float): Magnet thickness.
+            r_ro (float): Outer rotor radius.
+            N (float): Rotational speed RPM.
+            deltaT (float): Temperature rise.
+
+        Returns:
+            design: tuple of the sleeve thickness, sleeve undersize, and the estimated error bounds of each, or None if
+                the rotor is outside of the table or in a grid cell where a valid sleeve does not exist at every node.
+        """
+
+        indices = []
+        weights = []
+        for axis, value in zip(self.axes, (r_sh, d_m, r_ro, N, deltaT)):
+            if len(axis) == 1:
+                if not np.isclose(value, axis[0], rtol=1e-12, atol=0):
+                    return None
+                indices.append((0, 0))
+                weights.append(0.0)
+                continue
+            if value < axis[0] or value > axis[-1]:
+                return None
+            i = min(int(np.searchsorted(axis, value, side="right")) - 1, len(axis) - 2)
+            indices.append((i, i + 1))
+            weights.append((value - axis[i]) / (axis[i + 1] - axis[i]))
+
+        d_sl = 0.0
+        delta_sl = 0.0
+        error = 0.0
+        error_delta = 0.0
+        at_bound = set()
+        for corner in itertools.product((0, 1), repeat=len(self.axes)):
+            node = tuple(index[c] for index, c in zip(indices, corner))
+            if np.isnan(self.d_sl[node]):
+                # the cell crosses the boundary of the feasible designs, where the map is not smooth
+                return None
+            at_bound.add(bool(self.d_sl[node] <= MIN_THICKNESS))
+            if len(at_bound) > 1:
+                # the cell crosses the designs where the sleeve is no longer needed, where the map has a kink
+                return None
+            weight = np.prod([w if c else 1 - w for w, c in zip(weights, corner)])
+            d_sl = d_sl + weight * self.d_sl[node]
+            delta_sl = delta_sl + weight * self.delta_sl[node]
+            error = max(error, self.error[node])
+            error_delta = max(error_delta, self.error_delta[node])
+        return d_sl, delta_sl, error, error_delta
+
+
+class SPM_RotorSleeveTableAnalyzer:
+    """Analyzer for designing a rotor sleeve from a SPM_RotorSleeveTable
+
+    Sleeve designs are interpolated from the table when the problem lies within it and the estimated error bounds of
+    the sleeve thickness and undersize are below tol. An interpolated design is only returned if one evaluation of its
+    stresses finds them within the stress limits. Otherwise, including for problems with a different material
+    dictionary, and near the boundary of the feasible designs, the sleeve is designed by SPM_RotorSleeveAnalyzer.
+
+    Attributes:
+        table (SPM_RotorSleeveTable): table of sleeve designs.
+        stress_limits: list of limits for critical stresses, the limits of the table by default.
+        tol (float): Largest accepted error bound of the interpolated sleeve thickness and undersize [m].
+        stress_rtol (float): Largest accepted excess of the stresses of an interpolated design over their limits,
+            relative to the largest magnitude of the stress limits.
+        hits (int): Number of sleeves interpolated from the table.
+        fallbacks (int): Number of sleeves designed by SPM_RotorSleeveAnalyzer.
+    """
+
+    def __init__(self, table: "SPM_RotorSleeveTable", stress_limits=None, tol=1e-5, stress_rtol=1e-4):
+        self.table = table
+        self.stress_limits = table.stress_limits if stress_limits is None else stress_limits
+        self.tol = tol
+        self.stress_rtol = stress_rtol
+        self.hits = 0
+        self.fallbacks = 0
+
+    def analyze(self, problem: "SPM_RotorSleeveProblem"):
+        """ analyzes input problem to design optimal rotor sleeve
+
+        Args:
+            problem (SPM_RotorSleeveProblem): input problem
+
+        Returns:
+            sol: solution from design problem, as returned by SPM_RotorSleeveAnalyzer
+        """
+
+        design = None
+        if self.table.matches(problem.mat_dict, self.stress_limits):
+            design = self.table.interpolate(problem.r_sh, problem.d_m, problem.r_ro, problem.N, problem.deltaT)
+        if design is not None and max(design[2], design[3]) <= self.tol:
+            sol = np.array(design[:2])
+            if self._within_limits(problem.constraint_values(sol)):
+                self.hits = self.hits + 1
+                return sol
+        self.fallbacks = self.fallbacks + 1
+        return SPM_RotorSleeveAnalyzer(self.stress_limits).analyze(problem)
+
+    def _within_limits(self, values) -> bool:
+        """True if the constraint stresses of a design are within the stress limits of SPM_RotorSleeveAnalyzer"""
+
+        limits = np.array([self.stress_limits[key] for key in _STRESS_LIMIT_KEYS])
+        atol = self.stress_rtol * np.max(np.abs(limits))
+        # the radial sleeve stress is bounded on both sides, as in SPM_RotorSleeveAnalyzer
+        if values[0] < limits[0] - atol or values[0] > atol:
+            return False
+        return bool(np.all(values[1:] <= limits[1:] + atol))
+
+
+def _design_sleeve(node):
+    """Designs the sleeve of a grid node, returning NaN values if no valid sleeve exists"""
+    mat_dict, stress_limits, r_sh, d_m, r_ro, N, deltaT = node
+    problem = SPM_RotorSleeveProblem(r_sh, d_m, r_ro, deltaT, mat_dict, N)
+    # the exact analyzer prints every solution, which is not useful for thousands of nodes
+    with contextlib.redirect_stdout(io.StringIO()):
+        sol = SPM_RotorSleeveAnalyzer(stress_limits).analyze(problem)
+    if sol is False:
+        return [np.nan, np.nan]
+    return [float(sol[0]), float(sol[1])]
+
+
+def _interpolation_error(values: np.ndarray) -> np.ndarray:
+    """Estimates the linear interpolation error bound near each node from second differences along every axis"""
+    error = np.zeros(values.shape)
+    for axis in range(values.ndim):
+        n = values.shape[axis]
+        if n == 1:
+            # a single valued axis is never interpolated along
+            continue
+        if n == 2:
+            # the curvature along an axis of two nodes is unknown, so the error cannot be bounded
+            error = error + np.inf
+            continue
+        lower = np.take(values, range(0, n - 2), axis=axis)
+        center = np.take(values, range(1, n - 1), axis=axis)
+        upper = np.take(values, range(2, n), axis=axis)
+        second_difference = np.abs(lower - 2 * center + upper) / 8
+        # the end nodes take the estimate of their neighbour
+        first = np.take(second_difference, [0], axis=axis)
+        last = np.take(second_difference, [-1], axis=axis)
+        second_difference = np.concatenate([first, second_difference, last], axis=axis)
+        error = error + second_difference
+    # nodes next to infeasible designs have no estimate, and are never interpolated
+    return np.nan_to_num(error, nan=np.inf, posinf=np.inf)
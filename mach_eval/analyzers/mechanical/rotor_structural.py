@@ -1,11 +1,17 @@
 import numpy as np
+import scipy.linalg as la
 import scipy.optimize as op
+from types import SimpleNamespace
 from typing import Tuple, List
 
 
 class SPM_RotorStructuralProblem:
     """Problem class for SPM_RotorStructuralAnalyzer.
 
+    The dimensions, operating point, and values of mat_dict may also be numpy arrays of broadcastable shapes, such as
+    the radii of many rotor candidates or a grid of speeds and temperature rises. Such problems are solved at once by
+    SPM_RotorStructuralAnalyzer.analyze_batch.
+
     Attributes:
         sh (RotorComponent): Shaft RotorComponent object.
         rc (RotorComponent): Rotor core RotorComponent object.
@@ -157,6 +163,74 @@ class SPM_RotorStructuralAnalyzer:
 
         return (sigma_sh, sigma_rc, sigma_pm, sigma_sl)
 
+    def analyze_batch(
+        self, problem: "SPM_RotorStructuralProblem"
+    ) -> Tuple["Sigma", "Sigma", "Sigma", "Sigma"]:
+        """Analyze a structural problem with array valued inputs
+
+        The systems of equations of every element of the broadcast inputs are assembled into one stacked array and
+        solved with a single call to np.linalg.solve.
+
+        Args:
+            problem (SPM_RotorStructuralProblem): problem for analyzer, whose inputs broadcast to a batch shape.
+
+        Returns:
+            results (['Sigma','Sigma','Sigma','Sigma']): Sigma objects whose stresses have the batch shape. Radii
+                passed to them must broadcast against the batch shape, e.g. have shape (m,) + batch shape to evaluate
+                m radii of every element.
+        """
+
+        sh = problem.sh
+        rc = problem.rc
+        pm = problem.pm
+        sl = problem.sl
+        deltaT = problem.deltaT
+        omega = problem.omega
+
+        K, X = self.DetermineSystem(sh, rc, pm, sl, deltaT, omega)
+        A = np.linalg.solve(K, X[..., np.newaxis])[..., 0]
+        sigma_sh = Sigma(sh, [A[..., 0], 0], omega, deltaT)
+        sigma_rc = Sigma(rc, [A[..., 1], A[..., 2]], omega, deltaT)
+        sigma_pm = Sigma(pm, [A[..., 3], A[..., 4]], omega, deltaT)
+        sigma_sl = Sigma(sl, [A[..., 5], A[..., 6]], omega, deltaT)
+
+        return (sigma_sh, sigma_rc, sigma_pm, sigma_sl)
+
+    def analyze_many(
+        self, problems: "List[SPM_RotorStructuralProblem]"
+    ) -> "List[Tuple[Sigma, Sigma, Sigma, Sigma]]":
+        """Analyze several structural problems with a single batched solve
+
+        Args:
+            problems (List[SPM_RotorStructuralProblem]): problems for analyzer.
+
+        Returns:
+            results (list): Sigma objects of each problem, as returned by analyze.
+        """
+
+        if not problems:
+            return []
+        sh = _stack_components([problem.sh for problem in problems])
+        rc = _stack_components([problem.rc for problem in problems])
+        pm = _stack_components([problem.pm for problem in problems])
+        sl = _stack_components([problem.sl for problem in problems], sleeve=True)
+        deltaT = np.array([problem.deltaT for problem in problems], dtype=float)
+        omega = np.array([problem.omega for problem in problems], dtype=float)
+
+        K, X = self.DetermineSystem(sh, rc, pm, sl, deltaT, omega)
+        A = np.linalg.solve(K, X[..., np.newaxis])
+        results = []
+        for problem, A_k in zip(problems, A):
+            results.append(
+                (
+                    Sigma(problem.sh, [A_k[0], 0], problem.omega, problem.deltaT),
+                    Sigma(problem.rc, [A_k[1], A_k[2]], problem.omega, problem.deltaT),
+                    Sigma(problem.pm, [A_k[3], A_k[4]], problem.omega, problem.deltaT),
+                    Sigma(problem.sl, [A_k[5], A_k[6]], problem.omega, problem.deltaT),
+                )
+            )
+        return results
+
     def DetermineCoeff(self, sh: "RotorComponent", rc, pm, sl, deltaT, omega):
         """Deterimine coeffiecents for calculating stresses
 
@@ -172,6 +246,62 @@ class SPM_RotorStructuralAnalyzer:
             A (np.Array): numpy array of stress coeffiecents.
         """
 
+        K, X = self.DetermineSystem(sh, rc, pm, sl, deltaT, omega)
+        A = np.linalg.solve(K, X[..., np.newaxis])
+        return A
+
+    def DetermineCoeffGradient(self, sh: "RotorComponent", rc, pm, sl, deltaT, omega):
+        """Deterimine coeffiecents and their derivatives with respect to the sleeve thickness and undersize
+
+        The sleeve thickness only enters the system through the outer sleeve radius, in the equation of the stress at
+        the outside of the sleeve, and the undersize only through the displacement at the magnet-sleeve interface.
+
+        Args:
+            sh (RotorComponent): Shaft RotorComponent object.
+            rc (RotorComponent): Rotor core RotorComponent object.
+            pm (RotorComponent): Magnets RotorComponent object.
+            sl (RotorComponent): Sleeve RotorComponent object.
+            deltaT (float): Temperature rise in deg C.
+            omega (float): rotational speed in rad/s.
+
+        Returns:
+            A (np.Array): numpy array of the 7 stress coeffiecents.
+            dA (np.Array): numpy array of shape (7, 2) of the derivatives of A with respect to d_sl and delta_sl.
+        """
+
+        K, X = self.DetermineSystem(sh, rc, pm, sl, deltaT, omega)
+        A = np.linalg.solve(K, X)
+
+        r4 = sl.R_o
+        dK = np.zeros([7, 7])
+        dX = np.zeros(7)
+        dK[3, 5] = (sl.C1 * sl.h + sl.C2) * (sl.h - 1) * (r4 ** (sl.h - 2))
+        dK[3, 6] = (sl.C2 - sl.C1 * sl.h) * (-sl.h - 1) * (r4 ** (-sl.h - 2))
+        dX[3] = -((3 * sl.C1 + sl.C2) * sl.Beta * (omega ** 2) * 2 * r4)
+        dX_delta = np.zeros(7)
+        dX_delta[6] = 1
+
+        dA = np.linalg.solve(K, np.column_stack([dX - np.dot(dK, A), dX_delta]))
+        return A, dA
+
+    def DetermineSystem(self, sh: "RotorComponent", rc, pm, sl, deltaT, omega):
+        """Assemble the system of equations K A = X solved for the stress coeffiecents
+
+        Array valued component attributes, temperature rises, and speeds are broadcast together.
+
+        Args:
+            sh (RotorComponent): Shaft RotorComponent object.
+            rc (RotorComponent): Rotor core RotorComponent object.
+            pm (RotorComponent): Magnets RotorComponent object.
+            sl (RotorComponent): Sleeve RotorComponent object.
+            deltaT (float): Temperature rise in deg C.
+            omega (float): rotational speed in rad/s.
+
+        Returns:
+            K (np.Array): numpy array of shape batch shape + (7, 7).
+            X (np.Array): numpy array of shape batch shape + (7,).
+        """
+
         r1 = sh.R_o
         r2 = rc.R_o
         r3 = pm.R_o
@@ -179,8 +309,8 @@ class SPM_RotorStructuralAnalyzer:
         delta_1 = 0
         delta_2 = 0
         delta_3 = sl.Dr
-        K = np.zeros([7, 7])
-        X = np.zeros([7, 1])
+        K = {}
+        X = {}
 
         # Stress at interface between shaft and rotor core
         K[0, 0] = (sh.C1 * sh.h + sh.C2) * (r1 ** (sh.h - 1))
@@ -254,8 +384,272 @@ class SPM_RotorStructuralAnalyzer:
             - (pm.Beta * (omega ** 2) * (r3 ** 3))
         )
 
-        A = np.dot(np.linalg.inv(K), X)
-        return A
+        shape = np.broadcast_shapes(*(np.shape(value) for value in list(K.values()) + list(X.values())))
+        K_array = np.zeros(shape + (7, 7))
+        for (i, j), value in K.items():
+            K_array[..., i, j] = value
+        X_array = np.zeros(shape + (7,))
+        for i, value in X.items():
+            X_array[..., i] = value
+        return K_array, X_array
+
+
+def _stack_components(components: "List[RotorComponent]", sleeve=False) -> SimpleNamespace:
+    """Stacks the attributes of RotorComponents used by DetermineSystem into arrays"""
+    names = ["R_o", "C1", "C2", "h", "Beta", "zeta_r", "zeta_u"]
+    if sleeve:
+        names.append("Dr")
+    return SimpleNamespace(
+        **{name: np.array([getattr(c, name) for c in components], dtype=float) for name in names}
+    )
+
+
+class MultiLayer_RotorStructuralProblem:
+    """Problem class for MultiLayer_RotorStructuralAnalyzer.
+
+    Describes a rotor made of any number of concentric cylinders, such as a hollow shaft, a rotor core, magnets,
+    retaining rings, and multi-layer sleeves. As for SPM_RotorStructuralProblem, the radii and material properties of
+    the components, the operating point, and the interferences may be numpy arrays of broadcastable shapes.
+
+    Attributes:
+        components (List[RotorComponent]): RotorComponent objects ordered from the innermost to the outermost. The
+            inner radius of every component is the outer radius of the previous one. The innermost component is solid
+            if its inner radius is 0, and hollow with a traction-free bore otherwise.
+        interferences (list): Radial undersize of each component relative to the previous one [m], negative for an
+            interference fit, as delta_sl of SPM_RotorStructuralProblem. Holds one value per interface.
+        deltaT (float): Temperature rise in deg C.
+        omega (float): rotational speed in rad/s.
+    """
+
+    def __init__(
+        self,
+        components: "List[RotorComponent]",
+        deltaT: float,
+        N: float,
+        interferences: list = None,
+    ) -> "MultiLayer_RotorStructuralProblem":
+        """Creates MultiLayer_RotorStructuralProblem object from input
+
+        Args:
+            components (List[RotorComponent]): RotorComponent objects ordered from the innermost to the outermost.
+            deltaT (float): Temperature Rise [K].
+            N (float): Rotor Speed [RPM].
+            interferences (list): Radial undersize at each interface [m]. No interference if None.
+
+        Returns:
+            problem (MultiLayer_RotorStructuralProblem): MultiLayer_RotorStructuralProblem
+        """
+
+        if len(components) == 0:
+            raise ValueError("At least one rotor component is required")
+        if interferences is None:
+            interferences = [0] * (len(components) - 1)
+        if len(interferences) != len(components) - 1:
+            raise ValueError("One interference is required for each interface between rotor components")
+        for inner, outer in zip(components[:-1], components[1:]):
+            if not np.allclose(inner.R_o, outer.R_i, rtol=1e-9, atol=0):
+                raise ValueError("Inner radius of each rotor component must be the outer radius of the previous one")
+        if np.any(np.asarray(components[0].R_i) < 0):
+            raise ValueError("Inner radius of the innermost rotor component must not be negative")
+
+        self.components = list(components)
+        self.interferences = list(interferences)
+        self.deltaT = deltaT
+        self.omega = N * 2 * np.pi / 60
+
+
+class MultiLayer_RotorStructuralAnalyzer:
+    """Analyzer for the stresses of a rotor made of any number of concentric cylinders
+
+    The two stress coefficients of every component are found from the traction-free inner and outer surfaces of the
+    rotor, and from the continuity of the radial stress and the interference of the displacement at every interface.
+    Ordering the unknowns and equations from the inside out, the equations of each component only involve the
+    coefficients of its neighbours, so the system is block tridiagonal with 2 x 2 blocks and is solved in a time
+    proportional to the number of components.
+    """
+
+    def analyze(self, problem: "MultiLayer_RotorStructuralProblem") -> "List[Sigma]":
+        """Analyze structural problem
+
+        Args:
+            problem (MultiLayer_RotorStructuralProblem): problem for analyzer, with scalar inputs.
+
+        Returns:
+            results (List[Sigma]): Sigma object of each component.
+        """
+
+        lower, diag, upper, X = self.DetermineSystem(
+            problem.components, problem.interferences, problem.deltaT, problem.omega
+        )
+        if diag.ndim != 3:
+            raise ValueError("analyze requires scalar inputs, use analyze_batch for array valued inputs")
+        A = la.solve_banded((2, 2), _banded_matrix(lower, diag, upper), X.reshape(-1))
+        return self._sigmas(problem, A.reshape(-1, 2))
+
+    def analyze_batch(self, problem: "MultiLayer_RotorStructuralProblem") -> "List[Sigma]":
+        """Analyze a structural problem with array valued inputs
+
+        The block tridiagonal systems of every element of the broadcast inputs are solved together by block Gaussian
+        elimination, with one stacked solve of 2 x 2 systems per component.
+
+        Args:
+            problem (MultiLayer_RotorStructuralProblem): problem for analyzer, whose inputs broadcast to a batch shape.
+
+        Returns:
+            results (List[Sigma]): Sigma object of each component, whose stresses have the batch shape.
+        """
+
+        lower, diag, upper, X = self.DetermineSystem(
+            problem.components, problem.interferences, problem.deltaT, problem.omega
+        )
+        A = _solve_block_tridiagonal(lower, diag, upper, X)
+        return self._sigmas(problem, A)
+
+    def DetermineSystem(self, components: "List[RotorComponent]", interferences, deltaT, omega):
+        """Assemble the block tridiagonal system of equations solved for the stress coefficients
+
+        The unknowns of component k are the coefficients of r ** h and r ** -h of its displacement. The first equation
+        of block row k is the displacement at the interface with component k - 1, or the inner boundary condition for
+        the innermost component, and the second is the radial stress at the interface with component k + 1, or the
+        outer boundary condition for the outermost component.
+
+        Args:
+            components (List[RotorComponent]): RotorComponent objects ordered from the innermost to the outermost.
+            interferences (list): Radial undersize at each interface.
+            deltaT (float): Temperature rise in deg C.
+            omega (float): rotational speed in rad/s.
+
+        Returns:
+            lower (np.Array): numpy array of shape batch shape + (n, 2, 2) of the blocks multiplying the coefficients
+                of the previous component. The first block is zero.
+            diag (np.Array): numpy array of shape batch shape + (n, 2, 2) of the blocks multiplying the coefficients
+                of the component.
+            upper (np.Array): numpy array of shape batch shape + (n, 2, 2) of the blocks multiplying the coefficients
+                of the next component. The last block is zero.
+            X (np.Array): numpy array of shape batch shape + (n, 2).
+        """
+
+        n = len(components)
+        lower = {}
+        diag = {}
+        upper = {}
+        X = {}
+
+        # Inner boundary, the coefficient of r ** -h vanishes in a solid component and the bore of a hollow one is
+        # free of radial stress
+        inner = components[0]
+        if np.all(np.asarray(inner.R_i) == 0):
+            diag[0, 0, 1] = 1
+            X[0, 0] = 0
+        else:
+            s_a, s_b, s_p = _radial_stress_terms(inner, inner.R_i, deltaT, omega)
+            diag[0, 0, 0] = s_a
+            diag[0, 0, 1] = s_b
+            X[0, 0] = -s_p
+
+        for k in range(1, n):
+            c_i = components[k - 1]
+            c_o = components[k]
+            r = c_i.R_o
+
+            # Stress at interface between components k - 1 and k
+            s_a_i, s_b_i, s_p_i = _radial_stress_terms(c_i, r, deltaT, omega)
+            s_a_o, s_b_o, s_p_o = _radial_stress_terms(c_o, r, deltaT, omega)
+            diag[k - 1, 1, 0] = s_a_i
+            diag[k - 1, 1, 1] = s_b_i
+            upper[k - 1, 1, 0] = -s_a_o
+            upper[k - 1, 1, 1] = -s_b_o
+            X[k - 1, 1] = s_p_o - s_p_i
+
+            # Displacement at interface between components k - 1 and k
+            u_a_i, u_b_i, u_p_i = _displacement_terms(c_i, r, deltaT, omega)
+            u_a_o, u_b_o, u_p_o = _displacement_terms(c_o, r, deltaT, omega)
+            lower[k, 0, 0] = u_a_i
+            lower[k, 0, 1] = u_b_i
+            diag[k, 0, 0] = -u_a_o
+            diag[k, 0, 1] = -u_b_o
+            X[k, 0] = interferences[k - 1] + u_p_o - u_p_i
+
+        # Stress at outside of the rotor
+        outer = components[-1]
+        s_a, s_b, s_p = _radial_stress_terms(outer, outer.R_o, deltaT, omega)
+        diag[n - 1, 1, 0] = s_a
+        diag[n - 1, 1, 1] = s_b
+        X[n - 1, 1] = -s_p
+
+        values = [value for blocks in (lower, diag, upper, X) for value in blocks.values()]
+        shape = np.broadcast_shapes(*(np.shape(value) for value in values))
+        arrays = []
+        for blocks, block_shape in ((lower, (n, 2, 2)), (diag, (n, 2, 2)), (upper, (n, 2, 2)), (X, (n, 2))):
+            array = np.zeros(shape + block_shape)
+            for index, value in blocks.items():
+                array[(Ellipsis,) + index] = value
+            arrays.append(array)
+        return tuple(arrays)
+
+    def _sigmas(self, problem: "MultiLayer_RotorStructuralProblem", A: np.ndarray) -> "List[Sigma]":
+        return [
+            Sigma(component, [A[..., k, 0], A[..., k, 1]], problem.omega, problem.deltaT)
+            for k, component in enumerate(problem.components)
+        ]
+
+
+def _radial_stress_terms(c: "RotorComponent", r, deltaT, omega):
+    """Terms of the radial stress of a component at radius r multiplying its two coefficients, and the remainder"""
+    return (
+        (c.C1 * c.h + c.C2) * (r ** (c.h - 1)),
+        (c.C2 - c.C1 * c.h) * (r ** (-c.h - 1)),
+        (3 * c.C1 + c.C2) * c.Beta * (omega ** 2) * (r ** 2) + c.zeta_r * deltaT,
+    )
+
+
+def _displacement_terms(c: "RotorComponent", r, deltaT, omega):
+    """Terms of the radial displacement of a component at radius r multiplying its two coefficients, and the
+    remainder"""
+    return (
+        r ** c.h,
+        r ** -c.h,
+        c.Beta * (omega ** 2) * (r ** 3) + c.zeta_u * deltaT * r,
+    )
+
+
+def _banded_matrix(lower: np.ndarray, diag: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """Converts the blocks of a block tridiagonal system to the (2, 2) banded storage of scipy.linalg.solve_banded"""
+    n = diag.shape[0]
+    ab = np.zeros((5, 2 * n))
+    for k in range(n):
+        for i in range(2):
+            row = 2 * k + i
+            for block, offset in ((lower, -1), (diag, 0), (upper, 1)):
+                if not 0 <= k + offset < n:
+                    continue
+                for j in range(2):
+                    col = 2 * (k + offset) + j
+                    # the corners of the off diagonal blocks are zero by construction and outside of the band
+                    if abs(row - col) <= 2:
+                        ab[2 + row - col, col] = block[k, i, j]
+    return ab
+
+
+def _solve_block_tridiagonal(lower: np.ndarray, diag: np.ndarray, upper: np.ndarray, X: np.ndarray) -> np.ndarray:
+    """Solves stacked block tridiagonal systems by block Gaussian elimination, returning shape batch shape + (n, 2)"""
+    n = diag.shape[-3]
+    G = [None] * n
+    g = [None] * n
+    for k in range(n):
+        D = diag[..., k, :, :]
+        y = X[..., k, :, np.newaxis]
+        if k > 0:
+            L = lower[..., k, :, :]
+            D = D - L @ G[k - 1]
+            y = y - L @ g[k - 1]
+        G[k] = np.linalg.solve(D, upper[..., k, :, :])
+        g[k] = np.linalg.solve(D, y)
+    A = [None] * n
+    A[n - 1] = g[n - 1]
+    for k in range(n - 2, -1, -1):
+        A[k] = g[k] - G[k] @ A[k + 1]
+    return np.stack([a[..., 0] for a in A], axis=-2)
 
 
 class Material_Isotropic:
@@ -476,24 +870,7 @@ class Sigma:
         """
 
         # Radial Stress
-        try:
-            if max(R) > self.rotComp.R_o:
-                raise ValueError(
-                    "Provided radius larger than outer radius of rotor component"
-                )
-            if min(R) < self.rotComp.R_i:
-                raise ValueError(
-                    "Provided radius smaller than inner radius of rotor component"
-                )
-        except TypeError:
-            if R > self.rotComp.R_o:
-                raise ValueError(
-                    "Provided radius larger than outer radius of rotor component"
-                )
-            if R < self.rotComp.R_i:
-                raise ValueError(
-                    "Provided radius smaller than inner radius of rotor component"
-                )
+        self._check_radius(R)
         sigma_r = (
             self.A[0]
             * (self.rotComp.C1 * self.rotComp.h + self.rotComp.C2)
@@ -518,24 +895,7 @@ class Sigma:
         """
 
         # Tangential Stress
-        try:
-            if max(R) > self.rotComp.R_o:
-                raise ValueError(
-                    "Provided radius larger than outer radius of rotor component"
-                )
-            if min(R) < self.rotComp.R_i:
-                raise ValueError(
-                    "Provided radius smaller than inner radius of rotor component"
-                )
-        except TypeError:
-            if R > self.rotComp.R_o:
-                raise ValueError(
-                    "Provided radius larger than outer radius of rotor component"
-                )
-            if R < self.rotComp.R_i:
-                raise ValueError(
-                    "Provided radius smaller than inner radius of rotor component"
-                )
+        self._check_radius(R)
         sigma_t = (
             self.A[0]
             * (self.rotComp.C2 * self.rotComp.h + self.rotComp.C3)
@@ -551,6 +911,17 @@ class Sigma:
         )
         return sigma_t
 
+    def _check_radius(self, R):
+        # compared elementwise, so that the radii of array valued rotor components are checked per element
+        if np.any(np.asarray(R) > self.rotComp.R_o):
+            raise ValueError(
+                "Provided radius larger than outer radius of rotor component"
+            )
+        if np.any(np.asarray(R) < self.rotComp.R_i):
+            raise ValueError(
+                "Provided radius smaller than inner radius of rotor component"
+            )
+
 
 class SPM_RotorSleeveProblem:
     def __init__(
@@ -584,89 +955,146 @@ class SPM_RotorSleeveProblem:
         self.problem_class = problem_class
         self.analyzer_class = analyzer_class
 
-    def tan_sleeve(self, x):
-        """Calculate sigma_t_sl_max for given sleeve design"""
+        self._last_x = None
+        self._last_values = None
+        self._last_jac = None
+        self.n_solves = 0
+
+    def constraint_values(self, x):
+        """Calculate the constraint stresses of a sleeve design, solving its structural problem once per design
+
+        Args:
+            x: tuple of sleeve thickness and undersize
+
+        Returns:
+            values (np.Array): rad_sleeve, tan_sleeve, rad_magnet, and tan_magnet stresses.
+        """
+
+        self._solve(x)
+        return self._last_values
+
+    def constraint_jac(self, x):
+        """Calculate the derivatives of the constraint stresses with respect to the sleeve thickness and undersize
+
+        The derivatives are closed-form if the analyzer class provides DetermineCoeffGradient, and forward finite
+        differences otherwise.
+
+        Args:
+            x: tuple of sleeve thickness and undersize
 
+        Returns:
+            jac (np.Array): numpy array of shape (4, 2), ordered as constraint_values.
+        """
+
+        self._solve(x)
+        if self._last_jac is None:
+            self._last_jac = self._finite_difference_jac()
+        return self._last_jac
+
+    def _finite_difference_jac(self):
+        """Forward finite difference derivatives of the constraint stresses of the last solved design"""
+        x = np.array(self._last_x)
+        values = self._last_values
+        jac = np.zeros([4, 2])
+        for j in range(2):
+            # same step as the "2-point" scheme of scipy.optimize
+            h = np.sqrt(np.finfo(float).eps) * max(1.0, abs(x[j]))
+            x_h = x.copy()
+            x_h[j] = x_h[j] + h
+            self._solve(x_h)
+            jac[:, j] = (self._last_values - values) / h
+        # the perturbed solves replaced the cached design, which is restored so later calls at x do not solve again
+        self._last_x = tuple(x)
+        self._last_values = values
+        return jac
+
+    def _solve(self, x):
+        x = (float(x[0]), float(x[1]))
+        if x == self._last_x:
+            return
         d_sl = x[0]
         delta_sl = x[1]
         r_ro = self.r_ro
-        N = self.N
-        r_sh = self.r_sh
         d_m = self.d_m
-        deltaT = self.deltaT
-        mat_dict = self.mat_dict
         problem = self.problem_class(
-            r_sh, d_m, r_ro, d_sl, delta_sl, deltaT, N, mat_dict
+            self.r_sh, d_m, r_ro, d_sl, delta_sl, self.deltaT, self.N, self.mat_dict
         )
         analyzer = self.analyzer_class()
-        sigmas = analyzer.analyze(problem)
-        x_sl = np.linspace(r_ro, r_ro + d_sl, 50)
-        sigma_t_sl = sigmas[3].tangential(x_sl)
-        stress = sigma_t_sl[0]
-        return stress
+        self.n_solves = self.n_solves + 1
+        jac = None
+        if hasattr(analyzer, "DetermineCoeffGradient"):
+            A, dA = analyzer.DetermineCoeffGradient(
+                problem.sh, problem.rc, problem.pm, problem.sl, problem.deltaT, problem.omega
+            )
+            sigma_pm = Sigma(problem.pm, [A[3], A[4]], problem.omega, problem.deltaT)
+            sigma_sl = Sigma(problem.sl, [A[5], A[6]], problem.omega, problem.deltaT)
+            # stresses are linear in the coefficients, so their derivatives are the stresses of the coefficient
+            # derivatives without the speed and temperature terms
+            jac = np.zeros([4, 2])
+            for j in range(2):
+                d_sigma_pm = Sigma(problem.pm, [dA[3, j], dA[4, j]], 0, 0)
+                d_sigma_sl = Sigma(problem.sl, [dA[5, j], dA[6, j]], 0, 0)
+                jac[:, j] = [
+                    d_sigma_sl.radial(r_ro),
+                    d_sigma_sl.tangential(r_ro),
+                    d_sigma_pm.radial(r_ro - d_m),
+                    d_sigma_pm.tangential(r_ro - d_m),
+                ]
+        else:
+            sigmas = analyzer.analyze(problem)
+            sigma_pm = sigmas[2]
+            sigma_sl = sigmas[3]
+        values = np.array(
+            [
+                np.squeeze(sigma_sl.radial(r_ro)),
+                np.squeeze(sigma_sl.tangential(r_ro)),
+                np.squeeze(sigma_pm.radial(r_ro - d_m)),
+                np.squeeze(sigma_pm.tangential(r_ro - d_m)),
+            ]
+        )
+        self._last_x = x
+        self._last_values = values
+        self._last_jac = jac
 
     def rad_sleeve(self, x):
         """Calculate P_sl for given sleeve design"""
 
-        d_sl = x[0]
-        delta_sl = x[1]
-        r_ro = self.r_ro
-        N = self.N
-        r_sh = self.r_sh
-        d_m = self.d_m
-        deltaT = self.deltaT
-        mat_dict = self.mat_dict
-        problem = self.problem_class(
-            r_sh, d_m, r_ro, d_sl, delta_sl, deltaT, N, mat_dict
-        )
-        analyzer = self.analyzer_class()
-        sigmas = analyzer.analyze(problem)
-        x_sl = np.linspace(r_ro, r_ro + d_sl, 50)
-        sigma_r_sl = sigmas[3].radial(x_sl)
-        stress = sigma_r_sl[0]
-        return stress
+        return self.constraint_values(x)[0]
+
+    def tan_sleeve(self, x):
+        """Calculate sigma_t_sl_max for given sleeve design"""
+
+        return self.constraint_values(x)[1]
 
     def rad_magnet(self, x):
         """Calculate P_pm for given sleeve design"""
 
-        d_sl = x[0]
-        delta_sl = x[1]
-        r_ro = self.r_ro
-        N = self.N
-        r_sh = self.r_sh
-        d_m = self.d_m
-        deltaT = self.deltaT
-        mat_dict = self.mat_dict
-        problem = self.problem_class(
-            r_sh, d_m, r_ro, d_sl, delta_sl, deltaT, N, mat_dict
-        )
-        analyzer = self.analyzer_class()
-        sigmas = analyzer.analyze(problem)
-        x_pm = np.linspace(r_ro - d_m, r_ro, 50)
-        sigma_r_pm = sigmas[2].radial(x_pm)
-        stress = sigma_r_pm[0]
-        return stress
+        return self.constraint_values(x)[2]
 
     def tan_magnet(self, x):
         """Calculate sigma_t_pm_max for given sleeve design"""
 
-        d_sl = x[0]
-        delta_sl = x[1]
-        r_ro = self.r_ro
-        N = self.N
-        r_sh = self.r_sh
-        d_m = self.d_m
-        deltaT = self.deltaT
-        mat_dict = self.mat_dict
-        problem = self.problem_class(
-            r_sh, d_m, r_ro, d_sl, delta_sl, deltaT, N, mat_dict
-        )
-        analyzer = self.analyzer_class()
-        sigmas = analyzer.analyze(problem)
-        x_pm = np.linspace(r_ro - d_m, r_ro, 50)
-        sigma_t_pm = sigmas[2].tangential(x_pm)
-        stress = sigma_t_pm[0]
-        return stress
+        return self.constraint_values(x)[3]
+
+    def rad_sleeve_jac(self, x):
+        """Calculate the gradient of P_sl for given sleeve design"""
+
+        return self.constraint_jac(x)[0]
+
+    def tan_sleeve_jac(self, x):
+        """Calculate the gradient of sigma_t_sl_max for given sleeve design"""
+
+        return self.constraint_jac(x)[1]
+
+    def rad_magnet_jac(self, x):
+        """Calculate the gradient of P_pm for given sleeve design"""
+
+        return self.constraint_jac(x)[2]
+
+    def tan_magnet_jac(self, x):
+        """Calculate the gradient of sigma_t_pm_max for given sleeve design"""
+
+        return self.constraint_jac(x)[3]
 
 
 class SPM_RotorSleeveAnalyzer:
@@ -689,22 +1117,36 @@ class SPM_RotorSleeveAnalyzer:
             sol: solution from design problem
         """
 
+        # every constraint is evaluated from a single solve per design, with closed-form gradients if the analyzer
+        # class provides them, and finite differences otherwise
+        if hasattr(problem.analyzer_class, "DetermineCoeffGradient"):
+            jacs = [
+                problem.rad_sleeve_jac,
+                problem.tan_sleeve_jac,
+                problem.rad_magnet_jac,
+                problem.tan_magnet_jac,
+            ]
+            cost_jac = self.cost_jac
+        else:
+            jacs = ["2-point"] * 4
+            cost_jac = None
         nlc1 = op.NonlinearConstraint(
-            problem.rad_sleeve, self.stress_limits["rad_sleeve"], 0
+            problem.rad_sleeve, self.stress_limits["rad_sleeve"], 0, jac=jacs[0]
         )
         nlc2 = op.NonlinearConstraint(
-            problem.tan_sleeve, -np.inf, self.stress_limits["tan_sleeve"]
+            problem.tan_sleeve, -np.inf, self.stress_limits["tan_sleeve"], jac=jacs[1]
         )
         nlc3 = op.NonlinearConstraint(
-            problem.rad_magnet, -np.inf, self.stress_limits["rad_magnets"]
+            problem.rad_magnet, -np.inf, self.stress_limits["rad_magnets"], jac=jacs[2]
         )
         nlc4 = op.NonlinearConstraint(
-            problem.tan_magnet, -np.inf, self.stress_limits["tan_magnets"]
+            problem.tan_magnet, -np.inf, self.stress_limits["tan_magnets"], jac=jacs[3]
         )
         const = [nlc1, nlc2, nlc3, nlc4]
         sol = op.minimize(
             self.cost,
             [1e-3, -1e-3],
+            jac=cost_jac,
             tol=1e-4,
             constraints=const,
             bounds=[[0, 1], [-0.01, 0]],
@@ -728,6 +1170,18 @@ class SPM_RotorSleeveAnalyzer:
 
         return x[0]
 
+    def cost_jac(self, x):
+        """returns gradient of the sleeve thickness
+
+        Args:
+            x: tuple of sleeve thickness and undersize
+
+        Returns:
+            jac: gradient of cost with respect to x
+        """
+
+        return np.array([1.0, 0.0])
+
 
 if __name__ == "__main__":
     mat_dict = {
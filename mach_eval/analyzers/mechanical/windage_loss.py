@@ -125,3 +125,62 @@ class WindageLossAnalyzer:
         )
         return [windage_loss_radial, windage_loss_endFace, windage_loss_axial]
 
+    def analyze_many(problems):
+        """ Calculates total windage loss of several machines in one vectorized pass.
+
+        The rotor and stator dimensions, speed and air temperature of the problems are stacked into arrays. The
+        axial flow speed keeps the shape it has in each problem, as it does in analyze.
+
+        Args:
+            problems: list of problem classes
+
+        Returns:
+            results: list holding the result of analyze for each problem
+        """
+        Omega = np.array([problem.Omega for problem in problems], dtype=float)
+        R_ro = np.array([problem.R_ro for problem in problems], dtype=float)
+        L = np.array([problem.stack_length for problem in problems], dtype=float)
+        R_st = np.array([problem.R_st for problem in problems], dtype=float)
+        delta = np.array([problem.air_gap for problem in problems], dtype=float)
+        T_Air = np.array([problem.T_air for problem in problems], dtype=float)
+
+        nu_0_Air = 13.3e-6
+        rho_0_Air = 1.29
+        nu_Air = nu_0_Air * ((T_Air + 273) / (0 + 273)) ** 1.76
+        rho_Air = rho_0_Air * (0 + 273) / (T_Air + 273)
+
+        # shrouded cylinder, as in analyze
+        R = R_ro
+        Rey = R ** 2 * Omega / nu_Air
+        Tay = R * Omega * (delta / nu_Air) * np.sqrt(delta / R)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c_W = np.where(
+                Rey <= 170,
+                8.0 / Rey,
+                np.where(
+                    Tay < 41.3,
+                    1.8 * (R / delta) ** (0.25) * (R + delta) ** 2 / (Rey * delta ** 2),
+                    7e-3,
+                ),
+            )
+        windage_loss_radial = c_W * np.pi * rho_Air * Omega ** 3 * R_ro ** 4 * L
+
+        Rer = rho_Air * R_ro ** 2 * Omega / nu_Air
+        with np.errstate(divide="ignore"):
+            c_f = np.where(
+                Rer <= 30,
+                64 / (3 * Rer),
+                np.where(Rer < 3 * 10 ** 5, 3.87 * Rer ** (-0.5), 0.146 * Rer ** (-0.2)),
+            )
+        windage_loss_endFace = 0.5 * c_f * rho_Air * Omega ** 3 * R_ro ** 5
+
+        um = 0.48 * Omega * R_ro
+        axial_coefficient = (2 / 3) * np.pi * rho_Air * (R_st ** 3 - R_ro ** 3)
+        results = []
+        for i, problem in enumerate(problems):
+            windage_loss_axial = axial_coefficient[i] * problem.u_z * um[i] * Omega[i]
+            results.append(
+                [windage_loss_radial[i], windage_loss_endFace[i], windage_loss_axial]
+            )
+        return results
+
@@ -6,14 +6,31 @@ manner suitable for both machine optimization and evaluation.
 
 from typing import Protocol, runtime_checkable, Any, List, Union
 from abc import abstractmethod, ABC
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from collections import OrderedDict
 from copy import deepcopy
+import hashlib
+import json
 import os
+import pickle
 import sys
+import threading
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # resource is not available on Windows
+    resource = None
 
 # add the directory immediately above this file's directory to path for module import
 sys.path.append(os.path.dirname(__file__) + "/..")
 
 import mach_opt as mo
+from mach_opt import InvalidDesign  # raised by the analyzers of mach_eval
 
 __all__ = [
     "MachineDesign",
@@ -22,14 +39,24 @@ __all__ = [
     "Architect",
     "Machine",
     "MachineEvaluator",
+    "ConcurrentMachineEvaluator",
     "EvaluationStep",
     "Conditions",
     "State",
     "AnalysisStep",
+    "ConstraintStep",
+    "AbortStatistics",
+    "CachedAnalysisStep",
     "ProblemDefinition",
     "Problem",
     "Analyzer",
     "PostAnalyzer",
+    "EvaluationResults",
+    "StepSummary",
+    "EvaluationProfile",
+    "ProfileRecord",
+    "profile_phase",
+    "export_chrome_trace",
 ]
 
 
@@ -117,10 +144,51 @@ class MachineEvaluator(mo.Evaluator):
 
     Attributes:
         steps: Sequential list of steps involved in evaluating a MachineDesign
+        profile: If True, the wall time, CPU time, and peak memory growth of each step and each of its phases is
+            recorded in an EvaluationProfile attached to the results.
+        trace_filepath: Optional file to which the profile of every evaluation is appended, for example over a whole
+            optimization run. The file can be converted into a Chrome trace with export_chrome_trace. Setting this
+            enables profiling.
+        retention: Which results of an evaluation are returned. "all" keeps the input state, raw results, and output
+            state of every step. "final" keeps only the final state, as a single [None, None, final_state] entry.
+            "summary" keeps a [None, StepSummary, None] entry for every step, with the final state in the last entry.
+            In every case, the final state is found at full_results[-1][-1].
+        abort_statistics: AbortStatistics of the designs evaluated by this evaluator, and the time saved by ending
+            the evaluation of invalid designs early.
+        checkpoint_dirpath: Optional directory where the outcome of each step is saved as soon as the step completes,
+            keyed on a hash of the design and of the step names. If the evaluation is interrupted, for example by a
+            crashed or preempted worker, evaluating the same design again resumes after the last completed step. The
+            checkpoints of a design are removed once its evaluation completes or finds the design invalid.
+        incremental: If True, every design is evaluated with evaluate_incremental against the previous successful
+            evaluation of this evaluator, which is kept in the reference attribute.
+        reference: full_results of every step of the previous successful evaluation, used in incremental mode.
+        reuse_counts: Number of times the outputs of each step were reused by incremental evaluations.
     """
 
-    def __init__(self, steps: List["EvaluationStep"]):
+    retention_policies = ("all", "final", "summary")
+
+    def __init__(
+        self,
+        steps: List["EvaluationStep"],
+        profile=False,
+        trace_filepath=None,
+        retention="all",
+        checkpoint_dirpath=None,
+        incremental=False,
+    ):
+        if retention not in self.retention_policies:
+            raise ValueError("retention must be one of " + ", ".join(self.retention_policies))
         self.steps = steps
+        self.profile = profile or trace_filepath is not None
+        self.trace_filepath = trace_filepath
+        self.retention = retention
+        self.abort_statistics = AbortStatistics(len(steps))
+        self.checkpoint_dirpath = checkpoint_dirpath
+        if checkpoint_dirpath is not None:
+            os.makedirs(checkpoint_dirpath, exist_ok=True)
+        self.incremental = incremental
+        self.reference = None
+        self.reuse_counts = [0] * len(steps)
 
     def evaluate(self, design: Any):
         """Evaluates a MachineDesign
@@ -130,21 +198,858 @@ class MachineEvaluator(mo.Evaluator):
         Args:
             design: MachineDesign object to be evaluated
         Returns:
-            full_results: List of results obtained from each evaluation step
+            full_results: List of results obtained from each evaluation step, as selected by the retention policy. If
+                profiling is enabled, this is an EvaluationResults list whose profile attribute holds the
+                EvaluationProfile of the evaluation.
+        """
+        if not self.profile:
+            return self._evaluate_design(design)
+
+        profile = EvaluationProfile()
+        token = _active_profile.set(profile)
+        try:
+            full_results = self._evaluate_design(design)
+        finally:
+            _active_profile.reset(token)
+        if self.trace_filepath is not None:
+            profile.append_to_trace(self.trace_filepath)
+        return EvaluationResults(full_results, profile)
+
+    def _evaluate_design(self, design: Any):
+        if not self.incremental:
+            return self._evaluate_steps(design)
+        entries = self._evaluate_incremental(design, self.reference)
+        self.reference = entries
+        return self._retain_entries(entries)
+
+    def evaluate_incremental(self, design: Any, reference: list) -> list:
+        """Evaluates a MachineDesign, reusing the outputs of the steps whose inputs match a reference evaluation
+
+        The steps are evaluated in order. A step is reused if it declares the inputs it reads, and each of them has the
+        same content in the new input state as in the input state of the step in the reference evaluation. Besides
+        condition names and "design", reads may name attributes of the design such as "design.machine.r_ro", so that a
+        step depending on part of the design is reused when other parts change. An AnalysisStep which is reused passes
+        its reference raw results to its post-analyzer, so that the output state is built from the new design. Other
+        steps are reused by applying the conditions they changed in the reference evaluation, unless they changed the
+        design, in which case they are evaluated again. Every other step is evaluated as usual, and steps after it are
+        still reused if the conditions they read come out unchanged.
+
+        Args:
+            design: MachineDesign object to be evaluated
+            reference: full_results of a previous evaluation, holding the input state, raw results, and output state
+                of every step, as produced with the "all" retention policy. If None, every step is evaluated.
+        Returns:
+            full_results: List of results obtained from each evaluation step, as selected by the retention policy.
+        """
+        return self._retain_entries(self._evaluate_incremental(design, reference))
+
+    def _evaluate_incremental(self, design: Any, reference: list) -> list:
+        """Returns the [state_in, results, state_out] entries of every step of an incremental evaluation"""
+        self._check_reference(reference)
+        state_in = State(design, Conditions())
+        state_in.freeze()
+        entries = []
+        for i, evalStep in enumerate(self.steps):
+            with profile_phase(_step_name(evalStep, i)):
+                reused = None
+                if reference is not None and _inputs_match(evalStep, state_in, reference[i][0]):
+                    reused = _reuse_step(evalStep, state_in, reference[i])
+                if reused is None:
+                    [results, state_out] = evalStep.step(state_in)
+                else:
+                    [results, state_out] = reused
+                    self.reuse_counts[i] = self.reuse_counts[i] + 1
+                state_out.freeze()
+            entries.append([state_in, results, state_out])
+            state_in = state_out
+        return entries
+
+    def _check_reference(self, reference: list):
+        if reference is not None and (
+            len(reference) != len(self.steps) or any(entry[0] is None or entry[2] is None for entry in reference)
+        ):
+            raise ValueError("The reference must hold the states of every step, as retained by the 'all' policy")
+
+    def _retain_entries(self, entries: list) -> list:
+        full_results = []
+        for i, (state_in, results, state_out) in enumerate(entries):
+            self._retain(full_results, _step_name(self.steps[i], i), state_in, results, state_out)
+        final_state = entries[-1][-1] if entries else None
+        return self._retain_final(full_results, final_state)
+
+    def replay(self, design: Any, full_results: list, replay_steps) -> list:
+        """Re-evaluates a design, reusing the raw results of previously evaluated steps
+
+        The raw results stored in full_results for the steps in replay_steps are passed to the current post-analyzer of
+        those steps instead of being analyzed again. All other steps are evaluated as usual, so that they account for
+        the updated conditions. This allows the post-processing of expensive analyses, such as FEA, to be changed
+        without repeating them.
+
+        Args:
+            design: MachineDesign object which was evaluated
+            full_results: full_results of the previous evaluation, holding the raw results of every step
+            replay_steps: Indices of the AnalysisSteps whose raw results are reused. Either a dictionary from the index
+                of each step in this evaluator to the index of its entry in full_results, or a list of indices if the
+                steps were not reordered since full_results was produced.
+        Returns:
+            full_results: List of results obtained from each evaluation step, as selected by the retention policy.
+        """
+        if not isinstance(replay_steps, dict):
+            replay_steps = {i: i for i in replay_steps}
+        state_in = State(design, Conditions())
+        state_in.freeze()
+        new_results = []
+        for i, evalStep in enumerate(self.steps):
+            if i in replay_steps:
+                results = full_results[replay_steps[i]][1]
+                if results is None:
+                    raise ValueError("The raw results of step " + str(replay_steps[i]) + " were not retained")
+                state_out = evalStep.post_analyzer.get_next_state(results, state_in)
+            else:
+                [results, state_out] = evalStep.step(state_in)
+            state_out.freeze()
+            self._retain(new_results, _step_name(evalStep, i), state_in, results, state_out)
+            state_in = state_out
+        return self._retain_final(new_results, state_in)
+
+    def evaluate_many(self, designs: List[Any]) -> list:
+        """Evaluates several MachineDesigns together, one evaluation step at a time
+
+        Steps which implement step_many evaluate all remaining designs in a single call, which lets analyzers that
+        implement analyze_many process the designs in one vectorized pass. Other steps, and steps whose step_many call
+        raises an exception, evaluate the designs one at a time. A design whose evaluation raises an exception is not
+        evaluated by the subsequent steps.
+
+        Args:
+            designs: MachineDesign objects to be evaluated
+        Returns:
+            outcomes: For each design, either the full_results returned by evaluate or the exception raised by its
+                evaluation. If profiling is enabled, every full_results holds the EvaluationProfile of the whole batch.
         """
+        if not self.profile:
+            return self._evaluate_many_steps(designs)
+
+        profile = EvaluationProfile()
+        token = _active_profile.set(profile)
+        try:
+            outcomes = self._evaluate_many_steps(designs)
+        finally:
+            _active_profile.reset(token)
+        if self.trace_filepath is not None:
+            profile.append_to_trace(self.trace_filepath)
+        return [
+            outcome if isinstance(outcome, Exception) else EvaluationResults(outcome, profile) for outcome in outcomes
+        ]
+
+    def _evaluate_many_steps(self, designs: List[Any]) -> list:
+        states = []
+        for design in designs:
+            state = State(design, Conditions())
+            state.freeze()
+            states.append(state)
+        full_results = [[] for _ in designs]
+        outcomes = [None] * len(designs)
+        active = list(range(len(designs)))
+        for i, evalStep in enumerate(self.steps):
+            name = _step_name(evalStep, i)
+            with profile_phase(name):
+                step_outcomes = _step_designs(evalStep, [states[k] for k in active])
+            still_active = []
+            for k, outcome in zip(active, step_outcomes):
+                if isinstance(outcome, Exception):
+                    outcomes[k] = outcome
+                    continue
+                results, state_out = outcome
+                state_out.freeze()
+                self._retain(full_results[k], name, states[k], results, state_out)
+                states[k] = state_out
+                still_active.append(k)
+            active = still_active
+        for k in active:
+            outcomes[k] = self._retain_final(full_results[k], states[k])
+        return outcomes
+
+    def _evaluate_steps(self, design: Any):
         state_condition = Conditions()
         state_in = State(design, state_condition)
+        state_in.freeze()
         full_results = []
-        for evalStep in self.steps:
-            [results, state_out] = evalStep.step(state_in)
-            full_results.append(deepcopy([state_in, results, state_out]))
+        self.abort_statistics.evaluations = self.abort_statistics.evaluations + 1
+
+        checkpoint_key = None
+        first_step = 0
+        if self.checkpoint_dirpath is not None:
+            checkpoint_key = self.checkpoint_key(design)
+            for i, (state_in, results, state_out) in enumerate(self._load_checkpoints(checkpoint_key)):
+                self._retain(full_results, _step_name(self.steps[i], i), state_in, results, state_out)
+                state_in = state_out
+                first_step = i + 1
+
+        for i, evalStep in enumerate(self.steps[first_step:], first_step):
+            start = time.perf_counter()
+            try:
+                with profile_phase(_step_name(evalStep, i)):
+                    [results, state_out] = evalStep.step(state_in)
+                    # states are shared between steps rather than copied, so each is frozen once produced
+                    with profile_phase("freeze"):
+                        state_out.freeze()
+                    self._retain(full_results, _step_name(evalStep, i), state_in, results, state_out)
+            except Exception as e:
+                self.abort_statistics.record_step(i, time.perf_counter() - start, completed=False)
+                if _is_invalid_design(e):
+                    self.abort_statistics.record_abort(i)
+                    if checkpoint_key is not None:
+                        self._clear_checkpoints(checkpoint_key)
+                raise
+            self.abort_statistics.record_step(i, time.perf_counter() - start)
+            if checkpoint_key is not None and i < len(self.steps) - 1:
+                self._save_checkpoint(checkpoint_key, i, [state_in, results, state_out])
             state_in = state_out
+
+        if checkpoint_key is not None:
+            self._clear_checkpoints(checkpoint_key)
+        return self._retain_final(full_results, state_in)
+
+    def checkpoint_key(self, design: Any) -> str:
+        """Returns the hash identifying the step checkpoints of a design"""
+        hasher = hashlib.sha256()
+        _hash_content(([_step_name(step, i) for i, step in enumerate(self.steps)], design), hasher, set())
+        return hasher.hexdigest()
+
+    def _checkpoint_filepath(self, key: str, index: int) -> str:
+        return os.path.join(self.checkpoint_dirpath, key + "." + str(index) + ".pkl")
+
+    def _save_checkpoint(self, key: str, index: int, entry: list):
+        filepath = self._checkpoint_filepath(key, index)
+        tmp_filepath = filepath + "." + str(os.getpid()) + "-" + str(threading.get_ident())
+        with open(tmp_filepath, "wb") as f:
+            pickle.dump(entry, f, -1)
+        os.replace(tmp_filepath, filepath)
+
+    def _load_checkpoints(self, key: str) -> list:
+        """Returns the [state_in, results, state_out] entries of the consecutive steps completed by a design"""
+        entries = []
+        for i in range(len(self.steps)):
+            try:
+                with open(self._checkpoint_filepath(key, i), "rb") as f:
+                    entries.append(pickle.load(f))
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+                break
+        return entries
+
+    def _clear_checkpoints(self, key: str):
+        for i in range(len(self.steps)):
+            try:
+                os.remove(self._checkpoint_filepath(key, i))
+            except FileNotFoundError:
+                pass
+
+    def _retain(self, full_results, name, state_in, results, state_out):
+        """Appends the entry of an evaluated step to full_results according to the retention policy"""
+        if self.retention == "all":
+            full_results.append([state_in, results, state_out])
+        elif self.retention == "summary":
+            full_results.append([None, StepSummary(name, state_in, state_out), None])
+
+    def _retain_final(self, full_results, final_state):
+        """Completes full_results with the final state according to the retention policy"""
+        if self.retention == "final":
+            full_results = [[None, None, final_state]]
+        elif self.retention == "summary" and full_results:
+            full_results[-1][-1] = final_state
         return full_results
 
 
+class ConcurrentMachineEvaluator(MachineEvaluator):
+    """MachineEvaluator which runs independent evaluation steps concurrently
+
+    Each step may declare the condition names it reads and writes through its reads and writes attributes, where the
+    name "design" stands for the design of the state. A step depends on an earlier step in the list if it reads what
+    the earlier step writes, or writes what the earlier step reads or writes, or if the earlier step is a ConstraintStep.
+    Steps without declarations depend on, and are depended on by, every other step. Steps whose dependencies have
+    completed run concurrently in a pool.
+
+    Each step receives the initial state updated with the changes made by the steps it depends on, directly or
+    indirectly, applied in list order. The full_results are built by applying the changes of every step in list order,
+    so the merged states do not depend on the order in which the steps complete, and match the states of a
+    MachineEvaluator whenever the declarations are complete.
+
+    With a checkpoint_dirpath, every step is checkpointed as soon as it completes, and an interrupted evaluation
+    resumes with all the steps which completed, whether or not the steps before them in the list did. Incremental
+    evaluations reuse steps as in MachineEvaluator, comparing the reads of each step in the state it receives from its
+    dependencies, and run the other steps concurrently.
+
+    Attributes:
+        n_workers: Maximum number of steps evaluated at once. Defaults to the number of steps.
+        executor: "thread" to run steps in a thread pool, or "process" to run them in a process pool, in which case
+            the steps, states, and results must be picklable.
+        dependencies: Indices of the steps each step directly depends on.
+    """
+
+    def __init__(
+        self,
+        steps: List["EvaluationStep"],
+        n_workers=None,
+        executor="thread",
+        profile=False,
+        trace_filepath=None,
+        retention="all",
+        checkpoint_dirpath=None,
+        incremental=False,
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError("executor must be either 'thread' or 'process'")
+        super().__init__(
+            steps,
+            profile=profile,
+            trace_filepath=trace_filepath,
+            retention=retention,
+            checkpoint_dirpath=checkpoint_dirpath,
+            incremental=incremental,
+        )
+        self.n_workers = len(steps) if n_workers is None else n_workers
+        self.executor = executor
+        # constraint steps gate every later step, so that no further analysis is started for an invalid design
+        self.dependencies = [
+            [j for j in range(i) if isinstance(steps[j], ConstraintStep) or _steps_conflict(steps[i], steps[j])]
+            for i in range(len(steps))
+        ]
+        self._ancestors = []
+        for deps in self.dependencies:
+            ancestors = set(deps)
+            for j in deps:
+                ancestors.update(self._ancestors[j])
+            self._ancestors.append(sorted(ancestors))
+        self._pool = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    def close(self):
+        """Shuts down the pool used to evaluate steps"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            pool_class = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+            self._pool = pool_class(max_workers=max(self.n_workers, 1))
+        return self._pool
+
+    def _evaluate_steps(self, design: Any):
+        checkpoint_key = None if self.checkpoint_dirpath is None else self.checkpoint_key(design)
+        return self._retain_entries(self._evaluate_graph(design, checkpoint_key=checkpoint_key))
+
+    def _evaluate_incremental(self, design: Any, reference: list) -> list:
+        self._check_reference(reference)
+        return self._evaluate_graph(design, reference=reference)
+
+    def checkpoint_key(self, design: Any) -> str:
+        """Returns the hash identifying the step checkpoints of a design"""
+        # each checkpoint holds the state a step received from the steps it depends on, rather than from the step
+        # before it, so the checkpoints are kept apart from those of a MachineEvaluator with the same steps
+        return "concurrent-" + super().checkpoint_key(design)
+
+    def _evaluate_graph(self, design: Any, checkpoint_key=None, reference=None) -> list:
+        """Returns the [state_in, results, state_out] entries of every step, evaluating steps in dependency order.
+
+        Steps whose inputs match their entry in reference are reused instead of being evaluated.
+        """
+        initial_state = State(design, Conditions())
+        initial_state.freeze()
+        names = [_step_name(step, i) for i, step in enumerate(self.steps)]
+        profile = _active_profile.get()
+        pool = self._get_pool()
+        self.abort_statistics.evaluations = self.abort_statistics.evaluations + 1
+
+        results = {}
+        deltas = {}
+        errors = {}
+        if checkpoint_key is not None:
+            for i, (state_in, step_results, state_out) in self._load_step_checkpoints(checkpoint_key).items():
+                results[i] = step_results
+                deltas[i] = _state_delta(state_in, state_out)
+        remaining = [i for i in range(len(self.steps)) if i not in deltas]
+        running = {}
+        while remaining or running:
+            if errors:
+                remaining = []
+            ready = [i for i in remaining if all(j in deltas for j in self.dependencies[i])]
+            while ready:
+                i = ready.pop(0)
+                remaining.remove(i)
+                state_in = _apply_deltas(initial_state, [deltas[j] for j in self._ancestors[i]])
+                reused = None
+                if reference is not None and _inputs_match(self.steps[i], state_in, reference[i][0]):
+                    reused = _reuse_step(self.steps[i], state_in, reference[i])
+                if reused is None:
+                    future = pool.submit(_run_step, self.steps[i], state_in, names[i], profile is not None)
+                    running[future] = (i, state_in)
+                    continue
+                results[i], state_out = reused
+                deltas[i] = _state_delta(state_in, state_out)
+                self.reuse_counts[i] = self.reuse_counts[i] + 1
+                # steps depending on a reused step may now be ready as well
+                ready = [i for i in remaining if all(j in deltas for j in self.dependencies[i])]
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, state_in = running.pop(future)
+                try:
+                    step_results, delta, records, wall_time, error = future.result()
+                except Exception as e:
+                    # the worker running the step failed, such as a crashed process
+                    step_results, delta, records, wall_time, error = None, None, [], 0.0, e
+                if error is None:
+                    try:
+                        _check_writes(self.steps[i], names[i], delta)
+                    except ValueError as e:
+                        error = e
+                if profile is not None:
+                    profile.records.extend(records)
+                self.abort_statistics.record_step(i, wall_time, completed=error is None)
+                if error is not None:
+                    errors[i] = error
+                    if _is_invalid_design(error):
+                        self.abort_statistics.record_abort(i)
+                    continue
+                results[i], deltas[i] = step_results, delta
+                if checkpoint_key is not None:
+                    self._save_checkpoint(checkpoint_key, i, [state_in, step_results, _apply_deltas(state_in, [delta])])
+        if errors:
+            if checkpoint_key is not None and any(_is_invalid_design(e) for e in errors.values()):
+                self._clear_checkpoints(checkpoint_key)
+            # raise the error of the first failing step in the list, regardless of which failed first
+            raise errors[min(errors)]
+
+        entries = []
+        state_in = initial_state
+        for i in range(len(self.steps)):
+            state_out = _apply_deltas(state_in, [deltas[i]])
+            entries.append([state_in, results[i], state_out])
+            state_in = state_out
+        if checkpoint_key is not None:
+            self._clear_checkpoints(checkpoint_key)
+        return entries
+
+    def _load_step_checkpoints(self, key: str) -> dict:
+        """Returns the [state_in, results, state_out] entries of every step completed by a design, keyed on index"""
+        entries = {}
+        for i in range(len(self.steps)):
+            try:
+                with open(self._checkpoint_filepath(key, i), "rb") as f:
+                    entries[i] = pickle.load(f)
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+                continue
+        return entries
+
+
+class AbortStatistics:
+    """Statistics on the evaluations ended early by invalid designs.
+
+    The time saved by ending an evaluation at a step is estimated as the sum of the mean wall time of the steps which
+    were skipped, measured over the evaluations in which they completed. The estimate is therefore updated as more
+    evaluations complete.
+
+    Attributes:
+        evaluations: Number of evaluations started.
+        aborted: Number of evaluations ended by an invalid design at each step.
+        step_times: Total wall time of the completed runs of each step in seconds.
+        step_counts: Number of completed runs of each step.
+        time_spent: Total wall time spent in all steps, including those which failed, in seconds.
+    """
+
+    def __init__(self, n_steps: int):
+        self.evaluations = 0
+        self.aborted = [0] * n_steps
+        self.step_times = [0.0] * n_steps
+        self.step_counts = [0] * n_steps
+        self.time_spent = 0.0
+
+    def record_step(self, index: int, wall_time: float, completed=True):
+        """Records the wall time of a run of a step"""
+        self.time_spent = self.time_spent + wall_time
+        if completed:
+            self.step_times[index] = self.step_times[index] + wall_time
+            self.step_counts[index] = self.step_counts[index] + 1
+
+    def record_abort(self, index: int):
+        """Records an evaluation ended by an invalid design at a step"""
+        self.aborted[index] = self.aborted[index] + 1
+
+    def mean_step_time(self, index: int) -> float:
+        """Mean wall time of the completed runs of a step, 0 if it never completed"""
+        if self.step_counts[index] == 0:
+            return 0.0
+        return self.step_times[index] / self.step_counts[index]
+
+    @property
+    def time_saved(self) -> float:
+        """Estimated wall time saved by ending invalid evaluations early, in seconds"""
+        saved = 0.0
+        for i, count in enumerate(self.aborted):
+            saved = saved + count * sum(self.mean_step_time(j) for j in range(i + 1, len(self.aborted)))
+        return saved
+
+    def report(self, steps: List["EvaluationStep"] = None) -> str:
+        """Returns a summary of the aborted evaluations and time saved, naming the steps if they are given"""
+        lines = [
+            "Evaluations: " + str(self.evaluations) + ", aborted: " + str(sum(self.aborted)),
+            "Time spent: " + format(self.time_spent, ".4g") + " s, estimated time saved: "
+            + format(self.time_saved, ".4g") + " s",
+        ]
+        for i, count in enumerate(self.aborted):
+            name = str(i) if steps is None else _step_name(steps[i], i)
+            lines.append(
+                "  " + name + ": mean time " + format(self.mean_step_time(i), ".4g") + " s, aborted " + str(count)
+            )
+        return "\n".join(lines)
+
+
+def _is_invalid_design(e: Exception) -> bool:
+    # compared by class name, as in mach_opt.DesignProblem, to match InvalidDesign regardless of the module it is from
+    return e.__class__.__name__ == mo.InvalidDesign.__name__
+
+
+class StepSummary:
+    """Summary of an evaluation step kept in place of its states and raw results.
+
+    Attributes:
+        name: Name of the step, made up of its position and the analyzer or step class.
+        conditions: Dictionary of the conditions added or replaced by the step.
+        design_changed: True if the step replaced the design of the state.
+    """
+
+    def __init__(self, name: str, state_in: "State", state_out: "State"):
+        self.name = name
+        design, self.conditions = _state_delta(state_in, state_out)
+        self.design_changed = design is not None
+
+    def __repr__(self):
+        return "StepSummary(" + self.name + ", conditions=" + str(list(self.conditions)) + ")"
+
+
+def _step_designs(step: "EvaluationStep", states: List["State"]) -> list:
+    """Evaluates a step for several states, returning either the results and output state or the exception of each"""
+    if hasattr(step, "step_many") and len(states) > 1:
+        try:
+            results, states_out = step.step_many(states)
+            return list(zip(results, states_out))
+        except Exception:
+            # evaluate the states one at a time to tell apart the designs which failed
+            pass
+    outcomes = []
+    for state in states:
+        try:
+            outcomes.append(step.step(state))
+        except Exception as e:
+            outcomes.append(e)
+    return outcomes
+
+
+def _state_delta(state_in: "State", state_out: "State"):
+    """Returns the design, or None if unchanged, and the dictionary of conditions changed by an evaluation step"""
+    conditions_in = vars(state_in.conditions)
+    conditions = {
+        key: value
+        for key, value in vars(state_out.conditions).items()
+        if key != "_frozen" and (key not in conditions_in or conditions_in[key] is not value)
+    }
+    design = state_out.design if state_out.design is not state_in.design else None
+    return design, conditions
+
+
+def _apply_deltas(state: "State", deltas: list) -> "State":
+    """Returns a frozen state holding the changes of each step delta applied in order"""
+    design = state.design
+    conditions = {}
+    for step_design, step_conditions in deltas:
+        if step_design is not None:
+            design = step_design
+        conditions.update(step_conditions)
+    if design is state.design and not conditions:
+        return state
+    state_out = state.evolve(design=design, **conditions)
+    state_out.freeze()
+    return state_out
+
+
+def _steps_conflict(step, other) -> bool:
+    """True if the order of two steps matters based on the conditions they read and write"""
+    reads, writes = getattr(step, "reads", None), getattr(step, "writes", None)
+    other_reads, other_writes = getattr(other, "reads", None), getattr(other, "writes", None)
+    if None in (reads, writes, other_reads, other_writes):
+        return True
+    return _names_overlap(writes, list(other_reads) + list(other_writes)) or _names_overlap(reads, other_writes)
+
+
+def _names_overlap(names, other_names) -> bool:
+    """True if any name equals, or is an attribute path within, any other name, as "design.machine" is within "design"."""
+    for name in names:
+        for other in other_names:
+            if name == other or name.startswith(other + ".") or other.startswith(name + "."):
+                return True
+    return False
+
+
+_MISSING = object()
+
+
+def _read_input(state: "State", name: str):
+    """Returns the value of a condition, of the design, or of an attribute path of the design"""
+    if name == "design" or name.startswith("design."):
+        value = state.design
+        for attr in name.split(".")[1:]:
+            value = getattr(value, attr, _MISSING)
+            if value is _MISSING:
+                break
+        return value
+    return getattr(state.conditions, name, _MISSING)
+
+
+def _same_content(value, other) -> bool:
+    if value is other:
+        return True
+    if value is _MISSING or other is _MISSING:
+        return False
+    hasher, other_hasher = hashlib.sha256(), hashlib.sha256()
+    _hash_content(value, hasher, set())
+    _hash_content(other, other_hasher, set())
+    return hasher.digest() == other_hasher.digest()
+
+
+def _inputs_match(step: "EvaluationStep", state: "State", reference_state: "State") -> bool:
+    """True if every input a step declares it reads has the same content in two states"""
+    reads = getattr(step, "reads", None)
+    if reads is None:
+        return False
+    return all(_same_content(_read_input(state, name), _read_input(reference_state, name)) for name in reads)
+
+
+def _reuse_step(step: "EvaluationStep", state_in: "State", reference_entry: list):
+    """Returns the results and output state of a step built from its reference entry, or None if it must be run"""
+    reference_in, results, reference_out = reference_entry
+    if isinstance(step, AnalysisStep):
+        if results is None:
+            return None
+        return results, step.post_analyzer.get_next_state(results, state_in)
+    design, conditions = _state_delta(reference_in, reference_out)
+    if design is not None:
+        return None
+    if not conditions:
+        return results, state_in
+    return results, state_in.evolve(**conditions)
+
+
+def _check_writes(step, name: str, delta):
+    writes = getattr(step, "writes", None)
+    if writes is None:
+        return
+    design, conditions = delta
+    undeclared = [key for key in conditions if key not in writes]
+    if design is not None and "design" not in writes:
+        undeclared.append("design")
+    if undeclared:
+        raise ValueError("Step " + name + " changed undeclared conditions: " + ", ".join(undeclared))
+
+
+def _run_step(step: "EvaluationStep", state_in: "State", name: str, profiling: bool):
+    """Evaluates a step within a worker of ConcurrentMachineEvaluator.
+
+    Returns:
+        results, delta, records, wall_time, error: Results and state delta of the step, or None and the exception it
+            raised, along with its profile records and wall time.
+    """
+    profile = EvaluationProfile() if profiling else None
+    token = _active_profile.set(profile)
+    start = time.perf_counter()
+    try:
+        with profile_phase(name):
+            results, state_out = step.step(state_in)
+        # the delta is found here since object identities are lost when the state is sent back from a process
+        delta = _state_delta(state_in, state_out)
+        error = None
+    except Exception as e:
+        results, delta, error = None, None, e
+    finally:
+        _active_profile.reset(token)
+    records = [] if profile is None else profile.records
+    return results, delta, records, time.perf_counter() - start, error
+
+
+class EvaluationResults(list):
+    """List of the results of each evaluation step, along with the profile of the evaluation
+
+    Attributes:
+        profile: EvaluationProfile of the evaluation
+    """
+
+    def __init__(self, full_results: list, profile: "EvaluationProfile"):
+        super().__init__(full_results)
+        self.profile = profile
+
+
+class ProfileRecord:
+    """Resources used by one evaluation step or one phase of a step.
+
+    Attributes:
+        name: Path of the step or phase, such as "1:BSPM_EM_Analyzer/analyze".
+        start: Time at which the phase started, in seconds since the epoch.
+        wall_time: Elapsed time of the phase in seconds.
+        cpu_time: CPU time spent by the evaluating thread during the phase in seconds.
+        peak_rss_delta: Growth of the peak resident memory of the process during the phase in bytes. None on platforms
+            where it cannot be measured.
+        pid: Process the phase ran in.
+        tid: Thread the phase ran in.
+    """
+
+    def __init__(self, name, start, wall_time, cpu_time, peak_rss_delta, pid, tid):
+        self.name = name
+        self.start = start
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.peak_rss_delta = peak_rss_delta
+        self.pid = pid
+        self.tid = tid
+
+    def __repr__(self):
+        return (
+            "ProfileRecord(" + self.name + ", wall_time=" + format(self.wall_time, ".4g") + " s, cpu_time="
+            + format(self.cpu_time, ".4g") + " s, peak_rss_delta=" + str(self.peak_rss_delta) + ")"
+        )
+
+
+class EvaluationProfile:
+    """Timing and memory record of the evaluation of one design.
+
+    Attributes:
+        records: ProfileRecord of each step and phase, in the order they completed.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._path = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """Context manager recording the resources used by the code run within it"""
+        self._path.append(name)
+        path = "/".join(self._path)
+        start = time.time()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        rss_start = _peak_rss()
+        try:
+            yield
+        finally:
+            rss_end = _peak_rss()
+            self.records.append(
+                ProfileRecord(
+                    name=path,
+                    start=start,
+                    wall_time=time.perf_counter() - wall_start,
+                    cpu_time=time.thread_time() - cpu_start,
+                    peak_rss_delta=None if rss_start is None else rss_end - rss_start,
+                    pid=os.getpid(),
+                    tid=threading.get_ident(),
+                )
+            )
+            self._path.pop()
+
+    def get_record(self, name: str) -> "ProfileRecord":
+        """Returns the record of the step or phase with the specified path"""
+        for record in self.records:
+            if record.name == name:
+                return record
+        raise KeyError(name)
+
+    def to_trace_events(self) -> List[dict]:
+        """Returns the records as complete events of the Chrome trace event format"""
+        events = []
+        for record in self.records:
+            events.append(
+                {
+                    "name": record.name.split("/")[-1],
+                    "cat": record.name,
+                    "ph": "X",
+                    "ts": record.start * 1e6,
+                    "dur": record.wall_time * 1e6,
+                    "pid": record.pid,
+                    "tid": record.tid,
+                    "args": {"cpu_time": record.cpu_time, "peak_rss_delta": record.peak_rss_delta},
+                }
+            )
+        return events
+
+    def append_to_trace(self, trace_filepath: str):
+        """Appends the trace events of this profile as a single JSON line, which is safe across processes"""
+        line = json.dumps(self.to_trace_events()) + "\n"
+        with open(trace_filepath, "a") as f:
+            f.write(line)
+
+
+def export_chrome_trace(trace_filepath: str, chrome_trace_filepath: str):
+    """Converts a trace file written by MachineEvaluator into a Chrome trace JSON file.
+
+    The resulting file holds the timeline of every evaluation and can be viewed with chrome://tracing or Perfetto.
+
+    Args:
+        trace_filepath: trace_filepath of the MachineEvaluator.
+        chrome_trace_filepath: Path of the Chrome trace file to be written.
+    """
+    events = []
+    with open(trace_filepath) as f:
+        for line in f:
+            if line.strip():
+                events.extend(json.loads(line))
+    with open(chrome_trace_filepath, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+# profile of the evaluation running in the current thread or task, None if profiling is disabled
+_active_profile = ContextVar("_active_profile", default=None)
+
+
+@contextmanager
+def profile_phase(name: str):
+    """Records the code run within the context as a phase of the profiled evaluation, if there is one"""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+    else:
+        with profile.phase(name):
+            yield
+
+
+def _peak_rss():
+    """Peak resident memory of the current process in bytes, or None if unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _step_name(step: "EvaluationStep", index: int) -> str:
+    """Name of an evaluation step used in profiles, made up of its position and its name or analyzer or step class"""
+    if getattr(step, "name", None) is not None:
+        return str(index) + ":" + step.name
+    obj = step.analyzer if isinstance(step, AnalysisStep) else step
+    cls_name = obj.__name__ if isinstance(obj, type) else type(obj).__name__
+    return str(index) + ":" + cls_name
+
+
 @runtime_checkable
 class EvaluationStep(Protocol):
-    """Protocol for an evaluation step"""
+    """Protocol for an evaluation step
+
+    Steps may additionally implement step_many(states_in), which evaluates several states at once and returns the list
+    of results and the list of output states. MachineEvaluator.evaluate_many uses it when available.
+    """
 
     @abstractmethod
     def step(self, state_in: "State") -> Union[Any, "State"]:
@@ -155,18 +1060,43 @@ class Conditions:
     """Class to hold state conditions during machine evaluation.
 
     This is a dummy class whose purpose is hold attributes required by subsequent steps involved in evaluating a machine
-    design.
+    design. Once frozen, the attributes cannot be reassigned; evolve returns a new Conditions object which shares all
+    unchanged attributes with this one.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, **conditions):
+        self.__dict__.update(conditions)
+
+    def __setattr__(self, name, value):
+        _check_not_frozen(self)
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        _check_not_frozen(self)
+        super().__delattr__(name)
+
+    def __deepcopy__(self, memo):
+        return _thawed_deepcopy(self, memo)
+
+    def evolve(self, **changes) -> "Conditions":
+        """Returns new conditions holding the specified changes, sharing all other attributes with these conditions"""
+        conditions = type(self).__new__(type(self))
+        conditions.__dict__.update(self.__dict__)
+        conditions.__dict__.pop("_frozen", None)
+        conditions.__dict__.update(changes)
+        return conditions
+
+    def freeze(self):
+        """Prevents any further reassignment of attributes"""
+        self.__dict__["_frozen"] = True
 
 
 class State:
     """Class to hold the state of machine evaluation over each evaluation step.
 
     The purpose of this class is to hold the Machine object and conditions required for subsequent steps involved in
-    evaluating a machine design.
+    evaluating a machine design. The states passed between evaluation steps are frozen, so a step should derive its
+    output state with evolve rather than modifying its input state. Deep copies of a frozen state can still be modified.
 
     Attributes:
         design: machine design used by the next step
@@ -177,6 +1107,59 @@ class State:
         self.design = design
         self.conditions = conditions
 
+    def __setattr__(self, name, value):
+        _check_not_frozen(self)
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        _check_not_frozen(self)
+        super().__delattr__(name)
+
+    def __deepcopy__(self, memo):
+        return _thawed_deepcopy(self, memo)
+
+    def evolve(self, design: mo.Design = None, **conditions) -> "State":
+        """Returns a new state holding the specified changes.
+
+        Only the changed attributes are replaced; everything else, including the design when no new design is given,
+        is shared with this state rather than copied.
+
+        Args:
+            design: New design of the state. If None, the design of this state is kept.
+            conditions: Condition attributes to be added or replaced.
+        Returns:
+            state_out: New, not yet frozen, state.
+        """
+        state_out = type(self).__new__(type(self))
+        state_out.__dict__.update(self.__dict__)
+        state_out.__dict__.pop("_frozen", None)
+        if design is not None:
+            state_out.__dict__["design"] = design
+        state_out.__dict__["conditions"] = self.conditions.evolve(**conditions)
+        return state_out
+
+    def freeze(self):
+        """Prevents any further reassignment of the attributes of this state and its conditions"""
+        self.__dict__["_frozen"] = True
+        self.conditions.freeze()
+
+
+def _check_not_frozen(obj):
+    if obj.__dict__.get("_frozen", False):
+        raise AttributeError(
+            type(obj).__name__ + " of an evaluated step is read-only, derive a new state with State.evolve instead"
+        )
+
+
+def _thawed_deepcopy(obj, memo):
+    """Deep copies a State or Conditions object, leaving the copy modifiable even if the original is frozen"""
+    copied = type(obj).__new__(type(obj))
+    memo[id(obj)] = copied
+    for name, value in obj.__dict__.items():
+        if name != "_frozen":
+            copied.__dict__[name] = deepcopy(value, memo)
+    return copied
+
 
 class AnalysisStep(EvaluationStep):
     """Class representing a step which involves detailed analysis.
@@ -187,12 +1170,17 @@ class AnalysisStep(EvaluationStep):
         analyzer: class or object which evaluates any aspect of a machine design.
         post_analyzer: class or object which processes the results obtained from the analyzer and packages in a form suitable for
             subsequent steps.
+        reads: Optional names of the conditions, and "design" or attribute paths of the design such as
+            "design.machine.r_ro", read by the step. Used by ConcurrentMachineEvaluator and incremental evaluations.
+        writes: Optional names of the conditions, and "design", written by the step. Used by ConcurrentMachineEvaluator.
     """
 
-    def __init__(self, problem_definition, analyzer, post_analyzer):
+    def __init__(self, problem_definition, analyzer, post_analyzer, reads=None, writes=None):
         self.problem_definition = problem_definition
         self.analyzer = analyzer
         self.post_analyzer = post_analyzer
+        self.reads = reads
+        self.writes = writes
 
     def step(self, state_in: "State") -> Union[Any, "State"]:
         """Method to evaluate design using a analyzer
@@ -203,11 +1191,229 @@ class AnalysisStep(EvaluationStep):
             results: Results obtained from the analyzer.
             state_out: Output state to be used by the next step involved in the machine design evaluation.
         """
-        problem = self.problem_definition.get_problem(state_in)
-        results = self.analyzer.analyze(problem)
-        state_out = self.post_analyzer.get_next_state(results, state_in)
+        with profile_phase("get_problem"):
+            problem = self.problem_definition.get_problem(state_in)
+        with profile_phase("analyze"):
+            results = self._analyze(problem)
+        with profile_phase("get_next_state"):
+            state_out = self.post_analyzer.get_next_state(results, state_in)
         return results, state_out
 
+    def step_many(self, states_in: List["State"]) -> Union[List[Any], List["State"]]:
+        """Evaluates several states at once
+
+        The problems of all states are analyzed in a single call if the analyzer implements analyze_many, and one at a
+        time otherwise.
+
+        Args:
+            states_in: input states which are to be evaluated.
+        Returns:
+            results: Results obtained from the analyzer for each state.
+            states_out: Output state of each input state.
+        """
+        with profile_phase("get_problem"):
+            problems = [self.problem_definition.get_problem(state_in) for state_in in states_in]
+        with profile_phase("analyze"):
+            results = self._analyze_many(problems)
+        with profile_phase("get_next_state"):
+            states_out = [
+                self.post_analyzer.get_next_state(result, state_in) for result, state_in in zip(results, states_in)
+            ]
+        return results, states_out
+
+    def _analyze(self, problem):
+        return self.analyzer.analyze(problem)
+
+    def _analyze_many(self, problems):
+        if hasattr(self.analyzer, "analyze_many"):
+            return list(self.analyzer.analyze_many(problems))
+        return [self._analyze(problem) for problem in problems]
+
+
+class ConstraintStep(EvaluationStep):
+    """Step which ends the evaluation of designs whose state violates a constraint.
+
+    Constraint steps placed right after the steps producing the conditions they check, and before expensive steps,
+    stop invalid designs from being evaluated any further. The predicate must be picklable, for example a module
+    level function, if the evaluator is used by worker processes.
+
+    Attributes:
+        predicate: Function of a state which returns True if the state satisfies the constraint.
+        message: Message of the InvalidDesign raised when the constraint is violated.
+        name: Name of the constraint used in profiles and statistics.
+        reads: Optional names of the conditions, and "design", read by the predicate. Used by
+            ConcurrentMachineEvaluator.
+    """
+
+    def __init__(self, predicate, message="Constraint violated", name=None, reads=None):
+        self.predicate = predicate
+        self.message = message
+        self.name = name if name is not None else getattr(predicate, "__name__", None)
+        self.reads = reads
+        self.writes = ()
+
+    def step(self, state_in: "State") -> Union[Any, "State"]:
+        if not self.predicate(state_in):
+            raise mo.InvalidDesign(self.message)
+        return None, state_in
+
+
+class CachedAnalysisStep(AnalysisStep):
+    """AnalysisStep which reuses the analyzer results of problems it has already analyzed.
+
+    Results are keyed on a content hash of the analyzer, including its attributes such as stress limits when the step is
+    created, and of the problem attributes named in key_fields. Designs which differ only in variables the problem does
+    not depend on therefore share a cache entry, even across optimization runs. The most recently used results are held
+    in memory, and every result is also written to one file per entry in cache_dirpath, which may be shared by the
+    worker processes of an optimization. Results are stored in pickled form, so each hit returns a fresh copy that the
+    post-analyzer may modify. Analyses which raise an exception are not cached.
+
+    Attributes:
+        key_fields: Names of the problem attributes the results depend on. If None, all problem attributes are used.
+        max_size: Maximum number of results held in memory.
+        cache_dirpath: Optional directory where results are persisted, created when the first result is stored.
+        version: Value included in every key, to be changed whenever the analyzer implementation changes.
+        hits: Number of analyses served from the cache.
+        misses: Number of analyses that had to be run.
+    """
+
+    def __init__(
+        self,
+        problem_definition,
+        analyzer,
+        post_analyzer,
+        key_fields=None,
+        max_size=1000,
+        cache_dirpath=None,
+        version=None,
+        reads=None,
+        writes=None,
+    ):
+        super().__init__(problem_definition, analyzer, post_analyzer, reads=reads, writes=writes)
+        self.key_fields = key_fields
+        self.max_size = max_size
+        self.cache_dirpath = cache_dirpath
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        hasher = hashlib.sha256()
+        _hash_content(analyzer, hasher, set())
+        self._analyzer_key = hasher.hexdigest()
+
+    def key(self, problem) -> str:
+        """Returns the content hash identifying the results of a problem"""
+        if self.key_fields is None:
+            fields = vars(problem)
+        else:
+            fields = {name: getattr(problem, name) for name in self.key_fields}
+        hasher = hashlib.sha256()
+        _hash_content((self._analyzer_key, self.version, fields), hasher, set())
+        return hasher.hexdigest()
+
+    def _analyze(self, problem):
+        key = self.key(problem)
+        data = self._get(key)
+        if data is not None:
+            self.hits = self.hits + 1
+            return pickle.loads(data)
+        self.misses = self.misses + 1
+        results = self.analyzer.analyze(problem)
+        self._put(key, pickle.dumps(results, -1))
+        return results
+
+    def _analyze_many(self, problems):
+        keys = [self.key(problem) for problem in problems]
+        results = [None] * len(problems)
+        missed = []
+        for i, key in enumerate(keys):
+            data = self._get(key)
+            if data is None:
+                missed.append(i)
+            else:
+                results[i] = pickle.loads(data)
+        self.hits = self.hits + len(problems) - len(missed)
+        self.misses = self.misses + len(missed)
+        if missed:
+            missed_problems = [problems[i] for i in missed]
+            if hasattr(self.analyzer, "analyze_many"):
+                missed_results = list(self.analyzer.analyze_many(missed_problems))
+            else:
+                missed_results = [self.analyzer.analyze(problem) for problem in missed_problems]
+            for i, result in zip(missed, missed_results):
+                self._put(keys[i], pickle.dumps(result, -1))
+                results[i] = result
+        return results
+
+    def _get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        if self.cache_dirpath is None:
+            return None
+        try:
+            with open(self._entry_filepath(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def _put(self, key, data):
+        self._remember(key, data)
+        if self.cache_dirpath is not None:
+            os.makedirs(self.cache_dirpath, exist_ok=True)
+            # each writer uses its own temporary file so that concurrent processes never see a partial entry
+            tmp_filepath = self._entry_filepath(key) + "." + str(os.getpid()) + "-" + str(threading.get_ident())
+            with open(tmp_filepath, "wb") as f:
+                f.write(data)
+            os.replace(tmp_filepath, self._entry_filepath(key))
+
+    def _remember(self, key, data):
+        self.entries[key] = data
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def _entry_filepath(self, key):
+        return os.path.join(self.cache_dirpath, key + ".pkl")
+
+
+def _hash_content(obj, hasher, active: set):
+    """Feeds a type-tagged, canonical representation of an object into a hash"""
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        hasher.update((type(obj).__name__ + ":" + repr(obj) + ";").encode())
+    elif isinstance(obj, np.ndarray):
+        hasher.update(("ndarray:" + obj.dtype.str + str(obj.shape) + ";").encode())
+        hasher.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, np.generic):
+        _hash_content(obj.item(), hasher, active)
+    elif isinstance(obj, type) or callable(obj) and hasattr(obj, "__qualname__"):
+        hasher.update(("type:" + obj.__module__ + "." + obj.__qualname__ + ";").encode())
+    elif id(obj) in active:
+        hasher.update(b"cycle;")
+    elif isinstance(obj, (list, tuple, dict)) or hasattr(obj, "__dict__"):
+        active.add(id(obj))
+        if isinstance(obj, (list, tuple)):
+            hasher.update((type(obj).__name__ + str(len(obj)) + "[").encode())
+            for item in obj:
+                _hash_content(item, hasher, active)
+        else:
+            items = obj if isinstance(obj, dict) else vars(obj)
+            hasher.update((type(obj).__qualname__ + str(len(items)) + "{").encode())
+            for name in sorted(items, key=repr):
+                _hash_content(name, hasher, active)
+                _hash_content(items[name], hasher, active)
+        hasher.update(b"]")
+        active.remove(id(obj))
+    else:
+        hasher.update(type(obj).__qualname__.encode())
+        try:
+            hasher.update(pickle.dumps(obj, -1))
+        except Exception:
+            # objects such as handles to external applications only contribute their type
+            pass
+
 
 class ProblemDefinition(Protocol):
     """Protocol for a problem definition"""
@@ -223,7 +1429,12 @@ class Problem:
 
 
 class Analyzer(Protocol):
-    """Protocol for an analyzer"""
+    """Protocol for an analyzer
+
+    Analyzers may additionally implement analyze_many(problems), which returns the list of results of several problems
+    computed together, for example by stacking their attributes into arrays. AnalysisStep uses it to evaluate designs
+    passed to MachineEvaluator.evaluate_many.
+    """
 
     @abstractmethod
     def analyze(self, problem: "Problem") -> Any:
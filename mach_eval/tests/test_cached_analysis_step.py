@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import mach_eval as me
+import mach_opt as mo
+from mach_eval.tests.toy_evaluation import CountingAnalyzer
+
+
+class SleeveProblem:
+    def __init__(self, r_ro, speed, stator_width):
+        self.r_ro = r_ro
+        self.speed = speed
+        self.stator_width = stator_width
+        self.mat_dict = {"density": 7800.0, "E": np.array([200e9, 0.3])}
+
+
+class SleeveProblemDefinition:
+    def get_problem(state):
+        return SleeveProblem(*state.design)
+
+
+def sleeve_thickness(problem):
+    if problem.speed < 0:
+        raise mo.InvalidDesign("negative speed")
+    return {"d_sl": problem.r_ro * problem.speed}
+
+
+class SleevePostAnalyzer:
+    def get_next_state(results, in_state):
+        results["d_sl"] = results["d_sl"] * 2
+        return in_state.evolve(sleeve=results)
+
+
+def make_step(analyzer, cache_dirpath=None):
+    return me.CachedAnalysisStep(
+        SleeveProblemDefinition,
+        analyzer,
+        SleevePostAnalyzer,
+        key_fields=["r_ro", "speed", "mat_dict"],
+        cache_dirpath=cache_dirpath,
+    )
+
+
+def evaluate(step, design):
+    return me.MachineEvaluator([step]).evaluate(design)[-1][-1].conditions.sleeve
+
+
+class TestCachedAnalysisStep(unittest.TestCase):
+    def test_reuses_results_of_relevant_fields(self):
+        analyzer = CountingAnalyzer(sleeve_thickness)
+        step = make_step(analyzer)
+        self.assertEqual(evaluate(step, (1.0, 2.0, 0.1)), {"d_sl": 4.0})
+        # the post-analyzer modifying the results must not affect the cached entry
+        self.assertEqual(evaluate(step, (1.0, 2.0, 0.5)), {"d_sl": 4.0})
+        self.assertEqual(evaluate(step, (1.5, 2.0, 0.5)), {"d_sl": 6.0})
+        self.assertEqual(analyzer.count, 2)
+        self.assertEqual((step.hits, step.misses), (1, 2))
+
+    def test_errors_are_not_cached(self):
+        analyzer = CountingAnalyzer(sleeve_thickness)
+        step = make_step(analyzer)
+        for _ in range(2):
+            with self.assertRaises(mo.InvalidDesign):
+                evaluate(step, (1.0, -1.0, 0.1))
+        self.assertEqual(analyzer.count, 2)
+
+    def test_cache_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dirpath = os.path.join(tmp, "cache")
+            step = make_step(CountingAnalyzer(sleeve_thickness), cache_dirpath)
+            # the cache directory is only created once a result is stored
+            self.assertFalse(os.path.exists(cache_dirpath))
+            evaluate(step, (1.0, 2.0, 0.1))
+            self.assertTrue(os.path.isdir(cache_dirpath))
+            analyzer = CountingAnalyzer(sleeve_thickness)
+            step = make_step(analyzer, cache_dirpath)
+            self.assertEqual(evaluate(step, (1.0, 2.0, 0.3)), {"d_sl": 4.0})
+            self.assertEqual(analyzer.count, 0)
+            self.assertEqual(step.hits, 1)
+
+    def test_key_depends_on_content(self):
+        step = make_step(CountingAnalyzer(sleeve_thickness))
+        problem = SleeveProblem(1.0, 2.0, 0.1)
+        other = SleeveProblem(1.0, 2.0, 0.1)
+        self.assertEqual(step.key(problem), step.key(other))
+        other.mat_dict["E"][0] = 190e9
+        self.assertNotEqual(step.key(problem), step.key(other))
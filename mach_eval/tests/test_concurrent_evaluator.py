@@ -0,0 +1,84 @@
+import time
+import unittest
+
+import mach_eval as me
+import mach_opt as mo
+
+
+class SumStep:
+    """Sleeps, then writes the sum of the conditions it reads plus the design"""
+
+    def __init__(self, reads, writes, delay=0.0):
+        self.reads = reads
+        self.writes = writes
+        self.delay = delay
+
+    def step(self, state_in):
+        time.sleep(self.delay)
+        total = state_in.design + sum(getattr(state_in.conditions, key) for key in self.reads)
+        state_out = state_in.evolve(**{key: total for key in self.writes})
+        return total, state_out
+
+
+class FailingStep(SumStep):
+    def step(self, state_in):
+        time.sleep(self.delay)
+        raise mo.InvalidDesign(str(self.writes))
+
+
+class UndeclaredStep(SumStep):
+    def step(self, state_in):
+        return None, state_in.evolve(em=1)
+
+
+def make_steps(delay=0.0):
+    return [
+        SumStep(reads=(), writes=("em",), delay=delay),
+        SumStep(reads=("em",), writes=("airflow",), delay=delay),
+        SumStep(reads=("em",), writes=("T_coil",), delay=delay),
+        SumStep(reads=("em", "airflow"), writes=("windage",), delay=delay),
+    ]
+
+
+class TestConcurrentMachineEvaluator(unittest.TestCase):
+    def test_dependencies(self):
+        evaluator = me.ConcurrentMachineEvaluator(make_steps())
+        self.assertEqual(evaluator.dependencies, [[], [0], [0], [0, 1]])
+
+    def test_matches_sequential_evaluation(self):
+        sequential = me.MachineEvaluator(make_steps()).evaluate(1)
+        concurrent = me.ConcurrentMachineEvaluator(make_steps()).evaluate(1)
+        self.assertEqual(len(sequential), len(concurrent))
+        for entry, expected in zip(concurrent, sequential):
+            self.assertEqual(entry[1], expected[1])
+            self.assertEqual(vars(entry[2].conditions), vars(expected[2].conditions))
+
+    def test_independent_steps_run_concurrently(self):
+        evaluator = me.ConcurrentMachineEvaluator(make_steps(delay=0.2))
+        start = time.perf_counter()
+        full_results = evaluator.evaluate(1)
+        elapsed = time.perf_counter() - start
+        evaluator.close()
+        self.assertEqual(full_results[-1][-1].conditions.windage, 4)
+        self.assertLess(elapsed, 0.75)
+
+    def test_process_executor(self):
+        evaluator = me.ConcurrentMachineEvaluator(make_steps(), executor="process")
+        try:
+            full_results = evaluator.evaluate(1)
+        finally:
+            evaluator.close()
+        self.assertEqual(full_results[-1][-1].conditions.windage, 4)
+        self.assertEqual(full_results[-1][-1].conditions.T_coil, 2)
+
+    def test_undeclared_write(self):
+        evaluator = me.ConcurrentMachineEvaluator([UndeclaredStep(reads=(), writes=("airflow",))])
+        with self.assertRaises(ValueError):
+            evaluator.evaluate(1)
+
+    def test_first_failing_step_is_raised(self):
+        steps = make_steps()
+        steps[1] = FailingStep(reads=("em",), writes=("airflow",), delay=0.2)
+        steps[2] = FailingStep(reads=("em",), writes=("T_coil",))
+        with self.assertRaisesRegex(mo.InvalidDesign, "airflow"):
+            me.ConcurrentMachineEvaluator(steps).evaluate(1)
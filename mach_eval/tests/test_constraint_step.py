@@ -0,0 +1,58 @@
+import time
+import unittest
+
+import mach_eval as me
+import mach_opt as mo
+from mach_eval.tests.toy_evaluation import make_evaluator, scale_step
+
+
+class SlowStep:
+    def step(self, state_in):
+        time.sleep(0.05)
+        return None, state_in.evolve(slow=True)
+
+
+class DeclaredSlowStep(SlowStep):
+    reads = ()
+    writes = ("slow",)
+
+
+def scale_below_limit(state):
+    return state.conditions.scale < 10
+
+
+def constraint_steps():
+    return [me.ConstraintStep(scale_below_limit, "scale too large"), SlowStep()]
+
+
+class TestConstraintStep(unittest.TestCase):
+    def test_violated_constraint_aborts_evaluation(self):
+        evaluator = make_evaluator(*constraint_steps())
+        full_results = evaluator.evaluate(2)
+        self.assertTrue(full_results[-1][-1].conditions.slow)
+        with self.assertRaisesRegex(mo.InvalidDesign, "scale too large"):
+            evaluator.evaluate(4)
+
+    def test_abort_statistics(self):
+        for evaluator_class in [me.MachineEvaluator, me.ConcurrentMachineEvaluator]:
+            with self.subTest(evaluator_class.__name__):
+                evaluator = make_evaluator(*constraint_steps(), evaluator_class=evaluator_class)
+                for design in [1, 2, 4, 5]:
+                    try:
+                        evaluator.evaluate(design)
+                    except mo.InvalidDesign:
+                        pass
+                stats = evaluator.abort_statistics
+                self.assertEqual(stats.evaluations, 4)
+                self.assertEqual(stats.aborted, [0, 2, 0])
+                self.assertEqual(stats.step_counts, [4, 2, 2])
+                self.assertGreater(stats.time_saved, 2 * 0.04)
+                self.assertIn("1:scale_below_limit", stats.report(evaluator.steps))
+
+    def test_constraint_gates_concurrent_steps(self):
+        steps = [
+            scale_step(reads=("design",), writes=("scale",)),
+            me.ConstraintStep(scale_below_limit, reads=("scale",)),
+            DeclaredSlowStep(),
+        ]
+        self.assertEqual(me.ConcurrentMachineEvaluator(steps).dependencies, [[], [0], [1]])
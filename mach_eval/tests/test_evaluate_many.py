@@ -0,0 +1,49 @@
+import unittest
+
+import mach_eval as me
+import mach_opt as mo
+from mach_eval.tests.toy_evaluation import make_evaluator, scale_step
+
+
+class BatchSquareAnalyzer:
+    def __init__(self):
+        self.batches = []
+
+    def analyze(self, problem):
+        if problem < 0:
+            raise mo.InvalidDesign("negative design")
+        return problem**2
+
+    def analyze_many(self, problems):
+        self.batches.append(len(problems))
+        return [self.analyze(problem) for problem in problems]
+
+
+class OffsetStep:
+    """Step without step_many"""
+
+    def step(self, state_in):
+        return None, state_in.evolve(scale=state_in.conditions.scale + 1)
+
+
+class TestEvaluateMany(unittest.TestCase):
+    def test_matches_evaluate(self):
+        analyzer = BatchSquareAnalyzer()
+        evaluator = me.MachineEvaluator([scale_step(analyzer), OffsetStep(), scale_step(analyzer)])
+        designs = [1, 2, 3]
+        outcomes = evaluator.evaluate_many(designs)
+        self.assertEqual(analyzer.batches, [3, 3])
+        for design, full_results in zip(designs, outcomes):
+            expected = evaluator.evaluate(design)
+            self.assertEqual(len(full_results), len(expected))
+            self.assertEqual(full_results[-1][-1].conditions.scale, expected[-1][-1].conditions.scale)
+
+    def test_failing_designs_are_isolated(self):
+        analyzer = BatchSquareAnalyzer()
+        evaluator = make_evaluator(n_scale_steps=2, analyzer=analyzer, retention="final")
+        outcomes = evaluator.evaluate_many([1, -2, 3])
+        self.assertIsInstance(outcomes[1], mo.InvalidDesign)
+        self.assertEqual(outcomes[0][-1][-1].conditions.scale, 1)
+        self.assertEqual(outcomes[2][-1][-1].conditions.scale, 3 * 9 * 3 * 9)
+        # the failed batch is retried one design at a time, and the next step only batches the valid designs
+        self.assertEqual(analyzer.batches, [3, 2])
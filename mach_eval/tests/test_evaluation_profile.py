@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+from copy import deepcopy
+
+import mach_eval as me
+from mach_eval.tests.toy_evaluation import make_evaluator
+
+
+class ScalePostAnalyzer:
+    def get_next_state(results, in_state):
+        state_out = deepcopy(in_state)
+        state_out.conditions.scale = results
+        return state_out
+
+
+class TestEvaluationProfile(unittest.TestCase):
+    def test_profiling_disabled_by_default(self):
+        full_results = make_evaluator(n_scale_steps=2, post_analyzer=ScalePostAnalyzer).evaluate(2)
+        self.assertEqual(type(full_results), list)
+        self.assertEqual(full_results[-1][-1].conditions.scale, 64)
+
+    def test_records_steps_and_phases(self):
+        evaluator = make_evaluator(n_scale_steps=2, post_analyzer=ScalePostAnalyzer, profile=True)
+        full_results = evaluator.evaluate(2)
+        self.assertEqual(full_results[-1][-1].conditions.scale, 64)
+        names = [record.name for record in full_results.profile.records]
+        for step in ["0:SquareAnalyzer", "1:SquareAnalyzer"]:
+            for phase in ["get_problem", "analyze", "get_next_state", "freeze"]:
+                self.assertIn(step + "/" + phase, names)
+            self.assertIn(step, names)
+
+        step = full_results.profile.get_record("0:SquareAnalyzer")
+        analyze = full_results.profile.get_record("0:SquareAnalyzer/analyze")
+        self.assertGreaterEqual(step.wall_time, analyze.wall_time)
+        self.assertGreaterEqual(analyze.cpu_time, 0)
+
+    def test_chrome_trace_export(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_file = os.path.join(tmp, "trace.jsonl")
+            evaluator = make_evaluator(n_scale_steps=2, post_analyzer=ScalePostAnalyzer, trace_filepath=trace_file)
+            evaluator.evaluate(2)
+            evaluator.evaluate(3)
+            chrome_file = os.path.join(tmp, "trace.json")
+            me.export_chrome_trace(trace_file, chrome_file)
+            with open(chrome_file) as f:
+                events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), 2 * 2 * 5)
+        self.assertTrue(all(event["ph"] == "X" for event in events))
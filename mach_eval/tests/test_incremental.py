@@ -0,0 +1,141 @@
+import unittest
+
+import mach_eval as me
+from mach_eval.mach_eval import _steps_conflict
+from mach_eval.tests.toy_evaluation import CountingAnalyzer
+
+
+class Design:
+    def __init__(self, rotor, stator, sleeve=None):
+        self.rotor = rotor
+        self.stator = stator
+        self.sleeve = sleeve
+
+
+class RotorProblemDefinition:
+    def get_problem(state):
+        return state.design.rotor
+
+
+class StatorProblemDefinition:
+    def get_problem(state):
+        return state.design.stator
+
+
+class SleevePostAnalyzer:
+    def get_next_state(results, in_state):
+        design = Design(in_state.design.rotor, in_state.design.stator, sleeve=results)
+        return in_state.evolve(design=design)
+
+
+class StatorPostAnalyzer:
+    def get_next_state(results, in_state):
+        return in_state.evolve(stator_loss=results)
+
+
+class TotalStep:
+    reads = ("stator_loss", "design.sleeve")
+    writes = ("total",)
+
+    def __init__(self):
+        self.count = 0
+
+    def step(self, state_in):
+        self.count = self.count + 1
+        return None, state_in.evolve(total=state_in.conditions.stator_loss + state_in.design.sleeve)
+
+
+def make_evaluator(evaluator_class=me.MachineEvaluator, **kwargs):
+    rotor_analyzer = CountingAnalyzer()
+    stator_analyzer = CountingAnalyzer()
+    total_step = TotalStep()
+    steps = [
+        me.AnalysisStep(
+            RotorProblemDefinition, rotor_analyzer, SleevePostAnalyzer, reads=("design.rotor",), writes=("design",)
+        ),
+        me.AnalysisStep(
+            StatorProblemDefinition,
+            stator_analyzer,
+            StatorPostAnalyzer,
+            reads=("design.stator",),
+            writes=("stator_loss",),
+        ),
+        total_step,
+    ]
+    return evaluator_class(steps, **kwargs), rotor_analyzer, stator_analyzer, total_step
+
+
+class IncrementalEvaluationTest(unittest.TestCase):
+    def test_reuses_steps_with_unchanged_inputs(self):
+        evaluator, rotor_analyzer, stator_analyzer, total_step = make_evaluator()
+        reference = evaluator.evaluate(Design(2, 3))
+        full_results = evaluator.evaluate_incremental(Design(2, 5), reference)
+
+        self.assertEqual(rotor_analyzer.count, 1)
+        self.assertEqual(stator_analyzer.count, 2)
+        self.assertEqual(total_step.count, 2)
+        self.assertEqual(evaluator.reuse_counts, [1, 0, 0])
+        final_state = full_results[-1][-1]
+        # the reused step builds its output design from the new design
+        self.assertEqual(final_state.design.stator, 5)
+        self.assertEqual(final_state.design.sleeve, 4)
+        self.assertEqual(final_state.conditions.total, 29)
+
+    def test_matches_full_evaluation(self):
+        evaluator, _, _, _ = make_evaluator()
+        reference = evaluator.evaluate(Design(2, 3))
+        incremental = evaluator.evaluate_incremental(Design(4, 3), reference)
+        full = evaluator.evaluate(Design(4, 3))
+        self.assertEqual(evaluator.reuse_counts, [0, 1, 0])
+        self.assertEqual(incremental[-1][-1].conditions.total, full[-1][-1].conditions.total)
+        self.assertEqual(incremental[-1][-1].design.sleeve, full[-1][-1].design.sleeve)
+
+    def test_undeclared_reads_are_always_evaluated(self):
+        evaluator, _, _, total_step = make_evaluator()
+        total_step.reads = None
+        reference = evaluator.evaluate(Design(2, 3))
+        evaluator.evaluate_incremental(Design(2, 3), reference)
+        self.assertEqual(total_step.count, 2)
+        self.assertEqual(evaluator.reuse_counts, [1, 1, 0])
+
+    def test_incremental_mode(self):
+        evaluator, rotor_analyzer, stator_analyzer, _ = make_evaluator(incremental=True, retention="final")
+        evaluator.evaluate(Design(2, 3))
+        full_results = evaluator.evaluate(Design(2, 5))
+        self.assertEqual(len(full_results), 1)
+        self.assertEqual(full_results[-1][-1].conditions.total, 29)
+        self.assertEqual(rotor_analyzer.count, 1)
+        self.assertEqual(stator_analyzer.count, 2)
+        self.assertEqual(len(evaluator.reference), 3)
+
+    def test_concurrent_incremental_mode(self):
+        evaluator, rotor_analyzer, stator_analyzer, total_step = make_evaluator(
+            me.ConcurrentMachineEvaluator, incremental=True
+        )
+        evaluator.evaluate(Design(2, 3))
+        full_results = evaluator.evaluate(Design(2, 5))
+        self.assertEqual(evaluator.reuse_counts, [1, 0, 0])
+        self.assertEqual(full_results[-1][-1].design.stator, 5)
+        self.assertEqual(full_results[-1][-1].conditions.total, 29)
+
+        full_results = evaluator.evaluate(Design(4, 5))
+        self.assertEqual(evaluator.reuse_counts, [1, 1, 0])
+        self.assertEqual(full_results[-1][-1].conditions.total, 41)
+        self.assertEqual((rotor_analyzer.count, stator_analyzer.count, total_step.count), (2, 2, 3))
+
+    def test_reference_must_retain_all_states(self):
+        evaluator, _, _, _ = make_evaluator(retention="summary")
+        reference = evaluator.evaluate(Design(2, 3))
+        with self.assertRaises(ValueError):
+            evaluator.evaluate_incremental(Design(2, 5), reference)
+
+    def test_design_attribute_reads_conflict_with_design_writes(self):
+        evaluator, _, _, total_step = make_evaluator()
+        self.assertTrue(_steps_conflict(total_step, evaluator.steps[0]))
+        self.assertTrue(_steps_conflict(evaluator.steps[1], evaluator.steps[0]))
+        rotor_check = me.ConstraintStep(lambda state: True, reads=("design.rotor",))
+        self.assertFalse(_steps_conflict(rotor_check, evaluator.steps[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
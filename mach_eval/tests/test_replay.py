@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+import mach_opt as mo
+from mach_eval.tests.toy_evaluation import CountingAnalyzer, make_evaluator
+
+
+class HalfScalePostAnalyzer:
+    """Updated post-processing"""
+
+    def get_next_state(results, in_state):
+        return in_state.evolve(scale=results / 2)
+
+
+class OffsetStep:
+    def step(self, state_in):
+        return None, state_in.evolve(offset=state_in.conditions.scale + 1)
+
+
+class ScaleDesigner:
+    def create_design(self, x):
+        return float(x[0])
+
+
+class ScaleDesignSpace:
+    def check_constraints(self, full_results):
+        return True
+
+    def get_objectives(self, full_results):
+        conditions = full_results[-1][-1].conditions
+        return conditions.scale, conditions.offset
+
+    @property
+    def n_obj(self):
+        return 2
+
+    @property
+    def bounds(self):
+        return ([0], [10])
+
+
+class TestReplay(unittest.TestCase):
+    def test_replay_reuses_raw_results(self):
+        analyzer = CountingAnalyzer()
+        full_results = make_evaluator(OffsetStep(), analyzer=analyzer).evaluate(3)
+        self.assertEqual(full_results[-1][-1].conditions.offset, 10)
+        evaluator = make_evaluator(OffsetStep(), analyzer=analyzer, post_analyzer=HalfScalePostAnalyzer)
+        replayed = evaluator.replay(3, full_results, [0])
+        self.assertEqual(analyzer.count, 1)
+        self.assertEqual(replayed[-1][-1].conditions.scale, 4.5)
+        self.assertEqual(replayed[-1][-1].conditions.offset, 5.5)
+
+    def test_replay_archive(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source_dh = mo.DataHandler(os.path.join(tmp, "arch.pkl"), os.path.join(tmp, "designer.pkl"))
+            prob = mo.DesignProblem(ScaleDesigner(), make_evaluator(OffsetStep()), ScaleDesignSpace(), source_dh)
+            for x in [1, 2, 3]:
+                prob.fitness([x])
+
+            target_dh = mo.DataHandler(os.path.join(tmp, "replay.pkl"), os.path.join(tmp, "designer.pkl"))
+            prob = mo.DesignProblem(
+                ScaleDesigner(),
+                make_evaluator(OffsetStep(), post_analyzer=HalfScalePostAnalyzer),
+                ScaleDesignSpace(),
+                target_dh,
+            )
+            for n_workers in [None, 2]:
+                replayed = prob.replay_archive(source_dh, [0], n_workers=n_workers)
+                self.assertEqual([objs for _, objs in replayed], [(0.5, 1.5), (2.0, 3.0), (4.5, 5.5)])
+            self.assertEqual(len(target_dh.get_archive_data()[0]), 6)
@@ -0,0 +1,31 @@
+import unittest
+
+from mach_eval.tests.toy_evaluation import make_evaluator
+
+
+class TestRetention(unittest.TestCase):
+    def test_all(self):
+        full_results = make_evaluator(n_scale_steps=3, retention="all").evaluate(2)
+        self.assertEqual(len(full_results), 3)
+        self.assertEqual(full_results[1][1], 64)
+        self.assertEqual(full_results[-1][-1].conditions.scale, 2**14)
+
+    def test_final(self):
+        full_results = make_evaluator(n_scale_steps=3, retention="final").evaluate(2)
+        self.assertEqual(len(full_results), 1)
+        self.assertIsNone(full_results[0][1])
+        self.assertEqual(full_results[-1][-1].conditions.scale, 2**14)
+
+    def test_summary(self):
+        full_results = make_evaluator(n_scale_steps=3, retention="summary").evaluate(2)
+        self.assertEqual(len(full_results), 3)
+        summary = full_results[1][1]
+        self.assertEqual(summary.name, "1:SquareAnalyzer")
+        self.assertEqual(summary.conditions, {"scale": 64})
+        self.assertFalse(summary.design_changed)
+        self.assertIsNone(full_results[0][2])
+        self.assertEqual(full_results[-1][-1].conditions.scale, 2**14)
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            make_evaluator(n_scale_steps=3, retention="none")
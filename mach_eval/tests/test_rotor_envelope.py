@@ -0,0 +1,109 @@
+import unittest
+
+import numpy as np
+
+from mach_eval.analyzers.mechanical.rotor_structural import (
+    SPM_RotorStructuralProblem,
+    SPM_RotorStructuralAnalyzer,
+    MultiLayer_RotorStructuralProblem,
+    MultiLayer_RotorStructuralAnalyzer,
+)
+from mach_eval.analyzers.mechanical.rotor_envelope import (
+    CONSTRAINTS,
+    SPM_RotorEnvelopeProblem,
+    SPM_RotorEnvelopeAnalyzer,
+)
+from mach_eval.tests.test_rotor_structural import mat_dict, stress_limits
+
+
+class TestSPMRotorEnvelope(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.problem = SPM_RotorEnvelopeProblem(
+            5e-3, 2e-3, 12.5e-3, 0.8e-3, mat_dict, np.linspace(0, 100, 6), np.linspace(-2e-4, -1e-5, 9), 200e3
+        )
+        cls.analyzer = SPM_RotorEnvelopeAnalyzer(stress_limits)
+        cls.envelope = cls.analyzer.analyze(cls.problem)
+
+    def smallest_margin(self, N, deltaT, delta_sl, analyzer=MultiLayer_RotorStructuralAnalyzer):
+        """Smallest constraint margin of a single operating point, from the scalar solve of a structural analyzer"""
+        spm = SPM_RotorStructuralProblem(5e-3, 2e-3, 12.5e-3, 0.8e-3, delta_sl, deltaT, N, mat_dict)
+        if analyzer is SPM_RotorStructuralAnalyzer:
+            sigmas = analyzer().analyze(spm)
+        else:
+            problem = MultiLayer_RotorStructuralProblem([spm.sh, spm.rc, spm.pm, spm.sl], deltaT, N, [0, 0, delta_sl])
+            sigmas = analyzer().analyze(problem)
+        stresses = [
+            sigmas[3].radial(12.5e-3),
+            sigmas[3].tangential(12.5e-3),
+            sigmas[2].radial(10.5e-3),
+            sigmas[2].tangential(10.5e-3),
+        ]
+        return float(np.min(self.analyzer._margins(self.problem, np.squeeze(stresses))))
+
+    def test_safe_speeds_match_speed_sweep(self):
+        for i, j in [(0, 4), (1, 6), (3, 8), (5, 5)]:
+            deltaT = self.problem.deltaT[i]
+            delta_sl = self.problem.delta_sl[j]
+            N_min = self.envelope.N_min[i, j]
+            N_max = self.envelope.N_max[i, j]
+            self.assertLess(N_min, N_max)
+            for N in np.linspace(N_min, N_max, 7)[1:-1]:
+                self.assertGreater(self.smallest_margin(N, deltaT, delta_sl), 0)
+            self.assertLess(self.smallest_margin(N_max * (1 + 1e-6), deltaT, delta_sl), 0)
+            self.assertAlmostEqual(self.smallest_margin(N_max, deltaT, delta_sl) / 1e6, 0, places=3)
+            if N_min > 0:
+                self.assertLess(self.smallest_margin(N_min * (1 - 1e-6), deltaT, delta_sl), 0)
+
+    def test_speed_included_at_every_interface(self):
+        # at its burst speed, the SPM analyzer, which leaves the speed out of the displacement at the core-magnet and
+        # magnet-sleeve interfaces, misjudges the stresses of the rotor by tens of MPa
+        deltaT = self.problem.deltaT[0]
+        delta_sl = self.problem.delta_sl[4]
+        N_max = self.envelope.N_max[0, 4]
+        self.assertGreater(N_max, 150e3)
+        self.assertAlmostEqual(self.smallest_margin(N_max, deltaT, delta_sl) / 1e6, 0, places=3)
+        spm_margin = self.smallest_margin(N_max, deltaT, delta_sl, analyzer=SPM_RotorStructuralAnalyzer)
+        self.assertGreater(abs(spm_margin), 10e6)
+
+    def test_unsafe_interference(self):
+        # the sleeve presses the magnets beyond the radial stress limit at every speed
+        self.assertTrue(np.isnan(self.envelope.N_max[0, 0]))
+        self.assertIsNone(self.envelope.speed_range(0, -1.9e-4))
+        self.assertEqual(CONSTRAINTS[self.envelope.limit[0, -1]], "rad_magnets")
+
+    def test_interpolated_speeds_are_safe(self):
+        rng = np.random.default_rng(0)
+        for deltaT, delta_sl in zip(rng.uniform(0, 100, 20), rng.uniform(-2e-4, -1e-5, 20)):
+            speeds = self.envelope.speed_range(deltaT, delta_sl)
+            if speeds is None:
+                continue
+            for N in speeds:
+                self.assertGreater(self.smallest_margin(N, deltaT, delta_sl), -1e-3)
+            self.assertTrue(self.envelope.is_safe(np.mean(speeds), deltaT, delta_sl))
+            self.assertFalse(self.envelope.is_safe(speeds[1] * 1.01, deltaT, delta_sl))
+
+    def test_outside_of_grid(self):
+        self.assertIsNone(self.envelope.speed_range(110, -1e-4))
+        self.assertIsNone(self.envelope.min_contact_pressure(50, -3e-4))
+        self.assertFalse(self.envelope.is_safe(10e3, 50, 0))
+
+    def test_min_contact_pressure(self):
+        problem = SPM_RotorEnvelopeProblem(
+            5e-3, 2e-3, 12.5e-3, 0.8e-3, mat_dict, 40, [-4e-5, -3e-5], 200e3, min_contact_pressure=20e6
+        )
+        reference = SPM_RotorEnvelopeProblem(5e-3, 2e-3, 12.5e-3, 0.8e-3, mat_dict, 40, [-4e-5, -3e-5], 200e3)
+        envelope = self.analyzer.analyze(problem)
+        reference_envelope = self.analyzer.analyze(reference)
+        np.testing.assert_array_less(reference_envelope.contact_pressure[0, 1], 20e6)
+        # the centrifugal expansion of the sleeve relieves the contact pressure, so that the requirement sets the
+        # highest safe speed
+        self.assertLess(envelope.N_max[0, 1], reference_envelope.N_max[0, 1])
+        self.assertEqual(CONSTRAINTS[envelope.limit[0, 1]], "contact_pressure")
+        self.assertAlmostEqual(envelope.contact_pressure[0, 1] / 20e6, 1, places=6)
+        self.assertAlmostEqual(self.analyzer.margins(problem, envelope.N_max[0, 1], 40, -3e-5)[1] / 1e6, 0, places=3)
+        np.testing.assert_array_equal(envelope.N_min, reference_envelope.N_min)
+        self.assertEqual(envelope.N_max[0, 0], reference_envelope.N_max[0, 0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import contextlib
+import copy
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from mach_eval.analyzers.mechanical.rotor_structural import SPM_RotorSleeveProblem, SPM_RotorSleeveAnalyzer
+from mach_eval.analyzers.mechanical.rotor_sleeve_table import SPM_RotorSleeveTable, SPM_RotorSleeveTableAnalyzer
+from mach_eval.tests.test_rotor_structural import mat_dict, stress_limits
+
+
+def exact_sleeve(r_sh, d_m, r_ro, N, deltaT):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return SPM_RotorSleeveAnalyzer(stress_limits).analyze(
+            SPM_RotorSleeveProblem(r_sh, d_m, r_ro, deltaT, mat_dict, N)
+        )
+
+
+class TestSPMRotorSleeveTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.table = SPM_RotorSleeveTable.build(
+            mat_dict, stress_limits, 5e-3, 2e-3, [12.5e-3, 12.75e-3, 13e-3], np.linspace(60e3, 100e3, 5), [20, 40, 60]
+        )
+
+    def test_interpolation_within_error_bound(self):
+        query = (5e-3, 2e-3, 12.7e-3, 75e3, 30)
+        d_sl, delta_sl, error, error_delta = self.table.interpolate(*query)
+        exact = exact_sleeve(*query)
+        self.assertLess(abs(d_sl - exact[0]), max(2 * error, 1e-6))
+        self.assertLess(abs(delta_sl - exact[1]), max(2 * error_delta, 1e-6))
+
+    def test_outside_of_table(self):
+        self.assertIsNone(self.table.interpolate(5e-3, 2e-3, 12.7e-3, 110e3, 30))
+        self.assertIsNone(self.table.interpolate(5e-3, 2.5e-3, 12.7e-3, 75e3, 30))
+
+    def test_analyzer_falls_back_to_exact_solver(self):
+        analyzer = SPM_RotorSleeveTableAnalyzer(self.table, tol=1e-3)
+        inside = SPM_RotorSleeveProblem(5e-3, 2e-3, 12.7e-3, 30, mat_dict, 75e3)
+        outside = SPM_RotorSleeveProblem(5e-3, 2e-3, 12.7e-3, 30, mat_dict, 110e3)
+        other_material = SPM_RotorSleeveProblem(
+            5e-3, 2e-3, 12.7e-3, 30, dict(mat_dict, sleeve_youngs_th_direction=100e9), 75e3
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer.analyze(inside)
+            self.assertEqual(analyzer.hits, 1)
+            np.testing.assert_allclose(analyzer.analyze(outside), exact_sleeve(5e-3, 2e-3, 12.7e-3, 110e3, 30))
+            analyzer.analyze(other_material)
+        self.assertEqual(analyzer.hits, 1)
+        self.assertEqual(analyzer.fallbacks, 2)
+
+    def test_axes_of_two_nodes_are_not_trusted(self):
+        # the exact solver finds no sleeve inside this table, while interpolating its nodes would
+        table = SPM_RotorSleeveTable.build(mat_dict, stress_limits, 5e-3, 2e-3, [12e-3, 13e-3], [90e3, 130e3], [0, 30])
+        self.assertEqual(table.interpolate(5e-3, 2e-3, 12.5e-3, 110e3, 15)[2], np.inf)
+        analyzer = SPM_RotorSleeveTableAnalyzer(table)
+        with contextlib.redirect_stdout(io.StringIO()):
+            sol = analyzer.analyze(SPM_RotorSleeveProblem(5e-3, 2e-3, 12.5e-3, 15, mat_dict, 110e3))
+        self.assertIs(sol, False)
+        self.assertEqual((analyzer.hits, analyzer.fallbacks), (0, 1))
+
+    def test_designs_violating_stress_limits_are_not_returned(self):
+        table = copy.copy(self.table)
+        # sleeves of half the thickness overload the sleeve
+        table.d_sl = self.table.d_sl / 2
+        analyzer = SPM_RotorSleeveTableAnalyzer(table, tol=np.inf)
+        with contextlib.redirect_stdout(io.StringIO()):
+            sol = analyzer.analyze(SPM_RotorSleeveProblem(5e-3, 2e-3, 12.7e-3, 30, mat_dict, 75e3))
+        self.assertEqual((analyzer.hits, analyzer.fallbacks), (0, 1))
+        np.testing.assert_allclose(sol, exact_sleeve(5e-3, 2e-3, 12.7e-3, 75e3, 30))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as dirpath:
+            filepath = os.path.join(dirpath, "sleeve_table.npz")
+            self.table.save(filepath)
+            table = SPM_RotorSleeveTable.load(filepath)
+        np.testing.assert_array_equal(table.d_sl, self.table.d_sl)
+        self.assertTrue(table.matches(mat_dict, stress_limits))
+        self.assertEqual(
+            table.interpolate(5e-3, 2e-3, 12.7e-3, 75e3, 30), self.table.interpolate(5e-3, 2e-3, 12.7e-3, 75e3, 30)
+        )
+
+    def test_parallel_build_matches_serial(self):
+        axes = (5e-3, 2e-3, 12.5e-3, [80e3, 100e3], [20, 40])
+        serial = SPM_RotorSleeveTable.build(mat_dict, stress_limits, *axes)
+        parallel = SPM_RotorSleeveTable.build(mat_dict, stress_limits, *axes, n_workers=2)
+        np.testing.assert_array_equal(serial.d_sl, parallel.d_sl)
+
+
+if __name__ == "__main__":
+    unittest.main()
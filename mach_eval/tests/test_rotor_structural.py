@@ -0,0 +1,271 @@
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+from mach_eval.analyzers.mechanical.rotor_structural import (
+    SPM_RotorStructuralProblem,
+    SPM_RotorStructuralAnalyzer,
+    MultiLayer_RotorStructuralProblem,
+    MultiLayer_RotorStructuralAnalyzer,
+    Material_Isotropic,
+    Material_Transverse_Isotropic,
+    RotorComponent,
+    SPM_RotorSleeveProblem,
+    SPM_RotorSleeveAnalyzer,
+)
+
+mat_dict = {
+    "core_material_density": 7650,
+    "core_youngs_modulus": 185e9,
+    "core_poission_ratio": 0.3,
+    "alpha_rc": 1.2e-5,
+    "magnet_material_density": 7450,
+    "magnet_youngs_modulus": 160e9,
+    "magnet_poission_ratio": 0.24,
+    "alpha_pm": 5e-6,
+    "sleeve_material_density": 1800,
+    "sleeve_youngs_th_direction": 125e9,
+    "sleeve_youngs_p_direction": 8.8e9,
+    "sleeve_poission_ratio_p": 0.015,
+    "sleeve_poission_ratio_tp": 0.28,
+    "alpha_sl_t": -4.7e-7,
+    "alpha_sl_r": 0.3e-6,
+    "sleeve_max_tan_stress": 1950e6,
+    "sleeve_max_rad_stress": -100e6,
+    "shaft_material_density": 7870,
+    "shaft_youngs_modulus": 206e9,
+    "shaft_poission_ratio": 0.3,
+    "alpha_sh": 1.2e-5,
+}
+
+
+def stresses(sigmas, r_sh, d_m, r_ro, d_sl):
+    """Radial and tangential stresses at the inner and outer radius of every component"""
+    radii = [(r_sh / 2, r_sh), (r_sh, r_ro - d_m), (r_ro - d_m, r_ro), (r_ro, r_ro + d_sl)]
+    values = []
+    for sigma, (r_i, r_o) in zip(sigmas, radii):
+        for r in (r_i, r_o):
+            values.append(np.squeeze(sigma.radial(r)))
+            values.append(np.squeeze(sigma.tangential(r)))
+    return np.array(values)
+
+
+class TestSPMRotorStructuralBatch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 40
+        self.r_sh = rng.uniform(4e-3, 6e-3, n)
+        self.d_m = rng.uniform(2e-3, 4e-3, n)
+        self.r_ro = rng.uniform(12e-3, 14e-3, n)
+        self.d_sl = rng.uniform(0.5e-3, 2e-3, n)
+        self.delta_sl = rng.uniform(-5e-5, -1e-5, n)
+        self.deltaT = rng.uniform(0, 80, n)
+        self.N = rng.uniform(10e3, 100e3, n)
+        self.E_sl = rng.uniform(100e9, 150e9, n)
+        self.analyzer = SPM_RotorStructuralAnalyzer()
+
+    def scalar_problem(self, k):
+        materials = dict(mat_dict, sleeve_youngs_th_direction=self.E_sl[k])
+        return SPM_RotorStructuralProblem(
+            self.r_sh[k], self.d_m[k], self.r_ro[k], self.d_sl[k], self.delta_sl[k], self.deltaT[k], self.N[k],
+            materials,
+        )
+
+    def test_analyze_batch_matches_analyze(self):
+        materials = dict(mat_dict, sleeve_youngs_th_direction=self.E_sl)
+        problem = SPM_RotorStructuralProblem(
+            self.r_sh, self.d_m, self.r_ro, self.d_sl, self.delta_sl, self.deltaT, self.N, materials
+        )
+        batch = stresses(self.analyzer.analyze_batch(problem), self.r_sh, self.d_m, self.r_ro, self.d_sl)
+        self.assertEqual(batch.shape, (16, len(self.N)))
+        for k in range(len(self.N)):
+            expected = stresses(
+                self.analyzer.analyze(self.scalar_problem(k)), self.r_sh[k], self.d_m[k], self.r_ro[k], self.d_sl[k]
+            )
+            np.testing.assert_allclose(batch[:, k], expected, rtol=1e-9, atol=1e-3)
+
+    def test_analyze_many_matches_analyze(self):
+        problems = [self.scalar_problem(k) for k in range(len(self.N))]
+        for k, sigmas in enumerate(self.analyzer.analyze_many(problems)):
+            expected_sigmas = self.analyzer.analyze(problems[k])
+            r = np.linspace(self.r_ro[k], self.r_ro[k] + self.d_sl[k], 5)
+            self.assertEqual(sigmas[3].tangential(r).shape, expected_sigmas[3].tangential(r).shape)
+            np.testing.assert_allclose(
+                stresses(sigmas, self.r_sh[k], self.d_m[k], self.r_ro[k], self.d_sl[k]),
+                stresses(expected_sigmas, self.r_sh[k], self.d_m[k], self.r_ro[k], self.d_sl[k]),
+                rtol=1e-9,
+                atol=1e-3,
+            )
+
+    def test_speed_temperature_grid(self):
+        N = np.linspace(10e3, 60e3, 6)[:, np.newaxis]
+        deltaT = np.linspace(0, 100, 4)[np.newaxis, :]
+        problem = SPM_RotorStructuralProblem(5e-3, 3e-3, 12.5e-3, 1e-3, -2.4e-5, deltaT, N, mat_dict)
+        sigmas = self.analyzer.analyze_batch(problem)
+        grid = sigmas[3].tangential(12.5e-3)
+        self.assertEqual(grid.shape, (6, 4))
+        for i in range(6):
+            for j in range(4):
+                scalar = SPM_RotorStructuralProblem(
+                    5e-3, 3e-3, 12.5e-3, 1e-3, -2.4e-5, deltaT[0, j], N[i, 0], mat_dict
+                )
+                expected = self.analyzer.analyze(scalar)[3].tangential(12.5e-3)
+                np.testing.assert_allclose(grid[i, j], expected[0], rtol=1e-9)
+
+    def test_radius_checked_per_element(self):
+        materials = dict(mat_dict, sleeve_youngs_th_direction=self.E_sl)
+        problem = SPM_RotorStructuralProblem(
+            self.r_sh, self.d_m, self.r_ro, self.d_sl, self.delta_sl, self.deltaT, self.N, materials
+        )
+        sigmas = self.analyzer.analyze_batch(problem)
+        with self.assertRaises(ValueError):
+            sigmas[3].radial(self.r_ro + self.d_sl * 1.01)
+        with self.assertRaises(ValueError):
+            sigmas[3].radial(self.r_ro - 1e-6)
+
+
+stress_limits = {
+    "rad_sleeve": -100e6,
+    "tan_sleeve": 1300e6,
+    "rad_magnets": 0,
+    "tan_magnets": 80e6,
+}
+
+
+class StructuralAnalyzerWithoutGradient:
+    def analyze(self, problem):
+        return SPM_RotorStructuralAnalyzer().analyze(problem)
+
+
+class TestSPMRotorSleeve(unittest.TestCase):
+    def test_constraints_share_one_solve(self):
+        problem = SPM_RotorSleeveProblem(5e-3, 2e-3, 12.5e-3, 40, mat_dict, 100e3)
+        x = [1.2e-3, -3e-5]
+        values = [problem.rad_sleeve(x), problem.tan_sleeve(x), problem.rad_magnet(x), problem.tan_magnet(x)]
+        problem.tan_sleeve_jac(x)
+        self.assertEqual(problem.n_solves, 1)
+
+        sigmas = SPM_RotorStructuralAnalyzer().analyze(
+            SPM_RotorStructuralProblem(5e-3, 2e-3, 12.5e-3, x[0], x[1], 40, 100e3, mat_dict)
+        )
+        expected = [
+            sigmas[3].radial(12.5e-3),
+            sigmas[3].tangential(12.5e-3),
+            sigmas[2].radial(10.5e-3),
+            sigmas[2].tangential(10.5e-3),
+        ]
+        np.testing.assert_allclose(values, np.squeeze(expected), rtol=1e-9)
+
+    def test_jacobian_matches_finite_differences(self):
+        problem = SPM_RotorSleeveProblem(5e-3, 2e-3, 12.5e-3, 40, mat_dict, 100e3)
+        x = np.array([1.2e-3, -3e-5])
+        jac = problem.constraint_jac(x)
+        for j, step in enumerate([1e-9, 1e-10]):
+            dx = np.zeros(2)
+            dx[j] = step
+            finite_difference = (problem.constraint_values(x + dx) - problem.constraint_values(x - dx)) / (2 * step)
+            np.testing.assert_allclose(jac[:, j], finite_difference, rtol=1e-5)
+
+    def test_sleeve_design_matches_finite_difference_design(self):
+        problem = SPM_RotorSleeveProblem(5e-3, 2e-3, 12.5e-3, 40, mat_dict, 100e3)
+        reference = SPM_RotorSleeveProblem(
+            5e-3, 2e-3, 12.5e-3, 40, mat_dict, 100e3, analyzer_class=StructuralAnalyzerWithoutGradient
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            sleeve = SPM_RotorSleeveAnalyzer(stress_limits).analyze(problem)
+            reference_sleeve = SPM_RotorSleeveAnalyzer(stress_limits).analyze(reference)
+        np.testing.assert_allclose(sleeve, reference_sleeve, rtol=1e-3)
+        self.assertLess(problem.n_solves, reference.n_solves)
+        # without closed-form gradients, the derivatives are found by finite differences
+        np.testing.assert_allclose(reference.constraint_jac(sleeve), problem.constraint_jac(sleeve), rtol=1e-3)
+
+
+steel = Material_Isotropic(7870, 206e9, 0.3, 1.2e-5)
+carbon_fiber = Material_Transverse_Isotropic(1800, 125e9, 8.8e9, 0.28, 0.015, 0.3e-6, -4.7e-7)
+
+
+def layered_rotor(radii, materials):
+    return [RotorComponent(m, r_i, r_o) for m, r_i, r_o in zip(materials, radii[:-1], radii[1:])]
+
+
+class TestMultiLayerRotorStructural(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = MultiLayer_RotorStructuralAnalyzer()
+
+    def test_matches_four_layer_analyzer_at_standstill(self):
+        # SPM_RotorStructuralAnalyzer leaves out the speed from the displacement of two of its interfaces, so the two
+        # agree when the rotor does not spin
+        problem = SPM_RotorStructuralProblem(5e-3, 3e-3, 12.5e-3, 1e-3, -2.4e-5, 40, 0, mat_dict)
+        expected = SPM_RotorStructuralAnalyzer().analyze(problem)
+        sigmas = self.analyzer.analyze(
+            MultiLayer_RotorStructuralProblem(
+                [problem.sh, problem.rc, problem.pm, problem.sl], 40, 0, [0, 0, -2.4e-5]
+            )
+        )
+        np.testing.assert_allclose(
+            stresses(sigmas, 5e-3, 3e-3, 12.5e-3, 1e-3),
+            stresses(expected, 5e-3, 3e-3, 12.5e-3, 1e-3),
+            rtol=1e-7,
+            atol=1e-3,
+        )
+
+    def test_split_component_matches_single_component(self):
+        single = self.analyzer.analyze(
+            MultiLayer_RotorStructuralProblem(layered_rotor([0, 10e-3], [steel]), 30, 60e3)
+        )
+        split = self.analyzer.analyze(
+            MultiLayer_RotorStructuralProblem(layered_rotor([0, 2e-3, 5e-3, 10e-3], [steel] * 3), 30, 60e3)
+        )
+        for sigma, r in zip(split, [1e-3, 4e-3, 8e-3]):
+            np.testing.assert_allclose(sigma.radial(r), single[0].radial(r), rtol=1e-7)
+            np.testing.assert_allclose(sigma.tangential(r), single[0].tangential(r), rtol=1e-7)
+
+    def test_free_surfaces_and_interfaces(self):
+        radii = [2e-3, 5e-3, 9e-3, 11e-3, 11.5e-3, 12e-3]
+        problem = MultiLayer_RotorStructuralProblem(
+            layered_rotor(radii, [steel, steel, steel, carbon_fiber, carbon_fiber]), 50, 80e3, [0, 0, -2e-5, -1e-5]
+        )
+        sigmas = self.analyzer.analyze(problem)
+        self.assertAlmostEqual(float(sigmas[0].radial(radii[0])), 0, delta=1e-3)
+        self.assertAlmostEqual(float(sigmas[-1].radial(radii[-1])), 0, delta=1e-3)
+        for inner, outer, r in zip(sigmas[:-1], sigmas[1:], radii[1:-1]):
+            np.testing.assert_allclose(inner.radial(r), outer.radial(r), rtol=1e-7)
+        # the interference fits press the sleeves onto the magnets
+        self.assertLess(sigmas[3].radial(radii[3]), 0)
+
+    def test_analyze_batch_matches_analyze(self):
+        radii = np.linspace(0, 20e-3, 21)
+        materials = [steel] * 15 + [carbon_fiber] * 5
+        N = np.linspace(10e3, 60e3, 4)[:, np.newaxis]
+        interferences = np.linspace(-3e-5, 0, 3)
+        problem = MultiLayer_RotorStructuralProblem(
+            layered_rotor(radii, materials), 40, N, [0] * 15 + [interferences] + [0] * 3
+        )
+        sigmas = self.analyzer.analyze_batch(problem)
+        self.assertEqual(sigmas[15].tangential(radii[16]).shape, (4, 3))
+        for i in range(4):
+            for j in range(3):
+                scalar = MultiLayer_RotorStructuralProblem(
+                    layered_rotor(radii, materials), 40, N[i, 0], [0] * 15 + [interferences[j]] + [0] * 3
+                )
+                expected = self.analyzer.analyze(scalar)
+                for k in (0, 15, 19):
+                    np.testing.assert_allclose(
+                        sigmas[k].tangential(radii[k + 1])[i, j], expected[k].tangential(radii[k + 1]), rtol=1e-7
+                    )
+
+    def test_invalid_rotor(self):
+        with self.assertRaises(ValueError):
+            MultiLayer_RotorStructuralProblem(layered_rotor([0, 5e-3, 9e-3], [steel, steel])[::-1], 0, 0)
+        with self.assertRaises(ValueError):
+            MultiLayer_RotorStructuralProblem(layered_rotor([0, 5e-3, 9e-3], [steel, steel]), 0, 0, [0, 0])
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze(
+                MultiLayer_RotorStructuralProblem(layered_rotor([0, 5e-3], [steel]), 0, np.array([0, 1e3]))
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from copy import deepcopy
+
+import mach_eval as me
+from mach_eval.tests.toy_evaluation import make_evaluator, scale_step
+
+
+class MutatingPostAnalyzer:
+    def get_next_state(results, in_state):
+        in_state.conditions.scale = results
+        return in_state
+
+
+class TestState(unittest.TestCase):
+    def test_evolve_shares_unchanged_attributes(self):
+        em = {"torque": [1, 2, 3]}
+        state_in = me.State("design", me.Conditions(em=em))
+        state_in.freeze()
+        state_out = state_in.evolve(airflow=5)
+        self.assertIs(state_out.design, state_in.design)
+        self.assertIs(state_out.conditions.em, em)
+        self.assertEqual(state_out.conditions.airflow, 5)
+        self.assertFalse(hasattr(state_in.conditions, "airflow"))
+
+        state_out = state_in.evolve(design="new design")
+        self.assertEqual(state_out.design, "new design")
+        self.assertEqual(state_in.design, "design")
+
+    def test_frozen_state_is_read_only(self):
+        state = me.State("design", me.Conditions())
+        state.freeze()
+        with self.assertRaises(AttributeError):
+            state.design = "new design"
+        with self.assertRaises(AttributeError):
+            state.conditions.airflow = 5
+
+    def test_deepcopy_of_frozen_state_is_modifiable(self):
+        state = me.State("design", me.Conditions(em={"torque": 1}))
+        state.freeze()
+        state_copy = deepcopy(state)
+        state_copy.conditions.em["torque"] = 2
+        state_copy.conditions.airflow = 5
+        state_copy.design = "new design"
+        self.assertEqual(state.conditions.em["torque"], 1)
+
+    def test_evaluator_keeps_history_without_copying(self):
+        full_results = make_evaluator(n_scale_steps=2).evaluate(2)
+        self.assertIs(full_results[0][2], full_results[1][0])
+        self.assertFalse(hasattr(full_results[0][0].conditions, "scale"))
+        self.assertEqual(full_results[0][2].conditions.scale, 4)
+        self.assertEqual(full_results[1][2].conditions.scale, 64)
+
+    def test_evaluator_rejects_modified_input_state(self):
+        step = scale_step(post_analyzer=MutatingPostAnalyzer)
+        with self.assertRaises(AttributeError):
+            me.MachineEvaluator([step]).evaluate(2)
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+import mach_eval as me
+import mach_opt as mo
+from mach_eval.tests.toy_evaluation import CountingAnalyzer, make_evaluator, scale_step
+
+
+class CrashingStep:
+    """Fails on its first evaluation, as if the worker had been preempted"""
+
+    def __init__(self, error):
+        self.error = error
+
+    def step(self, state_in):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return None, state_in.evolve(done=True)
+
+
+class DeclaredCrashingStep(CrashingStep):
+    reads = ("design",)
+    writes = ("done",)
+
+
+class OtherAnalyzer(CountingAnalyzer):
+    pass
+
+
+class OtherPostAnalyzer:
+    def get_next_state(results, state_in):
+        return state_in.evolve(other=results)
+
+
+def make_crashing_evaluator(tmp, error, evaluator_class):
+    """Evaluator of two scale steps followed by a CrashingStep, checkpointing to tmp"""
+    analyzer = CountingAnalyzer()
+    evaluator = make_evaluator(
+        CrashingStep(error),
+        n_scale_steps=2,
+        analyzer=analyzer,
+        evaluator_class=evaluator_class,
+        checkpoint_dirpath=tmp,
+    )
+    return evaluator, analyzer
+
+
+class TestStepCheckpoint(unittest.TestCase):
+    evaluator_classes = [me.MachineEvaluator, me.ConcurrentMachineEvaluator]
+
+    def test_resume_after_crash(self):
+        for evaluator_class in self.evaluator_classes:
+            with self.subTest(evaluator_class.__name__), tempfile.TemporaryDirectory() as tmp:
+                evaluator, analyzer = make_crashing_evaluator(tmp, RuntimeError("preempted"), evaluator_class)
+                with self.assertRaises(RuntimeError):
+                    evaluator.evaluate(2)
+                self.assertEqual(analyzer.count, 2)
+
+                full_results = evaluator.evaluate(2)
+                self.assertEqual(analyzer.count, 2)
+                self.assertEqual(len(full_results), 3)
+                self.assertEqual(full_results[-1][-1].conditions.scale, 64)
+                self.assertTrue(full_results[-1][-1].conditions.done)
+                self.assertEqual(os.listdir(tmp), [])
+
+                evaluator.evaluate(3)
+                self.assertEqual(analyzer.count, 4)
+
+    def test_invalid_design_clears_checkpoints(self):
+        for evaluator_class in self.evaluator_classes:
+            with self.subTest(evaluator_class.__name__), tempfile.TemporaryDirectory() as tmp:
+                evaluator, analyzer = make_crashing_evaluator(tmp, mo.InvalidDesign(), evaluator_class)
+                with self.assertRaises(mo.InvalidDesign):
+                    evaluator.evaluate(2)
+                self.assertEqual(os.listdir(tmp), [])
+
+    def test_concurrent_resume_keeps_steps_after_failed_step(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            analyzer, other_analyzer = CountingAnalyzer(), OtherAnalyzer()
+            steps = [
+                scale_step(analyzer, reads=("design",), writes=("scale",)),
+                DeclaredCrashingStep(RuntimeError("preempted")),
+                scale_step(other_analyzer, OtherPostAnalyzer, reads=("design",), writes=("other",)),
+            ]
+            evaluator = me.ConcurrentMachineEvaluator(steps, checkpoint_dirpath=tmp)
+            with self.assertRaises(RuntimeError):
+                evaluator.evaluate(2)
+            self.assertEqual((analyzer.count, other_analyzer.count), (1, 1))
+
+            # only the failed step runs again, although the last step is after it in the list
+            full_results = evaluator.evaluate(2)
+            self.assertEqual((analyzer.count, other_analyzer.count), (1, 1))
+            final_state = full_results[-1][-1]
+            self.assertEqual((final_state.conditions.scale, final_state.conditions.other), (4, 4))
+            self.assertTrue(final_state.conditions.done)
+            self.assertEqual(os.listdir(tmp), [])
@@ -0,0 +1,31 @@
+import unittest
+
+import numpy as np
+
+from mach_eval.analyzers.mechanical.windage_loss import (
+    WindageLossProblem,
+    WindageLossAnalyzer,
+)
+
+
+class TestWindageLossAnalyzeMany(unittest.TestCase):
+    def test_matches_analyze(self):
+        rng = np.random.default_rng(0)
+        problems = []
+        for _ in range(50):
+            R_ro = rng.uniform(0.01, 0.05)
+            problems.append(
+                WindageLossProblem(
+                    Omega=rng.uniform(1, 3000),
+                    R_ro=R_ro,
+                    stack_length=rng.uniform(0.02, 0.1),
+                    R_st=R_ro + rng.uniform(1e-4, 3e-3),
+                    u_z=np.array([rng.uniform(0, 10)]),
+                    T_air=rng.uniform(20, 80),
+                )
+            )
+        for problem, results in zip(problems, WindageLossAnalyzer.analyze_many(problems)):
+            expected = WindageLossAnalyzer.analyze(problem)
+            for value, expected_value in zip(results, expected):
+                self.assertEqual(np.shape(value), np.shape(expected_value))
+                np.testing.assert_allclose(value, expected_value, rtol=1e-12)
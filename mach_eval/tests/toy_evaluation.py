@@ -0,0 +1,61 @@
+"""Toy evaluation problem shared by the tests of the machine evaluators.
+
+The design is a number. Each scale step multiplies it by the scale of the state, squares the product, and stores the
+result as the new scale, so that n scale steps evaluate design d to d ** (2 ** (n + 1) - 2).
+"""
+
+import mach_eval as me
+
+
+class ScaleProblemDefinition:
+    def get_problem(state):
+        return state.design * getattr(state.conditions, "scale", 1)
+
+
+def square(problem):
+    return problem**2
+
+
+class SquareAnalyzer:
+    def analyze(self, problem):
+        return square(problem)
+
+
+class CountingAnalyzer:
+    """Analyzer counting the problems it analyzes, and returning function(problem) as results"""
+
+    def __init__(self, function=square):
+        self.function = function
+        self.count = 0
+
+    def analyze(self, problem):
+        self.count = self.count + 1
+        return self.function(problem)
+
+
+class EvolvePostAnalyzer:
+    def get_next_state(results, in_state):
+        return in_state.evolve(scale=results)
+
+
+def scale_step(analyzer=None, post_analyzer=EvolvePostAnalyzer, **kwargs):
+    """AnalysisStep of the scale problem, with a new SquareAnalyzer if analyzer is None"""
+    if analyzer is None:
+        analyzer = SquareAnalyzer()
+    return me.AnalysisStep(ScaleProblemDefinition, analyzer, post_analyzer, **kwargs)
+
+
+def make_evaluator(
+    *steps,
+    n_scale_steps=1,
+    analyzer=None,
+    post_analyzer=EvolvePostAnalyzer,
+    evaluator_class=me.MachineEvaluator,
+    **kwargs,
+):
+    """Evaluator of n_scale_steps scale steps, which share analyzer if one is given, followed by steps
+
+    Remaining keyword arguments are passed on to evaluator_class.
+    """
+    scale_steps = [scale_step(analyzer, post_analyzer) for _ in range(n_scale_steps)]
+    return evaluator_class(scale_steps + list(steps), **kwargs)
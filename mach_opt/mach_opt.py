@@ -5,13 +5,37 @@ This module holds the classes required for optimizing a design using pygmo in Ma
 
 import pygmo as pg
 import pandas as pd
-from typing import Protocol, runtime_checkable, Any
+from typing import Protocol, runtime_checkable, Any, NamedTuple
 from abc import abstractmethod, ABC
+from collections import OrderedDict
+from contextlib import contextmanager
 import numpy as np
+import bisect
+import glob
+import io
+import os
 import pickle
+import shutil
+import socket
+import sqlite3
+import struct
+import uuid
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
 
 __all__ = [
     "DesignOptimizationMOEAD",
+    "DesignOptimizationArchipelago",
+    "DesignOptimizationAsync",
+    "save_checkpoint",
+    "load_checkpoint",
+    "checkpoint_to_pop",
     "DesignProblem",
     "Designer",
     "Design",
@@ -19,57 +43,408 @@ __all__ = [
     "DesignSpace",
     "DataHandler",
     "OptiData",
+    "FitnessCache",
+    "LazyPayload",
+    "CachedFitness",
     "InvalidDesign",
+    "non_dominated_front",
 ]
 
+# MOEA/D settings shared by the single population and island model optimizers
+_moead_settings = dict(
+    weight_generation="grid",
+    decomposition="tchebycheff",
+    neighbours=20,
+    CR=1,
+    F=0.5,
+    eta_m=20,
+    realb=0.9,
+    limit=2,
+    preserve_diversity=True,
+)
+
 
 class DesignOptimizationMOEAD:
-    def __init__(self, design_problem):
+    def __init__(self, design_problem, seed=None):
         self.design_problem = design_problem
         self.prob = pg.problem(self.design_problem)
+        self.seed = np.random.randint(2 ** 31) if seed is None else seed
+        self.algo = None
+
+    @property
+    def batch_evaluation(self):
+        """True if the design problem evaluates populations in a process pool"""
+        return getattr(self.design_problem, "n_workers", None) is not None
+
+    def get_algorithm(self):
+        """Returns the MOEA/D algorithm, which is created once so that its state carries over between generations"""
+        if self.algo is None:
+            if self.batch_evaluation:
+                # moead_gen is the generational MOEA/D variant which hands a whole
+                # generation of offspring to the batch fitness evaluator at once
+                uda = pg.moead_gen(gen=1, seed=self.seed, **_moead_settings)
+                uda.set_bfe(pg.bfe(pg.member_bfe()))
+            else:
+                uda = pg.moead(gen=1, seed=self.seed, **_moead_settings)
+            self.algo = pg.algorithm(uda)
+        return self.algo
 
     def initial_pop(self, pop_size):
-        pop = pg.population(self.prob, size=pop_size)
+        if self.batch_evaluation:
+            pop = pg.population(self.prob, size=pop_size, b=pg.bfe(pg.member_bfe()), seed=self.seed)
+        else:
+            pop = pg.population(self.prob, size=pop_size, seed=self.seed)
         return pop
 
     def run_optimization(self, pop, gen_size, filepath=None):
-        algo = pg.algorithm(
-            pg.moead(
-                gen=1,
-                weight_generation="grid",
-                decomposition="tchebycheff",
-                neighbours=20,
-                CR=1,
-                F=0.5,
-                eta_m=20,
-                realb=0.9,
-                limit=2,
-                preserve_diversity=True,
-            )
-        )
-        for _ in range(0, gen_size):
-            print("This is iteration", _)
-            pop = algo.evolve(pop)
-            print("Saving current generation")
-            self.save_pop(filepath, pop)
+        algo = self.get_algorithm()
+        try:
+            for _ in range(0, gen_size):
+                print("This is iteration", _)
+                pop = algo.evolve(pop)
+                print("Saving current generation")
+                self.save_pop(filepath, pop)
+        finally:
+            self.design_problem.close_pool()
         return pop
 
     #  methods to save and load latest generation for resuming optimization
     def save_pop(self, filepath, pop):
-        df = pd.DataFrame(pop.get_x())
-        df.to_csv(filepath)
+        """Saves free variables, fitness, algorithm state, and seed of the latest generation to a binary checkpoint"""
+        if filepath is None:
+            return
+        save_checkpoint(filepath, pop, algorithm=self.get_algorithm(), seed=self.seed)
 
     def load_pop(self, filepath, pop_size):
-        try:
-            df = pd.read_csv(filepath, index_col=0)
-        except FileNotFoundError:
+        """Loads the latest generation without re-evaluating it and restores the algorithm state.
+
+        Returns None if no checkpoint exists. Populations saved as CSV files of free variables by earlier versions are
+        still loaded, but have to be re-evaluated.
+        """
+        checkpoint = load_checkpoint(filepath)
+        if checkpoint is None:
             return None
+        if "algorithm" in checkpoint:
+            self.algo = checkpoint["algorithm"]
+            self.seed = checkpoint["seed"]
+        return checkpoint_to_pop(self.prob, checkpoint, pop_size)
+
+
+class DesignOptimizationArchipelago:
+    """Island model optimization of a DesignProblem using a pygmo archipelago.
+
+    Each island evolves its own population in a separate process and exchanges individuals with its neighbours in the
+    migration topology after every epoch of migration_interval generations. Designs within an island are evaluated
+    serially, hence the number of islands sets the number of concurrent evaluations.
+
+    As the islands archive designs from separate processes, the data handler of the design problem has to be sharded.
+    The shards are merged into the archive at the end of run_optimization. A fitness cache persisted to a file is
+    replaced by one cache per island, persisted next to it with the island number appended to the file name.
+
+    Attributes:
+        design_problem: DesignProblem to be optimized.
+
+        n_islands: Number of islands (populations) in the archipelago.
+
+        algorithm: Algorithm used on every island, either "moead" or "nsga2".
+
+        topology: pygmo topology defining the migration paths between islands. Defaults to pg.ring().
+
+        migration_interval: Number of generations each island evolves between migrations and checkpoints.
+
+        seed: Seed of the initial populations. Island i evolves with the seed seed + i.
+    """
+
+    def __init__(
+        self,
+        design_problem,
+        n_islands,
+        algorithm="moead",
+        topology=None,
+        migration_interval=1,
+        seed=None,
+    ):
+        if algorithm not in ("moead", "nsga2"):
+            raise ValueError("algorithm must be either 'moead' or 'nsga2'")
+        if not getattr(design_problem.dh, "sharded", False):
+            raise ValueError("islands archive designs from separate processes and require a sharded DataHandler")
+        self.design_problem = design_problem
+        self.prob = pg.problem(self.design_problem)
+        self.n_islands = n_islands
+        self.algorithm = algorithm
+        self.topology = pg.ring() if topology is None else topology
+        self.migration_interval = migration_interval
+        self.seed = np.random.randint(2 ** 31) if seed is None else seed
+
+    def island_seed(self, island):
+        """Returns the seed of the algorithm and population of an island"""
+        return (self.seed + island) % 2 ** 32
+
+    def get_algorithm(self, island):
+        """Returns the algorithm evolving an island for one epoch"""
+        if self.algorithm == "moead":
+            uda = pg.moead(gen=self.migration_interval, seed=self.island_seed(island), **_moead_settings)
+        else:
+            uda = pg.nsga2(gen=self.migration_interval, seed=self.island_seed(island))
+        return pg.algorithm(uda)
+
+    def island_problem(self, island):
+        """Returns the problem of an island, which holds its own fitness cache if the cache is persisted to a file"""
+        prob = pg.problem(self.design_problem)
+        cache = self.design_problem.cache
+        if cache is not None and cache.filepath is not None:
+            prob.extract(DesignProblem).cache = FitnessCache(
+                cache.resolution, cache.max_size, self.island_filepath(cache.filepath, island)
+            )
+        return prob
+
+    def initial_pop(self, pop_size):
+        """Creates the islands, evaluating the initial populations of all islands together in a process pool.
+
+        The pool has n_workers processes if the design problem sets n_workers, and one process per island otherwise.
+        Results are archived and cached by the calling process, each in the cache of its island.
+        """
+        lb, ub = self.prob.get_bounds()
+        rng = np.random.default_rng(self.seed)
+        pops = [
+            pg.population(self.island_problem(island), seed=self.island_seed(island))
+            for island in range(self.n_islands)
+        ]
+        n_workers = self.design_problem.n_workers or self.n_islands
+        with self.design_problem.evaluation_pool(n_workers) as pool:
+            submitted = []
+            for pop in pops:
+                udp = pop.problem.extract(DesignProblem)
+                xs = lb + rng.random((pop_size, len(lb))) * (ub - lb)
+                submitted.append([(x, udp.submit(pool, x)) for x in xs])
+            for pop, futures in zip(pops, submitted):
+                udp = pop.problem.extract(DesignProblem)
+                for x, future in futures:
+                    pop.push_back(x, udp.collect(x, future))
+        archi = pg.archipelago(t=self.topology)
+        for island, pop in enumerate(pops):
+            archi.push_back(udi=pg.mp_island(), algo=self.get_algorithm(island), pop=pop)
+        return archi
+
+    def run_optimization(self, archi, gen_size, filepath=None):
+        """Evolves all islands for gen_size generations, checkpointing every island after each epoch.
+
+        The archive shards written by the islands are merged into the archive once all islands have finished.
+        """
+        n_epochs = int(np.ceil(gen_size / self.migration_interval))
+        for _ in range(0, n_epochs):
+            print("This is epoch", _)
+            archi.evolve()
+            archi.wait_check()
+            print("Saving current generation of all islands")
+            self.save_pop(filepath, archi)
+        self.design_problem.dh.merge_shards()
+        return archi
+
+    #  methods to save and load latest generation of each island for resuming optimization
+    def island_filepath(self, filepath, island):
+        root, ext = os.path.splitext(filepath)
+        return root + "_island" + str(island) + ext
+
+    def save_pop(self, filepath, archi):
+        if filepath is None:
+            return
+        for i, isl in enumerate(archi):
+            save_checkpoint(
+                self.island_filepath(filepath, i),
+                isl.get_population(),
+                algorithm=isl.get_algorithm(),
+                seed=self.seed,
+            )
+
+    def load_pop(self, filepath, pop_size):
+        archi = pg.archipelago(t=self.topology)
+        for island in range(self.n_islands):
+            checkpoint = load_checkpoint(self.island_filepath(filepath, island))
+            if checkpoint is None:
+                return None
+            if "seed" in checkpoint:
+                self.seed = checkpoint["seed"]
+            algo = checkpoint.get("algorithm", self.get_algorithm(island))
+            pop = checkpoint_to_pop(self.island_problem(island), checkpoint, pop_size)
+            archi.push_back(udi=pg.mp_island(), algo=algo, pop=pop)
+        return archi
+
+
+class DesignOptimizationAsync:
+    """Asynchronous steady-state optimization of a DesignProblem.
+
+    A fixed number of evaluations are kept in flight in a process pool. As soon as any evaluation completes, the design
+    is inserted into the population, the worst individual according to non-dominated sorting and crowding distance is
+    discarded, and a new offspring is dispatched. Slow evaluations therefore never hold up the remaining workers.
+    Offspring are created from binary tournament selected parents using simulated binary crossover followed by
+    polynomial mutation.
+
+    Attributes:
+        design_problem: DesignProblem to be optimized.
+
+        n_workers: Number of evaluations kept in flight.
+
+        p_cr: Crossover probability.
+
+        eta_c: Distribution index of the simulated binary crossover.
+
+        eta_m: Distribution index of the polynomial mutation.
+
+        seed: Seed of the random number generator used for creating offspring.
+    """
+
+    def __init__(self, design_problem, n_workers, p_cr=0.9, eta_c=20, eta_m=20, seed=None):
+        self.design_problem = design_problem
+        self.prob = pg.problem(self.design_problem)
+        self.n_workers = n_workers
+        self.p_cr = p_cr
+        self.eta_c = eta_c
+        self.eta_m = eta_m
+        self.rng = np.random.default_rng(seed)
+
+    def initial_pop(self, pop_size):
+        """Evaluates pop_size random designs in the process pool and returns them as a population"""
+        lb, ub = self.prob.get_bounds()
+        xs = lb + self.rng.random((pop_size, len(lb))) * (ub - lb)
         pop = pg.population(self.prob)
-        for i in range(pop_size):
-            print(df.iloc[i])
-            pop.push_back(df.iloc[i])
+        with self.design_problem.evaluation_pool(self.n_workers) as pool:
+            futures = [self.design_problem.submit(pool, x) for x in xs]
+            for x, future in zip(xs, futures):
+                pop.push_back(x, self.design_problem.collect(x, future))
         return pop
 
+    def run_optimization(self, pop, gen_size, filepath=None):
+        """Evolves the population for gen_size times its size evaluations.
+
+        The population is saved each time as many evaluations as the population size have completed.
+        """
+        pop_x = pop.get_x()
+        pop_f = pop.get_f()
+        pop_size = len(pop_x)
+        n_evals = gen_size * pop_size
+        n_submitted = 0
+        n_completed = 0
+        with self.design_problem.evaluation_pool(self.n_workers) as pool:
+            in_flight = {}
+            while n_completed < n_evals:
+                while len(in_flight) < self.n_workers and n_submitted < n_evals:
+                    x = self.get_offspring(pop_x, pop_f)
+                    in_flight[self.design_problem.submit(pool, x)] = x
+                    n_submitted = n_submitted + 1
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    x = in_flight.pop(future)
+                    objs = self.design_problem.collect(x, future)
+                    pop_x, pop_f = self.insert(pop_x, pop_f, x, objs)
+                    n_completed = n_completed + 1
+                    if n_completed % pop_size == 0:
+                        print("Completed evaluation", n_completed, "of", n_evals)
+                        print("Saving current population")
+                        pop = self.get_pop(pop_x, pop_f)
+                        self.save_pop(filepath, pop)
+        return self.get_pop(pop_x, pop_f)
+
+    def get_offspring(self, pop_x, pop_f):
+        """Creates a new design from two tournament selected parents"""
+        ranks = np.empty(len(pop_f), dtype=int)
+        ranks[pg.sort_population_mo(pop_f)] = np.arange(len(pop_f))
+        parents = []
+        for _ in range(2):
+            i, j = self.rng.choice(len(pop_x), size=2, replace=False)
+            parents.append(pop_x[i] if ranks[i] < ranks[j] else pop_x[j])
+        bounds = self.prob.get_bounds()
+        # independent seeds, so that the random draws of crossover and mutation are not correlated
+        crossover_seed, mutation_seed = (int(seed) for seed in self.rng.integers(2 ** 31, size=2))
+        children = pg.sbx_crossover(
+            parents[0], parents[1], bounds, 0, self.p_cr, self.eta_c, crossover_seed
+        )
+        child = pg.polynomial_mutation(
+            children[0], bounds, 0, 1 / len(children[0]), self.eta_m, mutation_seed
+        )
+        return child
+
+    def insert(self, pop_x, pop_f, x, objs):
+        """Adds an evaluated design to the population and removes the worst individual"""
+        pop_x = np.vstack([pop_x, x])
+        pop_f = np.vstack([pop_f, np.asarray(objs, dtype=float).flatten()])
+        best = pg.select_best_N_mo(pop_f, len(pop_f) - 1)
+        return pop_x[best], pop_f[best]
+
+    def get_pop(self, pop_x, pop_f):
+        """Packs free variables and their fitness into a population without re-evaluating"""
+        pop = pg.population(self.prob)
+        for x, f in zip(pop_x, pop_f):
+            pop.push_back(x, f)
+        return pop
+
+    #  methods to save and load latest population for resuming optimization
+    def save_pop(self, filepath, pop):
+        if filepath is None:
+            return
+        save_checkpoint(filepath, pop, rng=self.rng)
+
+    def load_pop(self, filepath, pop_size):
+        checkpoint = load_checkpoint(filepath)
+        if checkpoint is None:
+            return None
+        if "rng" in checkpoint:
+            self.rng = checkpoint["rng"]
+        return checkpoint_to_pop(self.prob, checkpoint, pop_size)
+
+
+def save_checkpoint(filepath, pop, **state):
+    """Saves the free variables and fitness of a population, along with any optimizer state, to a binary checkpoint.
+
+    The checkpoint is written to a temporary file first and then moved to filepath, so an interrupted write never
+    destroys the previous checkpoint.
+
+    Args:
+        filepath: Path of the checkpoint file.
+        pop: pygmo population to be saved.
+        state: Additional picklable optimizer state, such as the algorithm and its seed.
+    """
+    checkpoint = dict(state, x=pop.get_x(), f=pop.get_f(), pop_seed=pop.get_seed())
+    tmp_filepath = filepath + ".tmp"
+    with open(tmp_filepath, "wb") as f:
+        pickle.dump(checkpoint, f, -1)
+    os.replace(tmp_filepath, filepath)
+
+
+def load_checkpoint(filepath):
+    """Loads a checkpoint saved by save_checkpoint.
+
+    CSV files of free variables saved by earlier versions are read into a checkpoint without fitness values.
+
+    Returns:
+        checkpoint: Dictionary of the saved state, or None if filepath does not exist.
+    """
+    try:
+        with open(filepath, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except pickle.UnpicklingError:
+        df = pd.read_csv(filepath, index_col=0)
+        return {"x": df.to_numpy()}
+
+
+def checkpoint_to_pop(prob, checkpoint, pop_size):
+    """Creates a population from the first pop_size individuals of a checkpoint.
+
+    Individuals are pushed back together with their saved fitness so that they are not evaluated again. Checkpoints
+    without fitness values are evaluated as the individuals are pushed back.
+    """
+    pop = pg.population(prob, seed=checkpoint.get("pop_seed", np.random.randint(2 ** 31)))
+    xs = checkpoint["x"][:pop_size]
+    if "f" in checkpoint:
+        for x, f in zip(xs, checkpoint["f"][:pop_size]):
+            pop.push_back(x, f)
+    else:
+        for x in xs:
+            pop.push_back(x)
+    return pop
+
 
 class DesignProblem:
     """Class to create, evaluate, and optimize designs
@@ -84,6 +459,12 @@ class DesignProblem:
         dh: Data handlers which enable saving optimization results and its resumption.
 
         invalid_design_objs: List of (large) objective values to use for invalid designs
+
+        n_workers: Number of worker processes used by batch_fitness. If None, designs are evaluated serially. The
+            process pool is created on the first call to batch_fitness and kept for the following generations, until
+            close_pool is called.
+
+        cache: Optional FitnessCache used to reuse the objectives of previously evaluated designs.
     """
 
     def __init__(
@@ -93,11 +474,16 @@ class DesignProblem:
         design_space: "DesignSpace",
         dh: "DataHandler",
         invalid_design_objs=None,
+        n_workers=None,
+        cache=None,
     ):
         self.__designer = designer
         self.__evaluator = evaluator
         self.__design_space = design_space
         self.__dh = dh
+        self.n_workers = n_workers
+        self.cache = cache
+        self._pool = _SharedPool()
 
         if invalid_design_objs is None:
             self.__invalid_design_objs = 1e4 * np.ones([1, self.get_nobj()])
@@ -108,6 +494,11 @@ class DesignProblem:
 
         dh.save_designer(designer)
 
+    @property
+    def dh(self) -> "DataHandler":
+        """Data handler the evaluated designs are archived with"""
+        return self.__dh
+
     def fitness(self, x: "tuple") -> "tuple":
         """Calculates the fitness or objectives of each design based on evaluation results.
 
@@ -123,30 +514,225 @@ class DesignProblem:
         Raises:
             e: The errors encountered during design creation or evaluation apart from the InvalidDesign error
         """
+        cached = self._get_cached(x)
+        if cached is not None:
+            return self._reuse_cached(x, cached)
+
         try:
-            design = self.__designer.create_design(x)
-            full_results = self.__evaluator.evaluate(design)
-            objs = self.__design_space.get_objectives(full_results)
-            self.__dh.save_to_archive(x, design, full_results, objs)
+            design, full_results, objs = _evaluate_design(
+                self.__designer, self.__evaluator, self.__design_space, x
+            )
+            self._save_result(x, design, full_results, objs)
             # print('The fitness values are', objs)
             return objs
 
         except Exception as e:
-            # Check if e is an InvalidDesign exception using the class name
-            # This is done to catch InvalidDesign exceptions regardless of what module they orginate from (mach_opt.mach_opt.InvalidDesign OR eMachPrivate.eMach.mach_opt.mach_opt.InvalidDesign)
-            if (e.__class__.__name__ == InvalidDesign().__class__.__name__): 
-                temp = tuple(map(tuple, self.__invalid_design_objs))
-                objs = temp[0]
-                return objs
-
-            ################ Uncomment below block of code to prevent one off errors from JMAG ###################
-            elif type(e) is FileNotFoundError:
-                print('**********ERROR*************')
-                temp = tuple(map(tuple, self.__invalid_design_objs))
-                objs = temp[0]
-                return objs
+            return self._handle_evaluation_error(x, e)
+
+    def batch_fitness(self, dvs: "np.ndarray") -> "np.ndarray":
+        """Calculates the fitness of a batch of designs using a pool of worker processes.
+
+        This is the batch fitness evaluation hook used by pygmo's member_bfe. Designs are created, evaluated, and
+        scored in the worker processes while results are saved to the archive by the calling process, in the same
+        order as the input decision vectors. Without worker processes, the designs are evaluated together by the
+        evaluate_many method of the evaluator if it has one, and one at a time otherwise.
+
+        Args:
+            dvs: Decision vectors of all designs in the batch concatenated into a single 1D array
+
+        Returns:
+            fvs: Fitness vectors of all designs in the batch concatenated into a single 1D array
+        """
+        n_dim = len(self.get_bounds()[0])
+        xs = np.asarray(dvs, dtype=float).reshape(-1, n_dim)
+        fvs = []
+        if self.n_workers is None:
+            if hasattr(self.__evaluator, "evaluate_many"):
+                fvs = self._fitness_many(xs)
             else:
-                raise e
+                for x in xs:
+                    fvs.append(self.fitness(x))
+            return np.asarray(fvs, dtype=float).flatten()
+
+        if self._pool.executor is None:
+            self._pool.executor = self.evaluation_pool(self.n_workers)
+        futures = [self.submit(self._pool.executor, x) for x in xs]
+        for x, future in zip(xs, futures):
+            fvs.append(self.collect(x, future))
+        return np.asarray(fvs, dtype=float).flatten()
+
+    def close_pool(self):
+        """Shuts down the process pool of batch_fitness, waiting for its workers to exit"""
+        if self._pool.executor is not None:
+            self._pool.executor.shutdown()
+            self._pool.executor = None
+
+    def _fitness_many(self, xs) -> list:
+        """Calculates the fitness of several designs evaluated together with the evaluate_many method of the evaluator"""
+        cached = [self._get_cached(x) for x in xs]
+        designs = {}
+        errors = {}
+        for i, x in enumerate(xs):
+            if cached[i] is None:
+                try:
+                    designs[i] = self.__designer.create_design(x)
+                except Exception as e:
+                    errors[i] = e
+        outcomes = dict(zip(designs, self.__evaluator.evaluate_many(list(designs.values()))))
+
+        fvs = []
+        for i, x in enumerate(xs):
+            if cached[i] is not None:
+                fvs.append(self._reuse_cached(x, cached[i]))
+                continue
+            try:
+                if i in errors:
+                    raise errors[i]
+                full_results = outcomes[i]
+                if isinstance(full_results, Exception):
+                    raise full_results
+                objs = self.__design_space.get_objectives(full_results)
+                self._save_result(x, designs[i], full_results, objs)
+                fvs.append(objs)
+            except Exception as e:
+                fvs.append(self._handle_evaluation_error(x, e))
+        return fvs
+
+    def replay_archive(self, source_dh: "DataHandler", replay_steps, n_workers=None) -> list:
+        """Recalculates the objectives of archived designs from their stored evaluation results.
+
+        Each design of the source archive is re-evaluated with the replay method of the evaluator, which reuses the raw
+        results of the steps in replay_steps, and the updated designs are saved to the data handler of this problem.
+        Designs archived without full results, such as cached designs, are skipped.
+
+        Args:
+            source_dh: DataHandler of the archive to be replayed. Must not be the data handler of this problem.
+            replay_steps: Steps whose raw results are reused, passed on to the replay method of the evaluator
+            n_workers: Number of worker processes replaying designs in parallel. Designs are replayed in the calling
+                process if None.
+
+        Returns:
+            replayed: List of the free variables and updated objectives of every replayed design
+        """
+        records = (data for data in source_dh.load_from_archive() if data.full_results is not None)
+        replayed = []
+        if n_workers is None:
+            for data in records:
+                try:
+                    result = _replay_design(
+                        self.__evaluator, self.__design_space, data.design, data.full_results, replay_steps
+                    )
+                except Exception as e:
+                    result = e
+                replayed.append(self._save_replayed(data, result))
+            return replayed
+
+        with self.evaluation_pool(n_workers) as pool:
+            # only a few records per worker are loaded at a time, as each holds the raw results of a whole evaluation
+            pending = []
+            for data in records:
+                pending.append((data, pool.submit(_replay_in_worker, data.design, data.full_results, replay_steps)))
+                if len(pending) >= 2 * n_workers:
+                    replayed.append(self._collect_replayed(*pending.pop(0)))
+            for data, future in pending:
+                replayed.append(self._collect_replayed(data, future))
+        return replayed
+
+    def _collect_replayed(self, data: "OptiData", future: "Future"):
+        try:
+            result = future.result()
+        except Exception as e:
+            result = e
+        return self._save_replayed(data, result)
+
+    def _save_replayed(self, data: "OptiData", result):
+        """Saves a replayed design and returns its free variables and objectives"""
+        if isinstance(result, Exception):
+            return data.x, self._handle_evaluation_error(data.x, result)
+        full_results, objs = result
+        self._save_result(data.x, data.design, full_results, objs)
+        return data.x, objs
+
+    def evaluation_pool(self, n_workers: int) -> ProcessPoolExecutor:
+        """Returns a process pool whose workers hold a copy of the designer, evaluator, and design space"""
+        return ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_worker,
+            initargs=(self.__designer, self.__evaluator, self.__design_space),
+        )
+
+    def submit(self, pool: ProcessPoolExecutor, x: "tuple") -> "Future":
+        """Submits the creation and evaluation of a design to a pool returned by evaluation_pool
+
+        Designs found in the cache are not submitted, instead an already completed future holding the cached
+        objectives is returned.
+        """
+        cached = self._get_cached(x)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+        return pool.submit(_evaluate_in_worker, x)
+
+    def collect(self, x: "tuple", future: "Future") -> "tuple":
+        """Saves the result of a submitted evaluation to the archive and returns its objectives
+
+        Args:
+            x: Free variables the evaluation was submitted with
+            future: Future returned by submit
+
+        Returns:
+            objs: Returns the fitness of the design
+        """
+        try:
+            result = future.result()
+            if isinstance(result, CachedFitness):
+                return self._reuse_cached(x, result)
+            design, full_results, objs = result
+            self._save_result(x, design, full_results, objs)
+            return objs
+        except Exception as e:
+            return self._handle_evaluation_error(x, e)
+
+    def _save_result(self, x, design, full_results, objs):
+        """Saves an evaluated design to the archive and the cache"""
+        self.__dh.save_to_archive(x, design, full_results, objs)
+        if self.cache is not None:
+            self.cache.put(x, objs, valid=True)
+
+    def _get_cached(self, x) -> "CachedFitness":
+        if self.cache is None:
+            return None
+        return self.cache.get(x)
+
+    def _reuse_cached(self, x, cached: "CachedFitness") -> "tuple":
+        """Returns cached objectives, recording the reuse of valid designs in the archive without full results"""
+        if cached.valid:
+            if hasattr(self.__dh, "save_reused"):
+                self.__dh.save_reused(x, cached.objs)
+            else:
+                self.__dh.save_to_archive(x, None, None, cached.objs)
+        return cached.objs
+
+    def _handle_evaluation_error(self, x, e: Exception) -> "tuple":
+        """Returns invalid design objectives for expected evaluation errors and re-raises all others"""
+        # Check if e is an InvalidDesign exception using the class name
+        # This is done to catch InvalidDesign exceptions regardless of what module they orginate from (mach_opt.mach_opt.InvalidDesign OR eMachPrivate.eMach.mach_opt.mach_opt.InvalidDesign)
+        if (e.__class__.__name__ == InvalidDesign().__class__.__name__): 
+            temp = tuple(map(tuple, self.__invalid_design_objs))
+            objs = temp[0]
+            if self.cache is not None:
+                self.cache.put(x, objs, valid=False)
+            return objs
+
+        ################ Uncomment below block of code to prevent one off errors from JMAG ###################
+        elif type(e) is FileNotFoundError:
+            print('**********ERROR*************')
+            temp = tuple(map(tuple, self.__invalid_design_objs))
+            objs = temp[0]
+            return objs
+        else:
+            raise e
 
     def get_bounds(self):
         """Returns bounds for optimization problem"""
@@ -201,11 +787,43 @@ class DesignSpace(Protocol):
 
 
 class DataHandler():
-    """ Parent class for data handlers"""
+    """ Parent class for data handlers
 
-    def __init__(self, archive_filepath, designer_filepath):
+    Optimization results are appended to a Pickle archive file. Alongside the archive, an SQLite index holds the free
+    variables, objectives, and byte offset of every record so that the archive can be queried without unpickling the
+    results of every design. Writes to the archive and its index are serialized by an exclusive lock on a lock file next
+    to the archive, so that processes sharing an archive never interleave their records.
+
+    If payload_min_size is set, large arrays within a record, such as FEA waveforms held in the evaluation results, are
+    not pickled inline. Instead they are written to a compressed zip file per record in the payload directory and
+    replaced by LazyPayload references in the archive, which load the arrays only when they are accessed. Which objects
+    are externalized is decided by is_payload, which child classes can override to customize the archive schema.
+
+    Attributes:
+        archive_filepath: Path of the Pickle archive file.
+        designer_filepath: Path of the Pickle file holding the designer.
+        index_filepath: Path of the SQLite index of the archive.
+        lock_filepath: Path of the lock file held while writing to the archive or its index.
+        payload_min_size: Minimum number of elements of arrays and DataFrames stored outside the archive records. If
+            None, all data is stored inline.
+        payload_dirpath: Path of the directory holding externalized arrays.
+        sharded: If True, each process appends its records to its own shard file next to the archive instead of the
+            archive itself. Shards are combined into the indexed archive by merge_shards.
+    """
+
+    def __init__(self, archive_filepath, designer_filepath, payload_min_size=None, sharded=False):
         self.archive_filepath = archive_filepath
         self.designer_filepath = designer_filepath
+        self.index_filepath = archive_filepath + ".idx"
+        self.lock_filepath = archive_filepath + ".lock"
+        self.payload_min_size = payload_min_size
+        self.payload_dirpath = archive_filepath + ".payloads"
+        self.sharded = sharded
+
+    @property
+    def shard_filepath(self):
+        """ Path of the shard written by the current process"""
+        return self.archive_filepath + _SHARD_SUFFIX + socket.gethostname() + "-" + str(os.getpid())
 
     def save_to_archive(self, x, design, full_results, objs):
         """ Save machine evaluation data to optimization archive using Pickle
@@ -218,9 +836,41 @@ class DataHandler():
         """
         # assign relevant data to OptiData class attributes
         opti_data = OptiData(x=x, design=design, full_results=full_results, objs=objs)
-        # write to pkl file. 'ab' indicates binary append
-        with open(self.archive_filepath, 'ab') as archive:
-            pickle.dump(opti_data, archive, -1)
+        self._append(opti_data)
+
+    def save_reused(self, x, objs):
+        """ Record the reuse of cached objectives in the optimization archive
+
+        The record holds neither design nor full results, and is not added to the Pareto front, which therefore only
+        holds evaluated designs.
+
+        Args:
+            x: Free variables of the design whose cached objectives were reused
+            objs: Reused fitness values
+        """
+        self._append(OptiData(x=x, design=None, full_results=None, objs=objs, reused=True))
+
+    def _append(self, opti_data):
+        record = self._dump_record(opti_data)
+        if self.sharded:
+            _append_shard_record(self.shard_filepath, record)
+            return
+        with self._lock():
+            self._index_new_records()
+            # write to pkl file. 'ab' indicates binary append
+            with open(self.archive_filepath, 'ab') as archive:
+                offset = archive.tell()
+                archive.write(record)
+            with self._connect_index() as con:
+                self._add_to_index(con, opti_data, offset, len(record))
+
+    def is_payload(self, obj):
+        """ True if obj is to be stored outside the archive record in the payload directory"""
+        if self.payload_min_size is None:
+            return False
+        if isinstance(obj, (np.ndarray, pd.DataFrame, pd.Series)):
+            return obj.size >= self.payload_min_size
+        return False
 
     def load_from_archive(self):
         """ Load data from Pickle optimization archive """
@@ -228,10 +878,39 @@ class DataHandler():
         with open(self.archive_filepath, 'rb') as f:
             while 1:
                 try:
-                    yield pickle.load(f)  # use generator
+                    yield self._load_record(f)  # use generator
                 except EOFError:
                     break
 
+    def get_opti_data(self, design_id):
+        """ Load the OptiData of a single design from the archive
+
+        Args:
+            design_id: Position of the design in the archive, starting at 0
+
+        Returns:
+            opti_data: OptiData of the design
+        """
+        self._ensure_index()
+        with self._connect_index() as con:
+            row = con.execute(
+                "SELECT offset, length FROM archive WHERE id = ?", (design_id,)
+            ).fetchone()
+        if row is None:
+            raise IndexError("No design with id " + str(design_id) + " in archive")
+        return self._read_record(*row)
+
+    def get_design_ids(self, name):
+        """ Return the ids of all archived designs with the specified name"""
+        self._ensure_index()
+        with self._connect_index() as con:
+            rows = con.execute("SELECT id FROM archive WHERE name = ? ORDER BY id", (name,))
+            return [row[0] for row in rows]
+
+    def get_design_name(self, design):
+        """ Name under which a design is indexed. Child classes can override this to enable get_design_ids"""
+        return None
+
     def save_designer(self, designer):
         """ Save designer used in optimization"""
 
@@ -256,47 +935,658 @@ class DataHandler():
             return obj
 
     def get_archive_data(self):
-        archive = self.load_from_archive()
+        """ Return fitness and free variables of all archived designs using the archive index"""
+        self._ensure_index()
         fitness = []
         free_vars = []
-        for data in archive:
-            fitness.append(data.objs)
-            free_vars.append(data.x)
+        with self._connect_index() as con:
+            for x, objs in con.execute("SELECT x, objs FROM archive ORDER BY id"):
+                fitness.append(pickle.loads(objs))
+                free_vars.append(pickle.loads(x))
         return fitness, free_vars
     
     def get_pareto_data(self):
         """ Return data of Pareto optimal designs"""
-        archive = self.load_from_archive()
-        fitness, free_vars = self.get_archive_data()
-        ndf, dl, dc, ndr = pg.fast_non_dominated_sorting(fitness)
-        fronts_index = ndf[0]
-        
-        i = 0
-        for data in archive:
-            if i in fronts_index:
-                yield data
-            i = i+1
+        for design_id in self.get_pareto_ids():
+            yield self.get_opti_data(design_id)
+
+    def get_pareto_ids(self):
+        """ Return ids of Pareto optimal designs from the incrementally updated front held in the archive index"""
+        self._ensure_index()
+        with self._connect_index() as con:
+            n_front = con.execute("SELECT COUNT(*) FROM front").fetchone()[0]
+            n_archive = con.execute("SELECT COUNT(*) FROM archive WHERE reused = 0").fetchone()[0]
+        if n_front == 0 and n_archive > 0:
+            self.rebuild_pareto_front()
+        with self._connect_index() as con:
+            return [row[0] for row in con.execute("SELECT id FROM front ORDER BY id")]
 
     def get_pareto_fitness_freevars(self):
         """ Extract fitness and free variables for Pareto optimal designs """
 
-        archive = self.get_pareto_data()
+        pareto_ids = self.get_pareto_ids()
         fitness = []
         free_vars = []
-        for data in archive:
-            fitness.append(data.objs)
-            free_vars.append(data.x)
+        with self._connect_index() as con:
+            for design_id in pareto_ids:
+                x, objs = con.execute(
+                    "SELECT x, objs FROM archive WHERE id = ?", (design_id,)
+                ).fetchone()
+                fitness.append(pickle.loads(objs))
+                free_vars.append(pickle.loads(x))
         return fitness, free_vars
 
+    def rebuild_pareto_front(self):
+        """ Recompute the Pareto front of the complete archive from the objectives held in the archive index"""
+        self._ensure_index()
+        with self._connect_index() as con:
+            rows = con.execute("SELECT id, objs FROM archive WHERE reused = 0 ORDER BY id").fetchall()
+            fitness = [pickle.loads(objs) for design_id, objs in rows]
+            front_ids = non_dominated_front(fitness) if len(fitness) > 0 else []
+            con.execute("DELETE FROM front")
+            con.executemany(
+                "INSERT INTO front VALUES (?, ?)",
+                [(rows[i][0], _objs_array(fitness[i]).tobytes()) for i in front_ids],
+            )
+
+    def merge(self, source_filepaths, resolution=None):
+        """ Append the records of other archives or shards to this archive, skipping designs already archived.
+
+        Sources can be archives written by any DataHandler or shards written in sharded mode, from this or other
+        optimization runs. Payloads of records from other runs are copied into the payload directory of this archive.
+
+        Args:
+            source_filepaths: Paths of the archives and shards to be merged.
+            resolution: Designs whose free variables all agree to within this resolution are considered duplicates. If
+                None, only designs with identical free variables are.
+
+        Returns:
+            n_merged: Number of records appended to this archive
+        """
+        n_merged = 0
+        with self._lock():
+            self._index_new_records()
+            with open(self.archive_filepath, 'ab') as archive, self._connect_index() as con:
+                seen = set(_x_key(pickle.loads(x), resolution) for (x,) in con.execute("SELECT x FROM archive"))
+                for source_filepath in source_filepaths:
+                    source_payload_dirpath = _archive_filepath(source_filepath) + ".payloads"
+                    for record in _iter_records(source_filepath):
+                        unpickler = _PayloadUnpickler(io.BytesIO(record), source_payload_dirpath)
+                        opti_data = unpickler.load()
+                        key = _x_key(opti_data.x, resolution)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        if os.path.abspath(source_payload_dirpath) != os.path.abspath(self.payload_dirpath):
+                            for payload_key in set(pid[0] for pid in unpickler.loaded):
+                                os.makedirs(self.payload_dirpath, exist_ok=True)
+                                shutil.copy2(
+                                    os.path.join(source_payload_dirpath, payload_key + ".zip"),
+                                    self.payload_dirpath,
+                                )
+                        offset = archive.tell()
+                        archive.write(record)
+                        self._add_to_index(con, opti_data, offset, len(record))
+                        n_merged = n_merged + 1
+        return n_merged
+
+    def merge_shards(self, resolution=None):
+        """ Merge all shards of this archive into the archive and delete them.
+
+        This should only be called once all processes writing shards have finished.
+        """
+        shard_filepaths = sorted(glob.glob(glob.escape(self.archive_filepath) + _SHARD_SUFFIX + "*"))
+        n_merged = self.merge(shard_filepaths, resolution)
+        for shard_filepath in shard_filepaths:
+            os.remove(shard_filepath)
+        return n_merged
+
+    def rebuild_index(self):
+        """ Recreate the archive index by reading the complete archive once"""
+        with self._lock():
+            if os.path.exists(self.index_filepath):
+                os.remove(self.index_filepath)
+            self._index_new_records()
+
+    @contextmanager
+    def _connect_index(self):
+        """ Open the archive index, committing on success and closing the connection on exit"""
+        con = sqlite3.connect(self.index_filepath, timeout=60)
+        try:
+            with con:
+                con.execute(
+                    "CREATE TABLE IF NOT EXISTS archive "
+                    "(id INTEGER PRIMARY KEY, x BLOB, objs BLOB, name TEXT, offset INTEGER, length INTEGER, "
+                    "reused INTEGER NOT NULL DEFAULT 0)"
+                )
+                if "reused" not in [column[1] for column in con.execute("PRAGMA table_info(archive)")]:
+                    # indexes created before reused records were flagged
+                    con.execute("ALTER TABLE archive ADD COLUMN reused INTEGER NOT NULL DEFAULT 0")
+                con.execute("CREATE INDEX IF NOT EXISTS archive_name ON archive (name)")
+                con.execute("CREATE TABLE IF NOT EXISTS front (id INTEGER PRIMARY KEY, objs BLOB)")
+                yield con
+        finally:
+            con.close()
+
+    def _add_to_index(self, con, opti_data, offset, length):
+        # records written before reuses were flagged have no reused attribute
+        reused = getattr(opti_data, "reused", False)
+        cursor = con.execute(
+            "INSERT INTO archive VALUES ((SELECT COALESCE(MAX(id) + 1, 0) FROM archive), ?, ?, ?, ?, ?, ?)",
+            (
+                pickle.dumps(opti_data.x, -1),
+                pickle.dumps(opti_data.objs, -1),
+                self.get_design_name(opti_data.design),
+                offset,
+                length,
+                int(reused),
+            ),
+        )
+        if not reused:
+            self._add_to_front(con, cursor.lastrowid, opti_data.objs)
+
+    def _add_to_front(self, con, design_id, objs):
+        """ Update the Pareto front with a new design in O(front size)"""
+        f = _objs_array(objs)
+        dominated_ids = []
+        for front_id, front_objs in con.execute("SELECT id, objs FROM front"):
+            front_f = np.frombuffer(front_objs)
+            if _dominates(front_f, f):
+                return
+            if _dominates(f, front_f):
+                dominated_ids.append((front_id,))
+        con.executemany("DELETE FROM front WHERE id = ?", dominated_ids)
+        con.execute("INSERT INTO front VALUES (?, ?)", (design_id, f.tobytes()))
+
+    def _dump_record(self, opti_data):
+        """ Pickle a record, writing its payloads to a new zip file in the payload directory"""
+        buffer = io.BytesIO()
+        pickler = _PayloadPickler(buffer, self.is_payload)
+        pickler.dump(opti_data)
+        if len(pickler.payloads) > 0:
+            os.makedirs(self.payload_dirpath, exist_ok=True)
+            payload_filepath = os.path.join(self.payload_dirpath, pickler.key + ".zip")
+            with zipfile.ZipFile(payload_filepath, "w", zipfile.ZIP_DEFLATED) as payload_file:
+                for member, payload in enumerate(pickler.payloads):
+                    payload_file.writestr(str(member), pickle.dumps(payload, -1))
+        return buffer.getvalue()
+
+    def _load_record(self, f):
+        return _PayloadUnpickler(f, self.payload_dirpath).load()
+
+    def _read_record(self, offset, length):
+        with open(self.archive_filepath, 'rb') as f:
+            f.seek(offset)
+            return self._load_record(io.BytesIO(f.read(length)))
+
+    @contextmanager
+    def _lock(self):
+        """ Hold the exclusive archive lock, waiting for other processes and threads to release it"""
+        with open(self.lock_filepath, 'a+b') as lock_file:
+            if os.name == "nt":
+                lock_file.seek(0)
+                while 1:
+                    try:
+                        # LK_LOCK gives up after retrying for 10 seconds
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _ensure_index(self):
+        """ Index records of the archive which are not yet in the index.
+
+        This builds the index of archives written before indexing was introduced, and recovers records appended to the
+        archive by a process which stopped before updating the index. The archive lock is only taken if there are such
+        records, so that queries of an indexed archive neither wait for each other nor need write access.
+        """
+        if not os.path.exists(self.archive_filepath):
+            return
+        with self._connect_index() as con:
+            if self._indexed_size(con) >= os.path.getsize(self.archive_filepath):
+                return
+        with self._lock():
+            self._index_new_records()
+
+    def _indexed_size(self, con):
+        """ Size of the indexed part of the archive"""
+        return con.execute("SELECT COALESCE(MAX(offset + length), 0) FROM archive").fetchone()[0]
+
+    def _index_new_records(self):
+        """ Index records beyond the end of the indexed part of the archive. The archive lock must be held"""
+        if not os.path.exists(self.archive_filepath):
+            return
+        archive_size = os.path.getsize(self.archive_filepath)
+        with self._connect_index() as con:
+            indexed_size = self._indexed_size(con)
+            if indexed_size >= archive_size:
+                return
+            with open(self.archive_filepath, 'rb') as f:
+                f.seek(indexed_size)
+                while 1:
+                    offset = f.tell()
+                    try:
+                        opti_data = self._load_record(f)
+                    except EOFError:
+                        break
+                    self._add_to_index(con, opti_data, offset, f.tell() - offset)
+
+
+_SHARD_SUFFIX = ".shard-"
+# each shard record is framed by a header holding a marker, the record length, and its CRC32 checksum
+_SHARD_HEADER = struct.Struct(">4sQI")
+_SHARD_MARKER = b"MEAR"
+
+
+def _append_shard_record(filepath, record):
+    """ Append a framed record to a shard with a single write, so a record is either complete or detectably torn"""
+    frame = _SHARD_HEADER.pack(_SHARD_MARKER, len(record), zlib.crc32(record)) + record
+    with open(filepath, 'ab') as shard:
+        shard.write(frame)
+
+
+def _iter_records(filepath):
+    """ Yield the pickled records of an archive or shard, skipping a torn record at the end of a shard"""
+    with open(filepath, 'rb') as f:
+        if f.read(len(_SHARD_MARKER)) == _SHARD_MARKER:
+            f.seek(0)
+            while 1:
+                header = f.read(_SHARD_HEADER.size)
+                if len(header) < _SHARD_HEADER.size:
+                    break
+                marker, length, crc = _SHARD_HEADER.unpack(header)
+                record = f.read(length)
+                if marker != _SHARD_MARKER or len(record) < length or zlib.crc32(record) != crc:
+                    print("Skipping torn record at the end of shard", filepath)
+                    break
+                yield record
+        else:
+            f.seek(0)
+            while 1:
+                offset = f.tell()
+                try:
+                    _PayloadUnpickler(f, "").load()
+                except EOFError:
+                    break
+                length = f.tell() - offset
+                f.seek(offset)
+                yield f.read(length)
+
+
+def _archive_filepath(filepath):
+    """ Path of the archive a shard belongs to, or filepath itself if it is not a shard"""
+    if _SHARD_SUFFIX in os.path.basename(filepath):
+        return filepath[: filepath.rindex(_SHARD_SUFFIX)]
+    return filepath
+
+
+def _x_key(x, resolution=None):
+    x = np.asarray(x, dtype=float).flatten()
+    if resolution is not None:
+        x = np.rint(x / resolution)
+    return x.tobytes()
+
+
+class LazyPayload:
+    """ Reference to an array stored in the payload directory of an archive, loaded on first access.
+
+    Attribute access, indexing, iteration, and conversion to a numpy array are forwarded to the loaded object, so a
+    LazyPayload can mostly be used in place of the DataFrame or array it refers to. load returns the object itself.
+    """
+
+    def __init__(self, filepath, member):
+        self._filepath = filepath
+        self._member = member
+        self._obj = None
+
+    def load(self):
+        """ Load the referenced object from the payload directory"""
+        if self._obj is None:
+            with zipfile.ZipFile(self._filepath) as payload_file:
+                self._obj = pickle.loads(payload_file.read(self._member))
+        return self._obj
+
+    def __getattr__(self, name):
+        # private and special names are not forwarded, which keeps copying and pickling of unloaded payloads working
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+    def __len__(self):
+        return len(self.load())
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.load(), dtype=dtype)
+
+    def __reduce__(self):
+        return (LazyPayload, (self._filepath, self._member))
+
+    def __repr__(self):
+        return "LazyPayload(" + repr(self._filepath) + ", " + repr(self._member) + ")"
+
+
+class _PayloadPickler(pickle.Pickler):
+    """ Pickler replacing payloads by persistent ids and collecting them for storage outside the record"""
+
+    def __init__(self, file, is_payload):
+        super().__init__(file, -1)
+        self.is_payload = is_payload
+        self.key = uuid.uuid4().hex
+        self.payloads = []
+        self.members = {}
+
+    def persistent_id(self, obj):
+        if not self.is_payload(obj):
+            return None
+        # objects referenced several times within a record are stored once
+        if id(obj) not in self.members:
+            self.members[id(obj)] = str(len(self.payloads))
+            self.payloads.append(obj)
+        return (self.key, self.members[id(obj)])
+
+
+class _PayloadUnpickler(pickle.Unpickler):
+    """ Unpickler replacing persistent ids of payloads with LazyPayload references"""
+
+    def __init__(self, file, payload_dirpath):
+        super().__init__(file)
+        self.payload_dirpath = payload_dirpath
+        self.loaded = {}
+
+    def persistent_load(self, pid):
+        key, member = pid
+        if pid not in self.loaded:
+            self.loaded[pid] = LazyPayload(os.path.join(self.payload_dirpath, key + ".zip"), member)
+        return self.loaded[pid]
+
+
+def _objs_array(objs):
+    return np.asarray(objs, dtype=float).flatten()
+
+
+def _dominates(f1, f2):
+    """ True if objectives f1 Pareto dominate objectives f2 (all objectives minimized)"""
+    return bool(np.all(f1 <= f2) and np.any(f1 < f2))
+
+
+def non_dominated_front(points):
+    """ Return the indices of the non-dominated points, i.e. the first Pareto front, in ascending order.
+
+    For two and three objectives the front is found with a sort-and-sweep skyline algorithm requiring O(n log n)
+    comparisons. For more objectives pygmo's fast non-dominated sorting is used. As with pygmo, points with identical
+    objectives do not dominate each other.
+
+    Args:
+        points: Objective values of each point, all objectives minimized
+
+    Returns:
+        front: Sorted indices of the non-dominated points
+    """
+    points = np.asarray([_objs_array(p) for p in points])
+    n_obj = points.shape[1]
+    if n_obj > 3:
+        ndf, dl, dc, ndr = pg.fast_non_dominated_sorting(points)
+        return sorted(int(i) for i in ndf[0])
+    if n_obj == 1:
+        return [int(i) for i in np.flatnonzero(points[:, 0] == points[:, 0].min())]
+    if n_obj == 2:
+        return sorted(int(i) for i in _skyline_2d(points))
+    return sorted(int(i) for i in _skyline_3d(points))
+
+
+def _skyline_2d(points):
+    """ Non-dominated indices of 2 objective points"""
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    front = []
+    min_prev = np.inf  # lowest second objective of all points with a strictly lower first objective
+    start = 0
+    while start < len(order):
+        # group points with equal first objective, sorted by second objective
+        stop = start
+        while stop < len(order) and points[order[stop], 0] == points[order[start], 0]:
+            stop = stop + 1
+        group_min = points[order[start], 1]
+        if group_min < min_prev:
+            for i in order[start:stop]:
+                if points[i, 1] == group_min:
+                    front.append(i)
+            min_prev = group_min
+        start = stop
+    return front
+
+
+def _skyline_3d(points):
+    """ Non-dominated indices of 3 objective points"""
+    order = np.lexsort((points[:, 2], points[:, 1], points[:, 0]))
+    front = []
+    # 2D front of the (second, third) objectives of all points with a strictly lower first objective, sorted by
+    # increasing second objective and hence decreasing third objective
+    stair_2 = []
+    stair_3 = []
+    start = 0
+    while start < len(order):
+        stop = start
+        while stop < len(order) and points[order[stop], 0] == points[order[start], 0]:
+            stop = stop + 1
+        group = order[start:stop]
+        group_front = group[_skyline_2d(points[group][:, 1:])]
+        for i in group_front:
+            k = bisect.bisect_right(stair_2, points[i, 1]) - 1
+            if k < 0 or stair_3[k] > points[i, 2]:
+                front.append(i)
+        for i in group_front:
+            f2, f3 = points[i, 1], points[i, 2]
+            k = bisect.bisect_right(stair_2, f2) - 1
+            if k >= 0 and stair_3[k] <= f3:
+                continue
+            # remove stair points weakly dominated by the new point
+            stop_k = k + 1
+            while stop_k < len(stair_2) and stair_3[stop_k] >= f3:
+                stop_k = stop_k + 1
+            start_k = k + 1 if k >= 0 and stair_2[k] < f2 else max(k, 0)
+            del stair_2[start_k:stop_k]
+            del stair_3[start_k:stop_k]
+            stair_2.insert(start_k, f2)
+            stair_3.insert(start_k, f3)
+        start = stop
+    return front
+
 
 class OptiData:
-    """Object template for serializing optimization results with Pickle"""
+    """Object template for serializing optimization results with Pickle
 
-    def __init__(self, x, design, full_results, objs):
+    Records of reused cached objectives have reused set to True and hold neither design nor full results.
+    """
+
+    def __init__(self, x, design, full_results, objs, reused=False):
         self.x = x
         self.design = design
         self.full_results = full_results
         self.objs = objs
+        self.reused = reused
+
+
+class CachedFitness(NamedTuple):
+    """Objectives of a previously evaluated design and whether the design was valid"""
+
+    objs: tuple
+    valid: bool
+
+
+class FitnessCache:
+    """Least recently used cache of design objectives keyed on quantized free variables.
+
+    Free variables are divided by resolution and rounded to the nearest integer, so designs whose free variables all
+    differ by less than half the resolution share a cache entry. If a filepath is given, the cache is loaded from it on
+    creation and every added entry is appended to it, which allows the cache to survive resumed optimizations. The file
+    is compacted to the current entries when it is loaded and whenever it holds twice as many records as max_size.
+
+    Attributes:
+        resolution: Quantization step of the free variables. Either a single value or one value per free variable.
+
+        max_size: Maximum number of entries held before the least recently used entries are discarded.
+
+        filepath: Optional path of the pickle file the cache is persisted to.
+
+        hits: Number of lookups which found a cached design.
+
+        misses: Number of lookups which did not find a cached design.
+    """
+
+    def __init__(self, resolution, max_size=10000, filepath=None):
+        self.resolution = np.asarray(resolution, dtype=float)
+        self.max_size = max_size
+        self.filepath = filepath
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        self._n_logged = 0
+        if filepath is not None and os.path.exists(filepath):
+            self._load()
+
+    def key(self, x) -> tuple:
+        """Returns the quantized free variables used as cache key"""
+        q = np.rint(np.asarray(x, dtype=float) / self.resolution).astype(np.int64)
+        return tuple(q.tolist())
+
+    def get(self, x) -> "CachedFitness":
+        """Returns the cached entry of a design or None if it has not been evaluated"""
+        key = self.key(x)
+        if key not in self.entries:
+            self.misses = self.misses + 1
+            return None
+        self.hits = self.hits + 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, x, objs, valid=True):
+        """Adds the objectives of an evaluated design to the cache"""
+        key = self.key(x)
+        self.entries[key] = CachedFitness(tuple(np.asarray(objs, dtype=float).flatten()), valid)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        if self.filepath is None:
+            return
+        if self._n_logged >= 2 * self.max_size:
+            self.save()
+            return
+        with open(self.filepath, "ab") as f:
+            pickle.dump((key, self.entries[key]), f, -1)
+        self._n_logged = self._n_logged + 1
+
+    def save(self):
+        """Writes the current entries to the cache file, replacing the previous file only once writing succeeded"""
+        tmp_filepath = self.filepath + ".tmp"
+        with open(tmp_filepath, "wb") as f:
+            for entry in self.entries.items():
+                pickle.dump(entry, f, -1)
+        os.replace(tmp_filepath, self.filepath)
+        self._n_logged = len(self.entries)
+
+    def _load(self):
+        """Replays the entries appended to the cache file and compacts it"""
+        n_records = 0
+        torn = False
+        with open(self.filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            while 1:
+                offset = f.tell()
+                try:
+                    record = pickle.load(f)
+                except EOFError:
+                    torn = offset != size
+                    break
+                except pickle.UnpicklingError:
+                    # an entry torn by an interrupted append
+                    torn = True
+                    break
+                n_records = n_records + 1
+                if isinstance(record, OrderedDict):
+                    # caches written as a single dictionary by earlier versions
+                    self.entries.update(record)
+                    continue
+                key, entry = record
+                self.entries[key] = entry
+                self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        self._n_logged = n_records
+        # the file is rewritten if it holds superseded entries, or a torn entry which would hide later appends
+        if torn or n_records != len(self.entries):
+            self.save()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class _SharedPool:
+    """Process pool of a DesignProblem, shared by the copies pygmo makes of the problem in every generation.
+
+    Deep copies refer to the same pool, while pickled copies, such as the problems of islands in other processes, start
+    without one and create their own.
+    """
+
+    def __init__(self):
+        self.executor = None
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        return {"executor": None}
+
+
+def _evaluate_design(designer, evaluator, design_space, x):
+    """Creates and evaluates a single design, returning the design, evaluation results, and objectives"""
+    design = designer.create_design(x)
+    full_results = evaluator.evaluate(design)
+    objs = design_space.get_objectives(full_results)
+    return design, full_results, objs
+
+
+def _replay_design(evaluator, design_space, design, full_results, replay_steps):
+    """Replays the evaluation of an archived design, returning its updated evaluation results and objectives"""
+    full_results = evaluator.replay(design, full_results, replay_steps)
+    objs = design_space.get_objectives(full_results)
+    return full_results, objs
+
+
+# designer, evaluator, and design space of the current worker process, set once by the pool initializer so that they
+# are not pickled with every submitted design
+_worker_components = None
+
+
+def _init_worker(designer, evaluator, design_space):
+    global _worker_components
+    _worker_components = (designer, evaluator, design_space)
+
+
+def _evaluate_in_worker(x):
+    designer, evaluator, design_space = _worker_components
+    return _evaluate_design(designer, evaluator, design_space, x)
+
+
+def _replay_in_worker(design, full_results, replay_steps):
+    designer, evaluator, design_space = _worker_components
+    return _replay_design(evaluator, design_space, design, full_results, replay_steps)
 
 
 class InvalidDesign(Exception):
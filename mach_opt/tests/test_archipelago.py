@@ -0,0 +1,90 @@
+import glob
+import os
+import tempfile
+import unittest
+
+import mach_opt as mo
+from mach_opt.tests.test_batch_fitness import (
+    SquareDesigner,
+    SquareEvaluator,
+    SquareDesignSpace,
+)
+
+
+class TestArchipelago(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.archive_filepath = os.path.join(self.tmp_dir.name, "archive.pkl")
+        self.cache_filepath = os.path.join(self.tmp_dir.name, "cache.pkl")
+        self.filepath = os.path.join(self.tmp_dir.name, "latest_pop.pkl")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_problem(self, sharded=True):
+        dh = mo.DataHandler(
+            self.archive_filepath,
+            os.path.join(self.tmp_dir.name, "designer.pkl"),
+            sharded=sharded,
+        )
+        cache = mo.FitnessCache(resolution=1e-9, filepath=self.cache_filepath)
+        prob = mo.DesignProblem(
+            SquareDesigner(), SquareEvaluator(), SquareDesignSpace(), dh, cache=cache
+        )
+        return prob, dh
+
+    def test_requires_sharded_data_handler(self):
+        prob, dh = self.make_problem(sharded=False)
+        with self.assertRaises(ValueError):
+            mo.DesignOptimizationArchipelago(prob, 2)
+
+    def test_islands_archive_and_cache_separately(self):
+        prob, dh = self.make_problem()
+        opt = mo.DesignOptimizationArchipelago(prob, 2)
+        archi = opt.run_optimization(opt.initial_pop(24), 1, self.filepath)
+        self.assertEqual(len(archi), 2)
+
+        # shards written by the islands are merged into the archive once the run has finished
+        self.assertEqual(glob.glob(self.archive_filepath + ".shard-*"), [])
+        fitness, free_vars = dh.get_archive_data()
+        archived = set(tuple(x) for x in free_vars)
+        for island in archi:
+            pop = island.get_population()
+            for x, f in zip(pop.get_x(), pop.get_f()):
+                if x[0] <= 0.9:
+                    self.assertIn(tuple(x), archived)
+
+        # each island persists its own cache, holding its initial population and offspring
+        self.assertFalse(os.path.exists(self.cache_filepath))
+        for island in range(2):
+            cache = mo.FitnessCache(1e-9, filepath=opt.island_filepath(self.cache_filepath, island))
+            self.assertGreaterEqual(len(cache), 24)
+
+        resumed_archi = opt.load_pop(self.filepath, 24)
+        self.assertEqual(len(resumed_archi), 2)
+        for island, resumed_island in zip(archi, resumed_archi):
+            resumed_pop = resumed_island.get_population()
+            self.assertEqual(resumed_pop.problem.get_fevals(), 0)
+            self.assertEqual(resumed_pop.get_x().tolist(), island.get_population().get_x().tolist())
+
+    def test_seeded_runs_reproducible(self):
+        runs = []
+        for run in range(2):
+            self.archive_filepath = os.path.join(self.tmp_dir.name, "archive" + str(run) + ".pkl")
+            self.cache_filepath = os.path.join(self.tmp_dir.name, "cache" + str(run) + ".pkl")
+            prob, dh = self.make_problem()
+            opt = mo.DesignOptimizationArchipelago(prob, 2, seed=7)
+            archi = opt.run_optimization(opt.initial_pop(24), 2, self.filepath)
+            runs.append([island.get_population().get_x().tolist() for island in archi])
+        self.assertEqual(runs[0], runs[1])
+        self.assertNotEqual(runs[0][0], runs[0][1])
+
+        # the seeds are restored from the checkpoint
+        resumed_opt = mo.DesignOptimizationArchipelago(prob, 2)
+        resumed_archi = resumed_opt.load_pop(self.filepath, 24)
+        self.assertEqual(resumed_opt.seed, 7)
+        self.assertEqual([island.get_population().get_seed() for island in resumed_archi], [7, 8])
+
+
+if __name__ == "__main__":
+    unittest.main()
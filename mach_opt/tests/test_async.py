@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pygmo as pg
+
+import mach_opt as mo
+from mach_opt.tests.test_batch_fitness import (
+    SquareDesigner,
+    SquareEvaluator,
+    SquareDesignSpace,
+    ListDataHandler,
+)
+
+
+class ValidSquareDesignSpace(SquareDesignSpace):
+    @property
+    def bounds(self):
+        return ([0, 0], [0.9, 1])
+
+
+def make_problem():
+    dh = ListDataHandler()
+    prob = mo.DesignProblem(
+        SquareDesigner(), SquareEvaluator(), ValidSquareDesignSpace(), dh
+    )
+    return prob, dh
+
+
+class TestDesignOptimizationAsync(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tmp_dir.name, "latest_pop.pkl")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def assert_consistent(self, pop, archive):
+        archive = dict(archive)
+        for x, f in zip(pop.get_x(), pop.get_f()):
+            self.assertIn(tuple(x), archive)
+            np.testing.assert_allclose(f, [x[0] ** 2, (x[1] - 1) ** 2])
+
+    def test_get_offspring_within_bounds(self):
+        prob, dh = make_problem()
+        opt = mo.DesignOptimizationAsync(prob, 2, seed=3)
+        pop_x = np.array([[0.1, 0.2], [0.5, 0.9], [0.8, 0.4], [0.3, 0.6]])
+        pop_f = np.array([[x[0] ** 2, (x[1] - 1) ** 2] for x in pop_x])
+        for _ in range(20):
+            child = opt.get_offspring(pop_x, pop_f)
+            self.assertEqual(len(child), 2)
+            self.assertTrue(np.all(child >= [0, 0]) and np.all(child <= [0.9, 1]))
+
+    def test_crossover_and_mutation_seeded_independently(self):
+        prob, dh = make_problem()
+        opt = mo.DesignOptimizationAsync(prob, 2, seed=3)
+        pop_x = np.array([[0.1, 0.2], [0.5, 0.9], [0.8, 0.4], [0.3, 0.6]])
+        pop_f = np.array([[x[0] ** 2, (x[1] - 1) ** 2] for x in pop_x])
+        with mock.patch.object(pg, "sbx_crossover", wraps=pg.sbx_crossover) as crossover, mock.patch.object(
+            pg, "polynomial_mutation", wraps=pg.polynomial_mutation
+        ) as mutation:
+            opt.get_offspring(pop_x, pop_f)
+        self.assertNotEqual(crossover.call_args.args[-1], mutation.call_args.args[-1])
+
+    def test_insert_discards_worst_individual(self):
+        prob, dh = make_problem()
+        opt = mo.DesignOptimizationAsync(prob, 2)
+        pop_x = np.array([[0.1, 0.9], [0.5, 0.5], [0.9, 0.0]])
+        pop_f = np.array([[0.01, 0.01], [0.25, 0.25], [0.81, 1.0]])
+        pop_x, pop_f = opt.insert(pop_x, pop_f, [0.0, 1.0], (0.0, 0.0))
+        self.assertEqual(len(pop_x), 3)
+        self.assertIn([0.0, 1.0], pop_x.tolist())
+        self.assertNotIn([0.9, 0.0], pop_x.tolist())
+        self.assertEqual(pop_f.tolist()[pop_x.tolist().index([0.0, 1.0])], [0.0, 0.0])
+
+    def test_run_optimization_evaluates_every_offspring(self):
+        prob, dh = make_problem()
+        opt = mo.DesignOptimizationAsync(prob, 3, seed=5)
+        pop = opt.initial_pop(8)
+        self.assertEqual(len(dh.archive), 8)
+        self.assert_consistent(pop, dh.archive)
+
+        pop = opt.run_optimization(pop, 2, self.filepath)
+        self.assertEqual(len(pop), 8)
+        self.assertEqual(len(dh.archive), 8 + 2 * 8)
+        self.assert_consistent(pop, dh.archive)
+
+    def test_resume_from_checkpoint(self):
+        prob, dh = make_problem()
+        opt = mo.DesignOptimizationAsync(prob, 1, seed=11)
+        pop = opt.run_optimization(opt.initial_pop(8), 1, self.filepath)
+
+        resumed_prob, resumed_dh = make_problem()
+        resumed_opt = mo.DesignOptimizationAsync(resumed_prob, 1)
+        resumed_pop = resumed_opt.load_pop(self.filepath, 8)
+        self.assertEqual(len(resumed_dh.archive), 0)
+        np.testing.assert_array_equal(resumed_pop.get_x(), pop.get_x())
+        np.testing.assert_array_equal(resumed_pop.get_f(), pop.get_f())
+
+        # the restored random number generator creates the offspring the original run would have created next
+        pop_x, pop_f = pop.get_x(), pop.get_f()
+        np.testing.assert_array_equal(
+            resumed_opt.get_offspring(pop_x, pop_f), opt.get_offspring(pop_x, pop_f)
+        )
+
+        resumed_pop = resumed_opt.run_optimization(resumed_pop, 1)
+        self.assertEqual(len(resumed_dh.archive), 8)
+        # the population holds individuals evaluated before and after resuming
+        self.assert_consistent(resumed_pop, dh.archive + resumed_dh.archive)
+
+    def test_missing_checkpoint(self):
+        prob, dh = make_problem()
+        opt = mo.DesignOptimizationAsync(prob, 1)
+        self.assertIsNone(opt.load_pop(self.filepath, 8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import copy
+import pickle
+import unittest
+
+import numpy as np
+
+import mach_opt as mo
+
+
+class SquareDesigner(mo.Designer):
+    def create_design(self, x):
+        if x[0] > 0.9:
+            raise mo.InvalidDesign()
+        return tuple(x)
+
+
+class SquareEvaluator(mo.Evaluator):
+    def evaluate(self, design):
+        return [design[0] ** 2, (design[1] - 1) ** 2]
+
+
+class ManySquareEvaluator(SquareEvaluator):
+    def __init__(self):
+        self.batches = []
+
+    def evaluate_many(self, designs):
+        self.batches.append(len(designs))
+        outcomes = []
+        for design in designs:
+            if design[1] > 0.9:
+                outcomes.append(mo.InvalidDesign())
+            else:
+                outcomes.append(self.evaluate(design))
+        return outcomes
+
+
+class SquareDesignSpace(mo.DesignSpace):
+    def check_constraints(self, full_results):
+        return True
+
+    def get_objectives(self, full_results):
+        return tuple(full_results)
+
+    @property
+    def n_obj(self):
+        return 2
+
+    @property
+    def bounds(self):
+        return ([0, 0], [1, 1])
+
+
+class ListDataHandler:
+    def __init__(self):
+        self.archive = []
+
+    def save_to_archive(self, x, design, full_results, objs):
+        self.archive.append((tuple(x), objs))
+
+    def save_designer(self, designer):
+        pass
+
+
+def make_problem(n_workers):
+    dh = ListDataHandler()
+    prob = mo.DesignProblem(
+        SquareDesigner(),
+        SquareEvaluator(),
+        SquareDesignSpace(),
+        dh,
+        n_workers=n_workers,
+    )
+    return prob, dh
+
+
+class TestBatchFitness(unittest.TestCase):
+    dvs = np.array([0.1, 0.2, 0.95, 0.5, 0.3, 1.0, 0.7, 0.0])
+
+    def test_batch_matches_serial_fitness(self):
+        prob, dh = make_problem(n_workers=2)
+        fvs = prob.batch_fitness(self.dvs)
+        expected = np.concatenate(
+            [prob.fitness(x) for x in self.dvs.reshape(-1, 2)]
+        )
+        np.testing.assert_allclose(fvs, expected)
+        self.assertEqual(fvs[2:4].tolist(), [1e4, 1e4])
+
+    def test_valid_designs_archived_in_order(self):
+        prob, dh = make_problem(n_workers=2)
+        prob.batch_fitness(self.dvs)
+        archived_x = [x for x, _ in dh.archive]
+        self.assertEqual(archived_x, [(0.1, 0.2), (0.3, 1.0), (0.7, 0.0)])
+
+    def test_pool_kept_across_generations(self):
+        prob, dh = make_problem(n_workers=2)
+        prob.batch_fitness(self.dvs)
+        pool = prob._pool.executor
+        self.assertIsNotNone(pool)
+        # pygmo evolves a deep copy of the problem in every generation
+        generation = copy.deepcopy(prob)
+        generation.batch_fitness(self.dvs)
+        self.assertIs(generation._pool.executor, pool)
+        self.assertIsNone(pickle.loads(pickle.dumps(prob))._pool.executor)
+        prob.close_pool()
+        self.assertIsNone(generation._pool.executor)
+        with self.assertRaises(RuntimeError):
+            pool.submit(abs, -1)
+
+    def test_optimization_closes_pool(self):
+        prob, dh = make_problem(n_workers=2)
+        opt = mo.DesignOptimizationMOEAD(prob, seed=1)
+        pop = opt.run_optimization(opt.initial_pop(24), 2)
+        self.assertEqual(len(pop), 24)
+        self.assertIsNone(prob._pool.executor)
+
+    def test_serial_batch_without_workers(self):
+        prob, dh = make_problem(n_workers=None)
+        fvs = prob.batch_fitness(self.dvs)
+        self.assertEqual(fvs.shape, (8,))
+        self.assertEqual(len(dh.archive), 3)
+
+    def test_serial_batch_with_evaluate_many(self):
+        evaluator = ManySquareEvaluator()
+        dh = ListDataHandler()
+        prob = mo.DesignProblem(SquareDesigner(), evaluator, SquareDesignSpace(), dh)
+        fvs = prob.batch_fitness(self.dvs)
+        self.assertEqual(evaluator.batches, [3])
+        np.testing.assert_allclose(fvs, [0.01, 0.64, 1e4, 1e4, 1e4, 1e4, 0.49, 1])
+        self.assertEqual([x for x, _ in dh.archive], [(0.1, 0.2), (0.7, 0.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
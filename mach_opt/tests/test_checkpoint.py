@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import mach_opt as mo
+from mach_opt.tests.test_fitness_cache import make_problem
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tmp_dir.name, "latest_pop.pkl")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_resume_without_reevaluation(self):
+        prob, evaluator, dh = make_problem(None)
+        opt = mo.DesignOptimizationMOEAD(prob, seed=7)
+        pop = opt.run_optimization(opt.initial_pop(24), 1, self.filepath)
+
+        resumed_opt = mo.DesignOptimizationMOEAD(prob)
+        resumed_pop = resumed_opt.load_pop(self.filepath, 24)
+        self.assertEqual(resumed_pop.problem.get_fevals(), 0)
+        np.testing.assert_array_equal(resumed_pop.get_x(), pop.get_x())
+        np.testing.assert_array_equal(resumed_pop.get_f(), pop.get_f())
+
+        # the restored algorithm state continues the run exactly as the original would have
+        next_pop = opt.run_optimization(pop, 1)
+        resumed_next_pop = resumed_opt.run_optimization(resumed_pop, 1)
+        np.testing.assert_array_equal(resumed_next_pop.get_x(), next_pop.get_x())
+
+    def test_missing_checkpoint(self):
+        prob, evaluator, dh = make_problem(None)
+        opt = mo.DesignOptimizationMOEAD(prob)
+        self.assertIsNone(opt.load_pop(self.filepath, 24))
+
+
+if __name__ == "__main__":
+    unittest.main()
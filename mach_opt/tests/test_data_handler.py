@@ -0,0 +1,158 @@
+import glob
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import mach_opt as mo
+
+
+def save_in_process(dh, i):
+    dh.save_to_archive([i, i], None, {"waveform": np.full(200, i)}, (i, -i))
+    return os.getpid()
+
+
+class TestDataHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.archive_filepath = os.path.join(self.tmp_dir.name, "archive.pkl")
+        self.dh = mo.DataHandler(
+            self.archive_filepath, os.path.join(self.tmp_dir.name, "designer.pkl")
+        )
+        self.objs = [(3, 1), (1, 3), (2, 2), (3, 3), (4, 0.5)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def save_designs(self):
+        for i, objs in enumerate(self.objs):
+            self.dh.save_to_archive([i, i], None, [i] * i, objs)
+
+    def test_get_opti_data_by_id(self):
+        self.save_designs()
+        data = self.dh.get_opti_data(3)
+        self.assertEqual(data.x, [3, 3])
+        self.assertEqual(data.full_results, [3, 3, 3])
+        with self.assertRaises(IndexError):
+            self.dh.get_opti_data(5)
+
+    def test_get_archive_data(self):
+        self.save_designs()
+        fitness, free_vars = self.dh.get_archive_data()
+        self.assertEqual(fitness, self.objs)
+        self.assertEqual(free_vars, [[i, i] for i in range(5)])
+
+    def test_get_pareto_data(self):
+        self.save_designs()
+        self.assertEqual([data.x for data in self.dh.get_pareto_data()], [[0, 0], [1, 1], [2, 2], [4, 4]])
+        fitness, free_vars = self.dh.get_pareto_fitness_freevars()
+        self.assertEqual(fitness, [(3, 1), (1, 3), (2, 2), (4, 0.5)])
+
+    def test_pareto_front_updated_on_save(self):
+        self.save_designs()
+        self.assertEqual(self.dh.get_pareto_ids(), [0, 1, 2, 4])
+        self.dh.save_to_archive([5, 5], None, None, (0.5, 0.6))
+        self.assertEqual(self.dh.get_pareto_ids(), [4, 5])
+        self.dh.rebuild_pareto_front()
+        self.assertEqual(self.dh.get_pareto_ids(), [4, 5])
+
+    def test_index_archive_without_index(self):
+        with open(self.archive_filepath, "ab") as archive:
+            for i, objs in enumerate(self.objs[:3]):
+                pickle.dump(mo.OptiData([i, i], None, None, objs), archive, -1)
+        self.dh.save_to_archive([3, 3], None, None, self.objs[3])
+        fitness, free_vars = self.dh.get_archive_data()
+        self.assertEqual(fitness, self.objs[:4])
+        self.assertEqual(self.dh.get_opti_data(1).x, [1, 1])
+
+    def test_payloads_stored_outside_archive(self):
+        dh = mo.DataHandler(
+            self.archive_filepath,
+            os.path.join(self.tmp_dir.name, "designer.pkl"),
+            payload_min_size=100,
+        )
+        torque = pd.DataFrame({"TorCon": np.arange(1000.0)})
+        results = {"torque": torque, "force": torque, "torque_avg": 1.5, "x": np.arange(3)}
+        dh.save_to_archive([0, 0], None, [results], (1, 1))
+        self.assertLess(os.path.getsize(self.archive_filepath), 1000)
+
+        loaded = dh.get_opti_data(0).full_results[0]
+        self.assertEqual(loaded["torque_avg"], 1.5)
+        np.testing.assert_array_equal(loaded["x"], np.arange(3))
+        self.assertIsInstance(loaded["torque"], mo.LazyPayload)
+        self.assertIs(loaded["torque"], loaded["force"])
+        self.assertEqual(loaded["torque"]["TorCon"].sum(), torque["TorCon"].sum())
+        pd.testing.assert_frame_equal(loaded["torque"].load(), torque)
+
+    def test_merge_shards_from_processes(self):
+        dh = mo.DataHandler(
+            self.archive_filepath,
+            os.path.join(self.tmp_dir.name, "designer.pkl"),
+            payload_min_size=100,
+            sharded=True,
+        )
+        with ProcessPoolExecutor(max_workers=3) as pool:
+            pids = set(pool.map(save_in_process, [dh] * 12, range(12)))
+        shards = glob.glob(self.archive_filepath + ".shard-*")
+        self.assertEqual(len(shards), len(pids))
+        # a record torn by a crashed writer is skipped
+        with open(shards[0], "ab") as shard:
+            shard.write(b"MEAR\x00\x00")
+
+        self.assertEqual(dh.merge_shards(), 12)
+        self.assertEqual(glob.glob(self.archive_filepath + ".shard-*"), [])
+        fitness, free_vars = dh.get_archive_data()
+        self.assertEqual(sorted(x[0] for x in free_vars), list(range(12)))
+        data = dh.get_opti_data(free_vars.index([5, 5]))
+        self.assertEqual(data.full_results["waveform"][0], 5)
+
+    def test_concurrent_writers_share_archive(self):
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(save_in_process, [self.dh] * 40, range(40)))
+        fitness, free_vars = self.dh.get_archive_data()
+        self.assertEqual(sorted(x[0] for x in free_vars), list(range(40)))
+        # every index entry points at the record it was created for
+        for design_id, x in enumerate(free_vars):
+            data = self.dh.get_opti_data(design_id)
+            self.assertEqual(data.x, x)
+            self.assertEqual(data.full_results["waveform"][0], x[0])
+
+    def test_queries_of_indexed_archive_not_locked(self):
+        self.save_designs()
+        self.dh.get_pareto_ids()
+        # an archive in a read-only location cannot be locked
+        with mock.patch.object(mo.DataHandler, "_lock", side_effect=PermissionError):
+            fitness, free_vars = self.dh.get_archive_data()
+            self.assertEqual(fitness, self.objs)
+            self.assertEqual(self.dh.get_pareto_ids(), [0, 1, 2, 4])
+            self.assertEqual(self.dh.get_opti_data(3).x, [3, 3])
+
+        # records which are not yet indexed are indexed under the lock
+        with open(self.archive_filepath, "ab") as archive:
+            pickle.dump(mo.OptiData([5, 5], None, None, (0, 0)), archive, -1)
+        with mock.patch.object(mo.DataHandler, "_lock", wraps=self.dh._lock) as lock:
+            self.assertEqual(self.dh.get_pareto_ids(), [5])
+        self.assertEqual(lock.call_count, 1)
+
+    def test_merge_runs_without_duplicates(self):
+        self.save_designs()
+        other_filepath = os.path.join(self.tmp_dir.name, "other", "archive.pkl")
+        os.makedirs(os.path.dirname(other_filepath))
+        other_dh = mo.DataHandler(other_filepath, "designer.pkl", payload_min_size=100)
+        other_dh.save_to_archive([1, 1], None, None, (1, 3))
+        other_dh.save_to_archive([7, 7], None, np.arange(150.0), (0, 0))
+
+        self.assertEqual(self.dh.merge([other_filepath]), 1)
+        fitness, free_vars = self.dh.get_archive_data()
+        self.assertEqual(free_vars[-1], [7, 7])
+        self.assertEqual(self.dh.get_pareto_ids(), [5])
+        self.assertEqual(self.dh.get_opti_data(5).full_results[-1], 149.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import mach_opt as mo
+from mach_opt.tests.test_batch_fitness import (
+    SquareDesigner,
+    SquareEvaluator,
+    SquareDesignSpace,
+    ListDataHandler,
+)
+
+
+class CountingEvaluator(SquareEvaluator):
+    def __init__(self):
+        self.count = 0
+
+    def evaluate(self, design):
+        self.count = self.count + 1
+        return super().evaluate(design)
+
+
+def make_problem(cache):
+    dh = ListDataHandler()
+    evaluator = CountingEvaluator()
+    prob = mo.DesignProblem(
+        SquareDesigner(), evaluator, SquareDesignSpace(), dh, cache=cache
+    )
+    return prob, evaluator, dh
+
+
+class TestFitnessCache(unittest.TestCase):
+    def test_quantized_designs_reuse_objectives(self):
+        cache = mo.FitnessCache(resolution=1e-3)
+        prob, evaluator, dh = make_problem(cache)
+        objs = prob.fitness([0.1, 0.2])
+        self.assertEqual(prob.fitness([0.1001, 0.2002]), objs)
+        self.assertEqual(evaluator.count, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # reuse is recorded in the archive without design or full results
+        self.assertEqual(len(dh.archive), 2)
+
+    def test_reuse_not_added_to_pareto_front(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            archive_filepath = os.path.join(tmp_dir, "archive.pkl")
+            dh = mo.DataHandler(archive_filepath, os.path.join(tmp_dir, "designer.pkl"))
+            prob = mo.DesignProblem(
+                SquareDesigner(), CountingEvaluator(), SquareDesignSpace(), dh, cache=mo.FitnessCache(1e-3)
+            )
+            for _ in range(3):
+                prob.fitness([0.1, 0.2])
+            fitness, free_vars = dh.get_archive_data()
+            self.assertEqual(len(fitness), 3)
+            self.assertEqual(dh.get_pareto_ids(), [0])
+            self.assertEqual([data.design for data in dh.get_pareto_data()], [(0.1, 0.2)])
+
+            # reuses stay off the front when the index is rebuilt from the archive
+            dh.rebuild_index()
+            self.assertEqual(dh.get_pareto_ids(), [0])
+            dh.rebuild_pareto_front()
+            self.assertEqual(dh.get_pareto_ids(), [0])
+
+    def test_invalid_designs_cached_but_not_archived(self):
+        cache = mo.FitnessCache(resolution=1e-3)
+        prob, evaluator, dh = make_problem(cache)
+        first = prob.fitness([0.95, 0.2])
+        self.assertEqual(prob.fitness([0.95, 0.2]), first)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(len(dh.archive), 0)
+
+    def test_least_recently_used_entry_discarded(self):
+        cache = mo.FitnessCache(resolution=1e-3, max_size=2)
+        cache.put([0.1, 0.1], (1, 1))
+        cache.put([0.2, 0.2], (2, 2))
+        cache.get([0.1, 0.1])
+        cache.put([0.3, 0.3], (3, 3))
+        self.assertIsNone(cache.get([0.2, 0.2]))
+        self.assertEqual(cache.get([0.1, 0.1]).objs, (1, 1))
+
+    def test_cache_persisted_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "cache.pkl")
+            mo.FitnessCache(resolution=1e-3, filepath=filepath).put([0.1, 0.1], (1, 2))
+            cache = mo.FitnessCache(resolution=1e-3, filepath=filepath)
+            self.assertEqual(cache.get([0.1, 0.1]), mo.CachedFitness((1, 2), True))
+
+    def test_entries_appended_and_compacted_on_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "cache.pkl")
+            cache = mo.FitnessCache(resolution=1e-3, max_size=2, filepath=filepath)
+            cache.put([0.1, 0.1], (1, 1))
+            size = os.path.getsize(filepath)
+            cache.put([0.2, 0.2], (2, 2))
+            cache.put([0.1, 0.1], (3, 3))
+            # entries are appended instead of rewriting the whole cache
+            self.assertGreater(os.path.getsize(filepath), 2 * size)
+            # an append torn by an interruption is dropped
+            with open(filepath, "ab") as f:
+                f.write(pickle.dumps(((4, 4), mo.CachedFitness((4, 4), True)), -1)[:-3])
+
+            loaded = mo.FitnessCache(resolution=1e-3, max_size=2, filepath=filepath)
+            self.assertEqual(len(loaded), 2)
+            self.assertEqual(loaded.get([0.1, 0.1]).objs, (3, 3))
+            with open(filepath, "rb") as f:
+                self.assertEqual(len([pickle.load(f) for _ in range(2)]), 2)
+                self.assertEqual(f.read(), b"")
+
+            loaded.put([0.3, 0.3], (5, 5))
+            loaded = mo.FitnessCache(resolution=1e-3, max_size=2, filepath=filepath)
+            self.assertEqual(list(loaded.entries), [(100, 100), (300, 300)])
+
+    def test_cache_of_earlier_versions_loaded(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "cache.pkl")
+            cache = mo.FitnessCache(resolution=1e-3)
+            cache.put([0.1, 0.1], (1, 2))
+            with open(filepath, "wb") as f:
+                pickle.dump(cache.entries, f, -1)
+            cache = mo.FitnessCache(resolution=1e-3, filepath=filepath)
+            self.assertEqual(cache.get([0.1, 0.1]), mo.CachedFitness((1, 2), True))
+
+
+if __name__ == "__main__":
+    unittest.main()
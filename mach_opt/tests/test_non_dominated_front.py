@@ -0,0 +1,37 @@
+import unittest
+
+import numpy as np
+import pygmo as pg
+
+import mach_opt as mo
+
+
+class TestNonDominatedFront(unittest.TestCase):
+    def check_against_pygmo(self, points):
+        ndf, dl, dc, ndr = pg.fast_non_dominated_sorting(points)
+        expected = sorted(int(i) for i in ndf[0])
+        self.assertEqual(mo.non_dominated_front(points), expected)
+
+    def test_two_objectives(self):
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            self.check_against_pygmo(rng.random((30, 2)))
+
+    def test_three_objectives(self):
+        rng = np.random.default_rng(1)
+        for _ in range(50):
+            self.check_against_pygmo(rng.random((30, 3)))
+
+    def test_ties_and_duplicates(self):
+        rng = np.random.default_rng(2)
+        for n_obj in (2, 3):
+            for _ in range(100):
+                self.check_against_pygmo(rng.integers(0, 4, (20, n_obj)).astype(float))
+
+    def test_many_objectives(self):
+        rng = np.random.default_rng(3)
+        self.check_against_pygmo(rng.random((30, 4)))
+
+
+if __name__ == "__main__":
+    unittest.main()